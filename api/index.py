@@ -1,9 +1,10 @@
 # This is a Python file, not a markdown file.
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.responses import FileResponse, JSONResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
+from typing import Dict, List, Any
 import asyncio
 import json
 import os
@@ -16,6 +17,15 @@ load_dotenv()
 from src.orchestrator import OrchestratorAgent
 from src.report_generator import ReportGenerator
 from src.game_interaction import GameInteraction
+from src.matrix import build_profiles
+from src.artifact_store import ArtifactShipper
+from src.response_cache import ResponseCache
+from src.compression import CompressionMiddleware
+from src.artifact_files import ArtifactFiles
+from src.report_pipeline import ReportPipeline
+from src.structured_logging import bind, get_logger
+
+logger = get_logger("api")
 
 # Initialize FastAPI app
 app = FastAPI(title="Multi-Agent Game Tester POC")
@@ -52,10 +62,41 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Stream gzip (or br if brotli is installed) for text responses; cached ones arrive precompressed,
+# binary media and partial content pass through untouched
+app.add_middleware(CompressionMiddleware, minimum_size=1024)
+
 # Initialize components
 orchestrator = OrchestratorAgent()
-report_generator = ReportGenerator()
+report_generator = ReportGenerator(stream_threshold=int(os.getenv("REPORT_STREAM_THRESHOLD", "2000")))
 game_interaction = GameInteraction()
+trend_analytics = report_generator.history
+# Large suites write their report sections while tests run
+orchestrator.report_streams = report_generator
+artifact_shipper = ArtifactShipper.from_env()  # None unless ARTIFACT_STORE is set
+artifact_files = ArtifactFiles(str(game_interaction.artifacts_dir))
+# Builds the report while artifacts upload, then saves it and refreshes the history index
+report_pipeline = ReportPipeline(report_generator, artifact_shipper)
+
+# Read-only endpoints are cached until a workflow or report-save event invalidates them
+response_cache = ResponseCache()
+report_generator.save_listeners.append(lambda path: response_cache.invalidate("reports"))
+status_cache_ttl = float(os.getenv("RESPONSE_CACHE_STATUS_TTL", "1.0"))
+
+
+def _with_section_links(report: Dict[str, Any]) -> Dict[str, Any]:
+    """Link a streamed report's sections to their paginated endpoint instead of inlining them"""
+    for name, entry in report.get("sections", {}).items():
+        entry["url"] = f"/api/reports/{report['report_id']}/sections/{name}"
+    return report
+
+
+def _mtime_ns(path: Path) -> int:
+    """Directory mtime, so files written by other processes also invalidate cached listings"""
+    try:
+        return path.stat().st_mtime_ns
+    except OSError:
+        return 0
 
 # Store latest workflow result
 latest_workflow_result = None
@@ -64,6 +105,22 @@ class GameTestRequest(BaseModel):
     """Request model for game testing"""
     game_url: str = "https://play.ezygamers.com/"
     test_name: str = "Default Game Test"
+    tenant: str = "default"
+    weight: float = 1.0
+    # Matrix mode: fan tests out across these profiles (see src/matrix.py)
+    viewports: List[str] = []
+    network_profiles: List[str] = []
+    # Sample this workflow's stacks and stage allocations (see /api/profiles)
+    profile: bool = False
+
+class BatchTestRequest(BaseModel):
+    """Request model for testing many games in one run"""
+    game_urls: List[str]
+    tenant: str = "default"
+    weight: float = 1.0
+    viewports: List[str] = []
+    network_profiles: List[str] = []
+    profile: bool = False
 
 class TestStatus(BaseModel):
     """Test status response"""
@@ -80,10 +137,21 @@ async def root():
         "endpoints": {
             "plan": "/api/plan",
             "execute": "/api/execute",
+            "resume": "/api/resume/{workflow_id}",
             "status": "/api/status",
             "report": "/api/report",
             "latest_report": "/api/latest-report",
-            "artifacts": "/api/artifacts"
+            "report_section": "/api/reports/{report_id}/sections/{section}?offset=0&limit=500",
+            "artifacts": "/api/artifacts",
+            "artifact_files": "/api/artifacts/files",
+            "artifact_download": "/api/artifacts/files/{path}",
+            "analytics_pass_rate": "/api/analytics/pass-rate",
+            "analytics_failures": "/api/analytics/failures",
+            "analytics_duration_regressions": "/api/analytics/duration-regressions",
+            "execute_batch": "/api/execute-batch",
+            "batch_report": "/api/batch-report/{batch_id}",
+            "profiles": "/api/profiles",
+            "profile_flamegraph": "/api/profiles/{workflow_id}/flamegraph"
         }
     }
 
@@ -100,9 +168,7 @@ async def health_check():
 async def generate_test_plan(request: GameTestRequest):
     """Generate test plan for a game"""
     try:
-        print(f"\n{'='*60}")
-        print(f"Starting Test Planning for: {request.game_url}")
-        print(f"{'='*60}\n")
+        logger.info(f"Starting test planning for {request.game_url}", extra={"game_url": request.game_url})
         
         planner = orchestrator.planner
         result = await planner.execute(request.game_url)
@@ -115,28 +181,41 @@ async def generate_test_plan(request: GameTestRequest):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+def _matrix_options(viewports: List[str], network_profiles: List[str]):
+    """Matrix options for the orchestrator; 400 on unknown profiles"""
+    if not (viewports or network_profiles):
+        return None
+    try:
+        build_profiles(viewports, network_profiles)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"viewports": viewports, "network_profiles": network_profiles}
+
 @app.post("/api/execute")
 async def execute_tests(request: GameTestRequest):
     """Execute full testing workflow"""
     global latest_workflow_result
     
     try:
-        print(f"\n{'='*60}")
-        print(f"Starting Full Testing Workflow for: {request.game_url}")
-        print(f"{'='*60}\n")
+        logger.info(f"Starting full testing workflow for {request.game_url}",
+                    extra={"game_url": request.game_url, "tenant": request.tenant})
+        
+        matrix = _matrix_options(request.viewports, request.network_profiles)
         
         # Run orchestration
-        workflow_result = await orchestrator.orchestrate_testing(request.game_url)
+        workflow_result = await orchestrator.orchestrate_testing(
+            request.game_url, tenant=request.tenant, weight=request.weight, matrix=matrix,
+            profile=request.profile
+        )
         latest_workflow_result = workflow_result
+        response_cache.invalidate("workflow", "artifacts")
         
-        # Generate report
-        report = report_generator.generate_report(workflow_result, request.game_url)
-        report_path = report_generator.save_report(report)
-        
-        print(f"\n{'='*60}")
-        print(f"Workflow Completed Successfully")
-        print(f"Report saved: {report_path}")
-        print(f"{'='*60}\n")
+        # Generate report (shipping artifacts off the ephemeral host alongside)
+        with bind(workflow_id=workflow_result.get("workflow_id"), tenant=request.tenant):
+            published = await report_pipeline.run(workflow_result)
+            report, report_path = published["report"], published["report_path"]
+            logger.info("Workflow completed", extra={"status": workflow_result.get("status"),
+                                                     "report_path": report_path})
         
         return {
             "status": "success",
@@ -146,46 +225,147 @@ async def execute_tests(request: GameTestRequest):
             "summary": report.get("execution_summary"),
             "verdicts": report.get("verdicts")
         }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-@app.get("/api/status")
-async def get_workflow_status():
-    """Get status of latest workflow"""
-    if latest_workflow_result is None:
-        return {"status": "no_workflow_executed"}
+
+@app.post("/api/resume/{workflow_id}")
+async def resume_tests(workflow_id: str):
+    """Resume a checkpointed workflow, running only the missing work"""
+    global latest_workflow_result
     
-    return {
-        "status": latest_workflow_result.get("status"),
-        "workflow_id": latest_workflow_result.get("workflow_id"),
-        "game_url": latest_workflow_result.get("game_url"),
-        "summary": {
-            "planning": latest_workflow_result.get("steps", {}).get("planning", {}).get("total_tests_generated", 0),
-            "ranking": len(latest_workflow_result.get("steps", {}).get("ranking", {}).get("top_10_selected", [])),
-            "execution": latest_workflow_result.get("steps", {}).get("execution", {})
+    try:
+        logger.info(f"Resuming testing workflow {workflow_id}", extra={"workflow_id": workflow_id})
+        
+        workflow_result = await orchestrator.resume_workflow(workflow_id)
+        latest_workflow_result = workflow_result
+        response_cache.invalidate("workflow", "artifacts")
+        
+        with bind(workflow_id=workflow_id):
+            published = await report_pipeline.run(workflow_result)
+        report = published["report"]
+        
+        return {
+            "status": "success",
+            "message": "Testing workflow resumed",
+            "workflow_id": workflow_result.get("workflow_id"),
+            "workflow_status": workflow_result.get("status"),
+            "report_id": report.get("report_id"),
+            "restored_tests": workflow_result.get("steps", {}).get("execution", {}).get("restored_from_checkpoint", 0),
+            "summary": report.get("execution_summary"),
+            "verdicts": report.get("verdicts")
         }
-    }
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
 
-@app.get("/api/report")
-async def get_report():
-    """Get latest generated report"""
+@app.post("/api/execute-batch")
+async def execute_batch(request: BatchTestRequest):
+    """Test many games in one run: shared planning, pooled capacity, per-game and combined reports"""
+    global latest_workflow_result
+    
+    if not request.game_urls:
+        raise HTTPException(status_code=400, detail="game_urls must not be empty")
+    
     try:
+        logger.info(f"Starting batch testing workflow for {len(request.game_urls)} game(s)",
+                    extra={"games": len(request.game_urls), "tenant": request.tenant})
+        matrix = _matrix_options(request.viewports, request.network_profiles)
+        # This batch's own results; concurrent batches and workflows keep theirs
+        game_results, game_reports = [], {}
+        
+        async def publish(workflow_result):
+            # Each game's report is built while the rest of the batch keeps executing
+            game_results.append(workflow_result)
+            response_cache.invalidate("workflow", "artifacts")
+            with bind(workflow_id=workflow_result.get("workflow_id"), batch_id=workflow_result.get("batch_id")):
+                published = await report_pipeline.run(workflow_result)
+            game_reports[workflow_result.get("game_url")] = published["report"]
+        
+        batch_result = await orchestrator.orchestrate_batch(
+            request.game_urls, tenant=request.tenant, weight=request.weight, matrix=matrix,
+            profile=request.profile, on_game_done=publish
+        )
+        if game_results:
+            latest_workflow_result = game_results[-1]
+            response_cache.invalidate("workflow")
+        combined = report_generator.generate_batch_report(batch_result, game_reports)
+        report_generator.save_report(combined)
+        
+        return {
+            "status": "success",
+            "message": f"Batch workflow {batch_result['status']}",
+            "batch_id": batch_result["batch_id"],
+            "batch_report": f"/api/batch-report/{batch_result['batch_id']}",
+            "summary": combined["execution_summary"],
+            "games": combined["games"],
+            "wall_seconds": batch_result["wall_seconds"]
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/api/batch-report/{batch_id}")
+async def get_batch_report(batch_id: str, request: Request):
+    """Combined report of a batch run (per-game reports are listed by report_id)"""
+    def build():
+        try:
+            return {"status": "success", "report": report_generator.get_batch_report(batch_id)}
+        except FileNotFoundError:
+            raise HTTPException(status_code=404, detail=f"Batch report not found: {batch_id}")
+    
+    return await response_cache.respond(request, f"batch-report:{batch_id}", build, tags=["reports"])
+
+@app.get("/api/status")
+async def get_workflow_status(request: Request):
+    """Get status of latest workflow"""
+    def build():
         if latest_workflow_result is None:
-            raise HTTPException(status_code=404, detail="No report generated yet")
+            return {"status": "no_workflow_executed", "orchestrator": orchestrator.get_status()}
         
+        return {
+            "status": latest_workflow_result.get("status"),
+            "workflow_id": latest_workflow_result.get("workflow_id"),
+            "game_url": latest_workflow_result.get("game_url"),
+            "summary": {
+                "planning": latest_workflow_result.get("steps", {}).get("planning", {}).get("total_tests_generated", 0),
+                "ranking": len(latest_workflow_result.get("steps", {}).get("ranking", {}).get("top_10_selected", [])),
+                "execution": latest_workflow_result.get("steps", {}).get("execution", {})
+            },
+            "orchestrator": orchestrator.get_status()
+        }
+    
+    # Live workflow progress changes without events, so status entries also expire quickly
+    return await response_cache.respond(request, "status", build, tags=["workflow"], ttl=status_cache_ttl)
+
+@app.get("/api/report")
+async def get_report(request: Request):
+    """Get latest generated report"""
+    if latest_workflow_result is None:
+        raise HTTPException(status_code=404, detail="No report generated yet")
+    
+    def build():
         report = report_generator.generate_report(latest_workflow_result, 
                                                  latest_workflow_result.get("game_url", ""))
-        
         return {
             "status": "success",
             "report": report
         }
+    
+    try:
+        # A miss rebuilds the report (history refresh included) in a worker thread
+        return await response_cache.respond(request, "report", lambda: asyncio.to_thread(build),
+                                            tags=["workflow", "reports"])
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/latest-report")
-async def get_latest_report_full():
+async def get_latest_report_full(request: Request):
     """Get the complete latest report from disk"""
-    try:
+    def build():
         report = report_generator.get_latest_report()
         
         if "error" in report:
@@ -193,45 +373,149 @@ async def get_latest_report_full():
         
         return {
             "status": "success",
-            "report": report
+            "report": _with_section_links(report)
         }
+    
+    try:
+        return await response_cache.respond(request, "latest-report", lambda: asyncio.to_thread(build),
+                                            tags=["reports"],
+                                            fingerprint=lambda: _mtime_ns(report_generator.reports_dir))
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/api/reports/{report_id}/sections/{section}")
+async def get_report_section(report_id: str, section: str, offset: int = 0, limit: int = 500):
+    """One page of a saved report's test_results or artifacts section (read lazily, not cached)"""
+    if offset < 0 or not 0 < limit <= 5000:
+        raise HTTPException(status_code=400, detail="offset must be >= 0 and limit between 1 and 5000")
+    try:
+        page = await asyncio.to_thread(report_generator.get_report_section, report_id, section, offset, limit)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail=f"Report section not found: {report_id}/{section}")
+    following = offset + len(page["rows"])
+    page["next"] = (f"/api/reports/{report_id}/sections/{section}?offset={following}&limit={limit}"
+                    if following < page["total"] else None)
+    return {"status": "success", **page}
+
 @app.get("/api/artifacts")
-async def get_artifacts():
+async def get_artifacts(request: Request):
     """Get list of captured artifacts"""
-    summary = game_interaction.get_artifacts_summary()
+    def build():
+        return {
+            "status": "success",
+            "artifacts": game_interaction.get_artifacts_summary()
+        }
     
-    return {
-        "status": "success",
-        "artifacts": summary
-    }
+    return await response_cache.respond(request, "artifacts", build, tags=["artifacts"],
+                                        fingerprint=lambda: _mtime_ns(game_interaction.artifacts_dir))
+
+@app.get("/api/artifacts/files")
+async def list_artifact_files(request: Request):
+    """List artifact files with their download URLs"""
+    def build():
+        return {"status": "success", "files": artifact_files.list_files()}
+    
+    return await response_cache.respond(request, "artifact-files", build, tags=["artifacts"],
+                                        fingerprint=lambda: _mtime_ns(artifact_files.root))
+
+@app.api_route("/api/artifacts/files/{path:path}", methods=["GET", "HEAD"])
+async def download_artifact(path: str, request: Request):
+    """Stream an artifact file (supports Range requests for video scrubbing)"""
+    try:
+        return artifact_files.response(request, path)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail=f"Artifact not found: {path}")
+
+@app.get("/api/profiles")
+async def list_profiles():
+    """Workflows with a captured profile, newest first"""
+    return {"status": "success", "profiles": orchestrator.profiler.list_profiles()}
+
+@app.get("/api/profiles/{workflow_id}")
+async def get_profile(workflow_id: str):
+    """Profile summary: per-agent wall/on-CPU time, per-stage allocations, hottest stacks"""
+    try:
+        path = orchestrator.profiler.resolve(workflow_id, "summary")
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail=f"No profile for workflow {workflow_id}")
+    with open(path, "r") as f:
+        return json.load(f)
+
+@app.get("/api/profiles/{workflow_id}/flamegraph")
+async def download_flamegraph(workflow_id: str):
+    """Collapsed stacks ("frame;frame;frame count"), input for flamegraph.pl or speedscope"""
+    try:
+        path = orchestrator.profiler.resolve(workflow_id, "flamegraph")
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail=f"No profile for workflow {workflow_id}")
+    return FileResponse(path, media_type="text/plain", filename=path.name)
 
 @app.get("/api/reports-list")
-async def list_reports():
+async def list_reports(request: Request):
     """List all available reports"""
     reports_dir = Path("reports")
     
-    if not reports_dir.exists():
-        return {"reports": []}
-    
-    reports = []
-    for report_file in sorted(reports_dir.glob("report_*.json")):
-        try:
-            with open(report_file, 'r') as f:
-                report_data = json.load(f)
-                reports.append({
-                    "report_id": report_data.get("report_id"),
-                    "timestamp": report_data.get("timestamp"),
-                    "game_url": report_data.get("game_url"),
-                    "success_rate": report_data.get("execution_summary", {}).get("success_rate"),
-                    "file_path": str(report_file)
-                })
-        except Exception as e:
-            print(f"Error reading report {report_file}: {e}")
+    def build():
+        if not reports_dir.exists():
+            return {"reports": []}
+        
+        reports = []
+        for report_file in sorted(reports_dir.glob("report_*.json")):
+            try:
+                with open(report_file, 'r') as f:
+                    report_data = json.load(f)
+                    reports.append({
+                        "report_id": report_data.get("report_id"),
+                        "timestamp": report_data.get("timestamp"),
+                        "game_url": report_data.get("game_url"),
+                        "success_rate": report_data.get("execution_summary", {}).get("success_rate"),
+                        "file_path": str(report_file)
+                    })
+            except Exception as e:
+                logger.warning(f"Error reading report {report_file}: {e}")
+        
+        return {"status": "success", "reports": reports}
     
-    return {"status": "success", "reports": reports}
+    return await response_cache.respond(request, "reports-list", lambda: asyncio.to_thread(build), tags=["reports"],
+                                        fingerprint=lambda: _mtime_ns(reports_dir))
+
+@app.get("/api/analytics/pass-rate")
+async def analytics_pass_rate(game_url: str = None, window_ms: int = 3_600_000,
+                              since_ms: int = None, until_ms: int = None):
+    """Pass-rate trend across saved reports, bucketed into time windows"""
+    if window_ms <= 0:
+        raise HTTPException(status_code=400, detail="window_ms must be positive")
+    # Reads and parses new report files; keep that off the event loop
+    await asyncio.to_thread(trend_analytics.refresh)
+    return {
+        "status": "success",
+        "runs_indexed": trend_analytics.run_count,
+        "trend": trend_analytics.pass_rate_trend(game_url, window_ms, since_ms, until_ms)
+    }
+
+@app.get("/api/analytics/failures")
+async def analytics_failures(game_url: str = None, since_ms: int = None, until_ms: int = None, limit: int = 20):
+    """Per-test failure frequency across saved reports"""
+    await asyncio.to_thread(trend_analytics.refresh)
+    return {
+        "status": "success",
+        "runs_indexed": trend_analytics.run_count,
+        "failures": trend_analytics.failure_frequency(game_url, since_ms, until_ms, limit)
+    }
+
+@app.get("/api/analytics/duration-regressions")
+async def analytics_duration_regressions(game_url: str = None, window_ms: int = 86_400_000, threshold: float = 0.2):
+    """Tests whose recent mean duration regressed against the earlier baseline"""
+    if window_ms <= 0:
+        raise HTTPException(status_code=400, detail="window_ms must be positive")
+    await asyncio.to_thread(trend_analytics.refresh)
+    return {
+        "status": "success",
+        "runs_indexed": trend_analytics.run_count,
+        "regressions": trend_analytics.duration_regressions(game_url, window_ms, threshold)
+    }
 
 if __name__ == "__main__":
     import uvicorn
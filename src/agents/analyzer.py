@@ -1,6 +1,7 @@
 from .base import BaseAgent
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional, Set
 from datetime import datetime
+from ..rolling_stats import RollingSummary
 
 class AnalyzerAgent(BaseAgent):
     """Agent that validates and analyzes test results"""
@@ -8,49 +9,49 @@ class AnalyzerAgent(BaseAgent):
     def __init__(self):
         super().__init__("analyzer_1", "AnalyzerAgent")
     
-    async def execute(self, execution_results: List[Dict[str, Any]]) -> Dict[str, Any]:
-        """Validate and analyze all execution results"""
-        self.log(f"Analyzing {len(execution_results)} test results")
-        
-        validated_results = []
+    def start_analysis(self, keep_results: bool = True) -> "IncrementalAnalysis":
+        """Begin an incremental analysis that is fed one result at a time"""
+        return IncrementalAnalysis(self, keep_results)
+    
+    async def execute(self, execution_results: List[Dict[str, Any]],
+                      analysis: "IncrementalAnalysis" = None) -> Dict[str, Any]:
+        """Validate and analyze all execution results
         
-        for result in execution_results:
-            validation = {
-                **result,
-                "validation": {
-                    "repeatability": self._check_repeatability(result),
-                    "consistency": self._check_consistency(result),
-                    "evidence_quality": self._check_evidence(result),
-                    "verdict": self._determine_verdict(result),
-                    "reproducibility_score": round(0.85 + (hash(result.get("test_id", "")) % 15) / 100, 2)
-                },
-                "triage_notes": self._generate_triage_notes(result),
-                "validation_timestamp": datetime.now().isoformat()
-            }
-            validated_results.append(validation)
+        When ``analysis`` was already fed during execution, only results it has
+        not seen are validated; aggregates are never recounted. An analysis that
+        does not keep its results (streamed reports) returns no ``validated_results``.
+        """
+        analysis = analysis or self.start_analysis()
+        validated_results = [analysis.add(result) for result in execution_results]
+        self.log(f"Analyzing {analysis.summary.total_tests} test results")
         
         # Cross-agent consistency check
-        cross_agent_check = self._perform_cross_agent_check(execution_results)
+        cross_agent_check = self._perform_cross_agent_check(analysis.summary.total_tests)
         
-        # Calculate overall report statistics
-        total_tests = len(validated_results)
-        passed_tests = len([r for r in validated_results if r["validation"]["verdict"] == "PASSED"])
-        failed_tests = len([r for r in validated_results if r["validation"]["verdict"] == "FAILED"])
-        flaky_tests = len([r for r in validated_results if r["validation"]["verdict"] == "FLAKY"])
-        
-        return {
+        analysis_result = {
             "status": "success",
             "agent": self.name,
             "analysis_timestamp": datetime.now().isoformat(),
-            "validated_results": validated_results,
             "cross_agent_consistency": cross_agent_check,
-            "summary": {
-                "total_tests": total_tests,
-                "passed": passed_tests,
-                "failed": failed_tests,
-                "flaky": flaky_tests,
-                "success_rate": f"{(passed_tests / total_tests * 100):.1f}%" if total_tests > 0 else "0%"
-            }
+            "summary": analysis.summary.snapshot()
+        }
+        if analysis.keep_results:
+            analysis_result["validated_results"] = validated_results
+        return analysis_result
+    
+    def validate_result(self, result: Dict[str, Any]) -> Dict[str, Any]:
+        """Validate a single execution result"""
+        return {
+            **result,
+            "validation": {
+                "repeatability": self._check_repeatability(result),
+                "consistency": self._check_consistency(result),
+                "evidence_quality": self._check_evidence(result),
+                "verdict": self._determine_verdict(result),
+                "reproducibility_score": round(0.85 + (hash(result.get("test_id", "")) % 15) / 100, 2)
+            },
+            "triage_notes": self._generate_triage_notes(result),
+            "validation_timestamp": datetime.now().isoformat()
         }
     
     def _check_repeatability(self, result: Dict[str, Any]) -> str:
@@ -93,12 +94,14 @@ class AnalyzerAgent(BaseAgent):
         
         if status == "passed":
             return f"Test {test_id} passed. No issues detected."
+        elif status in ("error", "skipped"):
+            return (f"Test {test_id} could not be completed ({result.get('failure_class', 'infrastructure')} "
+                    f"after {result.get('attempts', 1)} attempt(s)). Not a game failure. Evidence: {result.get('evidence', 'N/A')}")
         else:
             return f"Test {test_id} failed. Requires investigation. Evidence: {result.get('evidence', 'N/A')}"
     
-    def _perform_cross_agent_check(self, results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    def _perform_cross_agent_check(self, total: int) -> Dict[str, Any]:
         """Validate consistency across multiple agents"""
-        total = len(results)
         if total == 0:
             return {"status": "no_data", "consistency_score": 0}
         
@@ -109,3 +112,38 @@ class AnalyzerAgent(BaseAgent):
             "consistency_score": 0.95,
             "notes": "Results validated across multiple agents. High consistency achieved."
         }
+
+
+class IncrementalAnalysis:
+    """Validates results as they arrive and keeps rolling summary aggregates
+    
+    With ``keep_results=False`` (streamed reports) only the ids seen are kept,
+    not the validated results, so memory doesn't grow with result size.
+    """
+    
+    def __init__(self, analyzer: AnalyzerAgent, keep_results: bool = True):
+        self.analyzer = analyzer
+        self.keep_results = keep_results
+        self.summary = RollingSummary()
+        self._validated: Dict[str, Dict[str, Any]] = {}
+        self._seen: Set[str] = set()
+    
+    def add(self, result: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Validate one result (once per test) and update aggregates
+        
+        A test already seen returns its earlier validation when results are
+        kept, None otherwise.
+        """
+        test_id = result.get("test_id")
+        if test_id in self._seen:
+            return self._validated.get(test_id)
+        
+        validated = self.analyzer.validate_result(result)
+        self._seen.add(test_id)
+        if self.keep_results:
+            self._validated[test_id] = validated
+        self.summary.add(validated)
+        return validated
+    
+    def snapshot(self) -> Dict[str, Any]:
+        return self.summary.snapshot()
@@ -1,6 +1,8 @@
+import logging
 from abc import ABC, abstractmethod
 from typing import Dict, List, Any
 from datetime import datetime
+from ..structured_logging import get_logger
 
 class BaseAgent(ABC):
     """Base class for all agents"""
@@ -9,13 +11,15 @@ class BaseAgent(ABC):
         self.agent_id = agent_id
         self.name = name
         self.created_at = datetime.now()
+        # <Class>.<agent_id>, so LOG_LEVELS can target a whole agent type
+        self.logger = get_logger(f"{type(self).__name__}.{agent_id}")
     
     @abstractmethod
     async def execute(self, *args, **kwargs) -> Dict[str, Any]:
         """Execute agent task"""
         pass
     
-    def log(self, message: str):
-        """Log agent activity"""
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        print(f"[{timestamp}] {self.name} ({self.agent_id}): {message}")
+    def log(self, message: str, level: int = logging.INFO, **fields: Any):
+        """Log agent activity as a structured record; ``fields`` become JSON keys"""
+        self.logger.log(level, message, extra={"agent": self.name, "agent_id": self.agent_id, **fields},
+                        stacklevel=2)
@@ -3,59 +3,222 @@ from typing import Dict, List, Any
 import json
 from datetime import datetime
 import asyncio
+import logging
+import time
+from ..execution_context import ExecutionContext
+from ..retry import RetryPolicy, CircuitBreakerRegistry, CircuitOpenError, classify_failure
+from ..load_test import LoadTestConfig
+from ..performance import PerformanceCapture, NavigationProbe, PerformanceBudgets, is_performance_test
+from ..executor_backends import BackendRouter, BrowserBackend
+from ..recording import RecordingConfig, SessionRecorder
+from ..structured_logging import bind
 
 class ExecutorAgent(BaseAgent):
     """Agent that executes test cases"""
     
-    def __init__(self, agent_id: str = "executor_1"):
-        super().__init__(agent_id, f"ExecutorAgent-{agent_id[-1]}")
-        self.execution_count = 0
+    def __init__(self, agent_id: str = "executor_1", retry_policy: RetryPolicy = None,
+                 circuit_breakers: CircuitBreakerRegistry = None, load_test_config: LoadTestConfig = None,
+                 navigation_probe: NavigationProbe = None, budgets: PerformanceBudgets = None,
+                 backends: BackendRouter = None, recording: RecordingConfig = None):
+        super().__init__(agent_id, f"ExecutorAgent-{agent_id.rsplit('_', 1)[-1]}")
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.circuit_breakers = circuit_breakers or CircuitBreakerRegistry()
+        self.load_test_config = load_test_config or LoadTestConfig()
+        self.navigation_probe = navigation_probe or NavigationProbe(enabled=False)
+        self.budgets = budgets or PerformanceBudgets()
+        self.backends = backends or BackendRouter([BrowserBackend(self.load_test_config)])
+        self.recording = recording or RecordingConfig()
     
-    async def execute(self, test_case: Dict[str, Any], game_url: str, browser_instance=None) -> Dict[str, Any]:
-        """Execute a single test case"""
-        self.execution_count += 1
-        self.log(f"Executing test: {test_case.get('description', 'Unknown')}")
+    async def execute(self, test_case: Dict[str, Any], game_url: str, browser_instance=None,
+                      context: ExecutionContext = None) -> Dict[str, Any]:
+        """Execute a single test case, retrying transient failures"""
+        context = context or ExecutionContext(game_url)
+        context.next_execution(self.name)
+        with bind(test_id=test_case.get("id")):
+            return await self._execute(test_case, game_url, browser_instance, context)
+    
+    async def _execute(self, test_case: Dict[str, Any], game_url: str, browser_instance,
+                       context: ExecutionContext) -> Dict[str, Any]:
+        # Per-test lines are the high-volume ones; LOG_SAMPLE_RATES=per_test=... thins them out
+        self.log(f"Executing test: {test_case.get('description', 'Unknown')}", sample="per_test")
+        
+        breaker = self.circuit_breakers.for_url(game_url)
+        attempt = 0
+        retry_history = []
+        
+        while True:
+            attempt += 1
+            # Recording artifacts an attempt saved before it raised or timed out
+            saved_recording: Dict[str, str] = {}
+            try:
+                if not breaker.allow():
+                    raise CircuitOpenError(f"Circuit open for {game_url}, test not attempted")
+                probing = breaker.state == breaker.HALF_OPEN
+                try:
+                    execution_result = await asyncio.wait_for(
+                        self._run_attempt(test_case, game_url, context, attempt, browser_instance,
+                                          saved_recording),
+                        timeout=self.retry_policy.attempt_timeout
+                    )
+                except asyncio.CancelledError:
+                    # No verdict on the host; don't leave a half-open breaker waiting for one
+                    if probing:
+                        breaker.release_probe()
+                    raise
+                failure_class = classify_failure(result=execution_result)
+            except CircuitOpenError as e:
+                execution_result = self._error_result(test_case, context, "infrastructure", str(e), browser_instance)
+                execution_result["status"] = "skipped"
+                retry_history.append({"attempt": attempt, "failure_class": "infrastructure", "error": str(e)})
+                break
+            except Exception as e:
+                failure_class = classify_failure(exc=e)
+                execution_result = self._error_result(test_case, context, failure_class,
+                                                      f"{type(e).__name__}: {e}", browser_instance)
+                execution_result["artifacts"].update(saved_recording)
+            
+            if failure_class is None:
+                breaker.record_success()
+            else:
+                breaker.record_failure(failure_class)
+                retry_history.append({"attempt": attempt, "failure_class": failure_class,
+                                      "error": execution_result["evidence"]})
+            
+            if not self.retry_policy.should_retry(failure_class, attempt):
+                break
+            
+            delay = self.retry_policy.backoff(attempt)
+            self.log(f"Test {test_case.get('id')} hit {failure_class} failure, retrying in {delay:.2f}s",
+                     logging.WARNING, failure_class=failure_class, attempt=attempt)
+            await asyncio.sleep(delay)
         
+        execution_result["attempts"] = attempt
+        execution_result["failure_class"] = classify_failure(result=execution_result)
+        execution_result["retry_history"] = retry_history
+        
+        # Failures log at WARNING so sampling never hides them
+        level = logging.INFO if execution_result["status"] == "passed" else logging.WARNING
+        self.log(f"Test {test_case.get('id')} completed with status: {execution_result['status']}", level,
+                 sample="per_test", status=execution_result["status"], attempts=attempt)
+        
+        return execution_result
+    
+    @staticmethod
+    def _session_metadata(browser_instance=None) -> Dict[str, Any]:
+        """Browser/viewport/network settings of the session a test ran in"""
+        if browser_instance is not None and hasattr(browser_instance, "session_metadata"):
+            return browser_instance.session_metadata()
+        return {
+            "browser": "chromium",
+            "viewport": "1920x1080",
+            "network_throttle": "None"
+        }
+    
+    def _error_result(self, test_case: Dict[str, Any], context: ExecutionContext, failure_class: str,
+                      message: str, browser_instance=None) -> Dict[str, Any]:
+        """Result for an attempt that failed outside the game (not a game failure)"""
+        return {
+            "test_id": test_case.get("id"),
+            "description": test_case.get("description"),
+            "executor": self.name,
+            "workflow_id": context.workflow_id,
+            "execution_time": datetime.now().isoformat(),
+            "status": "error",
+            "failure_class": failure_class,
+            "duration_seconds": 0.0,
+            "artifacts": {},
+            "evidence": message,
+            "metadata": self._session_metadata(browser_instance)
+        }
+    
+    async def _run_attempt(self, test_case: Dict[str, Any], game_url: str, context: ExecutionContext,
+                           attempt: int, browser_instance=None,
+                           saved_recording: Dict[str, str] = None) -> Dict[str, Any]:
+        """Run one attempt of a test on the cheapest capable backend; raises on infrastructure problems"""
+        backend = self.backends.route(test_case)
+        # Matrix test ids look like "test_1@mobile/slow_3g"; keep artifact names flat
+        artifact_stem = str(test_case.get('id')).replace('@', '_').replace('/', '_')
         execution_result = {
             "test_id": test_case.get("id"),
             "description": test_case.get("description"),
             "executor": self.name,
+            "backend": backend.name,
+            "workflow_id": context.workflow_id,
             "execution_time": datetime.now().isoformat(),
             "status": "passed",
-            "duration_seconds": round(0.5 + (self.execution_count * 0.1), 2),
+            "duration_seconds": 0.0,
             "artifacts": {
-                "screenshot": f"artifacts/test_{test_case.get('id')}_screenshot.png",
-                "dom_snapshot": f"artifacts/test_{test_case.get('id')}_dom.json",
-                "console_logs": f"artifacts/test_{test_case.get('id')}_console.txt"
+                "screenshot": f"artifacts/test_{artifact_stem}_screenshot.png",
+                "dom_snapshot": f"artifacts/test_{artifact_stem}_dom.json",
+                "console_logs": f"artifacts/test_{artifact_stem}_console.txt"
             },
             "evidence": f"Test {test_case.get('id')} executed successfully",
-            "metadata": {
-                "browser": "chromium",
-                "viewport": "1920x1080",
-                "network_throttle": "None"
-            }
+            "metadata": {**self._session_metadata(browser_instance), "backend": backend.name}
         }
         
-        # Simulate some tests failing (create realistic test data)
-        if "error" in test_case.get("description", "").lower():
-            import random
-            if random.random() < 0.2:  # 20% failure rate for error tests
-                execution_result["status"] = "failed"
-                execution_result["evidence"] = "Error handling test failed - unexpected behavior"
+        capture = PerformanceCapture()
+        navigation = await self.navigation_probe.measure(game_url, context.navigation_cache)
+        capture.record_navigation(navigation["navigation"], navigation["resources"])
+        
+        # Only the last few seconds stay in memory, and only failures reach disk
+        recorder = SessionRecorder(self.recording) if self.recording.enabled else None
+        recording_stem = f"test_{artifact_stem}_attempt{attempt}"
+        
+        # Backends record their own per-action latencies into the capture
+        started = time.perf_counter()
+        try:
+            await backend.run(test_case, game_url, execution_result, capture, context,
+                              session=browser_instance, attempt=attempt, recorder=recorder)
+        except BaseException:
+            # Crashes and timeouts (wait_for cancels the attempt) are the runs most worth replaying
+            if recorder is not None:
+                await recorder.stop()
+                if recorder.frames_captured and saved_recording is not None:
+                    saved_recording.update(await asyncio.to_thread(recorder.persist, recording_stem))
+                recorder.discard()
+            raise
+        finally:
+            if recorder is not None:
+                await recorder.stop()
+        if not execution_result["duration_seconds"]:
+            execution_result["duration_seconds"] = round(time.perf_counter() - started, 3)
         
-        self.log(f"Test {test_case.get('id')} completed with status: {execution_result['status']}")
+        if recorder is not None and recorder.frames_captured:
+            execution_result["recording"] = recorder.summary()
+            if execution_result["status"] == "failed":
+                paths = await asyncio.to_thread(recorder.persist, recording_stem)
+                execution_result["artifacts"].update(paths)
+            recorder.discard()
         
+        self._apply_performance(test_case, game_url, execution_result, capture)
         return execution_result
     
-    async def execute_multiple(self, test_cases: List[Dict[str, Any]], game_url: str) -> Dict[str, Any]:
+    def _apply_performance(self, test_case: Dict[str, Any], game_url: str, execution_result: Dict[str, Any],
+                           capture: PerformanceCapture) -> None:
+        """Attach performance data and check it against the game's budget"""
+        performance = capture.summary()
+        violations = self.budgets.check(game_url, performance["metrics"])
+        performance["budget_violations"] = violations
+        execution_result["performance"] = performance
+        
+        # Budgets are assertions only for performance tests; elsewhere they are flagged
+        if violations and is_performance_test(test_case) and execution_result["status"] == "passed":
+            execution_result["status"] = "failed"
+            execution_result["evidence"] = "Performance budget exceeded: " + ", ".join(
+                f"{v['metric']}={v['value']} (budget {v['budget']})" for v in violations
+            )
+    
+    async def execute_multiple(self, test_cases: List[Dict[str, Any]], game_url: str,
+                               context: ExecutionContext = None) -> Dict[str, Any]:
         """Execute multiple test cases in parallel"""
         self.log(f"Executing {len(test_cases)} test cases")
+        context = context or ExecutionContext(game_url)
         
         results = []
         
         # Execute tests with concurrent operations
         for test in test_cases:
-            result = await self.execute(test, game_url)
+            result = await self.execute(test, game_url, context=context)
             results.append(result)
             await asyncio.sleep(0.1)  # Small delay between tests
         
@@ -65,5 +228,6 @@ class ExecutorAgent(BaseAgent):
             "total_executed": len(results),
             "passed": len([r for r in results if r["status"] == "passed"]),
             "failed": len([r for r in results if r["status"] == "failed"]),
+            "errored": len([r for r in results if r["status"] in ("error", "skipped")]),
             "execution_results": results
         }
@@ -1,12 +1,25 @@
 from .base import BaseAgent
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional
 import json
 
+PROMPT_TEMPLATE = """You are a QA engineer planning tests for a web-based game.
+Game URL: {game_url}
+Game analysis: {game_analysis}
+
+Return ONLY a JSON array of at least {count} test cases. Each test case is an object with
+"description", "priority" (high|medium|low), "type" (ui_interaction|input_validation|functional|stress_test)
+and "expected_result"."""
+
+VALID_PRIORITIES = {"high", "medium", "low"}
+VALID_TYPES = {"ui_interaction", "input_validation", "functional", "stress_test"}
+
 class PlannerAgent(BaseAgent):
     """Agent that generates test case candidates"""
     
-    def __init__(self):
+    def __init__(self, llm_client=None, min_tests: int = 20):
         super().__init__("planner_1", "PlannerAgent")
+        self.llm_client = llm_client
+        self.min_tests = min_tests
         self.test_templates = [
             "Click button '{button}' and verify result",
             "Enter value '{value}' in input field and submit",
@@ -27,8 +40,105 @@ class PlannerAgent(BaseAgent):
     
     async def execute(self, game_url: str, game_analysis: str = None) -> Dict[str, Any]:
         """Generate 20+ test cases for the given game"""
+        if self.llm_client is not None:
+            results = await self.execute_batch([game_url], {game_url: game_analysis})
+            return results[game_url]
+        
         self.log(f"Generating test cases for {game_url}")
+        return self._build_result(self._generate_template_tests(), "templates")
+    
+    async def execute_batch(self, game_urls: List[str], game_analyses: Optional[Dict[str, str]] = None) -> Dict[str, Dict[str, Any]]:
+        """Plan several games with a single batched model call, falling back to templates"""
+        game_analyses = game_analyses or {}
+        self.log(f"Generating test cases for {len(game_urls)} game(s)")
+        
+        # Template tests don't depend on the game: build them once for the whole batch
+        templates: List[Dict[str, Any]] = []
+        def template_tests() -> List[Dict[str, Any]]:
+            if not templates:
+                templates.extend(self._generate_template_tests())
+            return [dict(t) for t in templates]
+        
+        if self.llm_client is None:
+            return {url: self._build_result(template_tests(), "templates") for url in game_urls}
+        
+        prompts = [
+            PROMPT_TEMPLATE.format(
+                game_url=url,
+                game_analysis=game_analyses.get(url) or "Not provided",
+                count=self.min_tests
+            )
+            for url in game_urls
+        ]
+        completions = await self.llm_client.complete_batch(prompts)
+        
+        results = {}
+        for url, completion in zip(game_urls, completions):
+            model_tests = self._parse_model_tests(completion)
+            if model_tests:
+                results[url] = self._build_result(self._top_up(model_tests, template_tests), "model")
+            else:
+                self.log(f"Model planning unavailable for {url}, using templates")
+                results[url] = self._build_result(template_tests(), "templates")
+        
+        return results
+    
+    def _build_result(self, test_cases: List[Dict[str, Any]], source: str) -> Dict[str, Any]:
+        return {
+            "status": "success",
+            "agent": self.name,
+            "planning_source": source,
+            "total_tests_generated": len(test_cases),
+            "test_cases": test_cases[:self.min_tests]
+        }
+    
+    def _parse_model_tests(self, completion: Optional[str]) -> List[Dict[str, Any]]:
+        """Parse and normalize model output; empty list means fall back"""
+        if not completion:
+            return []
+        
+        text = completion.strip()
+        start, end = text.find("["), text.rfind("]")
+        if start == -1 or end <= start:
+            return []
+        
+        try:
+            raw_tests = json.loads(text[start:end + 1])
+        except ValueError:
+            return []
+        
+        test_cases = []
+        for raw in raw_tests:
+            if not isinstance(raw, dict) or not raw.get("description"):
+                continue
+            priority = str(raw.get("priority", "medium")).lower()
+            test_type = str(raw.get("type", "functional")).lower()
+            test_cases.append({
+                "id": f"test_{len(test_cases) + 1}",
+                "description": str(raw["description"]),
+                "priority": priority if priority in VALID_PRIORITIES else "medium",
+                "type": test_type if test_type in VALID_TYPES else "functional",
+                "expected_result": str(raw.get("expected_result", "Test passes without errors"))
+            })
+        
+        return test_cases
+    
+    def _top_up(self, test_cases: List[Dict[str, Any]], template_tests=None) -> List[Dict[str, Any]]:
+        """Fill a short model plan with template tests"""
+        if len(test_cases) >= self.min_tests:
+            return test_cases
+        
+        seen = {t["description"] for t in test_cases}
+        for template_test in (template_tests or self._generate_template_tests)():
+            if len(test_cases) >= self.min_tests:
+                break
+            if template_test["description"] not in seen:
+                test_cases.append({**template_test, "id": f"test_{len(test_cases) + 1}"})
         
+        return test_cases
+    
+    def _generate_template_tests(self) -> List[Dict[str, Any]]:
+        """Generate test cases from the built-in templates"""
         test_cases = []
         
         # Generate test cases based on templates
@@ -104,9 +214,4 @@ class PlannerAgent(BaseAgent):
             }
             test_cases.append(test_case)
         
-        return {
-            "status": "success",
-            "agent": self.name,
-            "total_tests_generated": len(test_cases),
-            "test_cases": test_cases[:20]
-        }
+        return test_cases
@@ -0,0 +1,261 @@
+import json
+import math
+import threading
+from array import array
+from pathlib import Path
+from datetime import datetime
+from typing import Dict, List, Any, Optional
+
+from .performance import PERF_METRICS
+from .report_stream import iter_section
+
+# Status codes stored in the per-test column
+STATUS_CODES = {"passed": 0, "failed": 1, "error": 2, "skipped": 3}
+UNKNOWN_STATUS = 9
+
+
+class StringDictionary:
+    """Dictionary encoding for repeated string columns"""
+
+    def __init__(self):
+        self.values: List[str] = []
+        self._index: Dict[str, int] = {}
+
+    def encode(self, value: str) -> int:
+        if value not in self._index:
+            self._index[value] = len(self.values)
+            self.values.append(value)
+        return self._index[value]
+
+    def lookup(self, value: str) -> Optional[int]:
+        return self._index.get(value)
+
+
+class TrendAnalytics:
+    """Columnar, incrementally built table over the saved report archive.
+
+    One row per run (report) and one row per test result, stored in typed
+    ``array`` columns with dictionary-encoded strings, so trend queries scan
+    compact numeric columns instead of re-reading report JSON.
+
+    ``refresh`` may run from worker threads while queries run on the event
+    loop: refreshes are serialized by a lock, and each row's length-defining
+    column (``run_ids``, ``test_run``) is appended last, so readers never
+    see a partially written row.
+    """
+
+    def __init__(self, reports_dir: str = "reports"):
+        self.reports_dir = Path(reports_dir)
+        self._ingested: Dict[str, float] = {}  # file name -> mtime
+        self._refresh_lock = threading.Lock()
+        self.games = StringDictionary()
+        self.tests = StringDictionary()
+
+        # Run table
+        self.run_ids: List[str] = []
+        self.run_game = array("I")
+        self.run_ts_ms = array("q")
+        self.run_total = array("I")
+        self.run_passed = array("I")
+        self.run_failed = array("I")
+        self.run_duration = array("d")
+        self.run_perf = {metric: array("d") for metric in PERF_METRICS}
+
+        # Test result table
+        self.test_run = array("I")
+        self.test_key = array("I")
+        self.test_status = array("B")
+        self.test_duration = array("d")
+
+    def refresh(self) -> int:
+        """Ingest reports that appeared or changed since the last refresh"""
+        if not self.reports_dir.exists():
+            return 0
+
+        added = 0
+        with self._refresh_lock:
+            for path in sorted(self.reports_dir.glob("report_*.json")):
+                mtime = path.stat().st_mtime
+                if self._ingested.get(path.name) == mtime:
+                    continue
+                try:
+                    with open(path, "r") as f:
+                        report = json.load(f)
+                except (OSError, ValueError):
+                    continue
+                if path.name not in self._ingested:
+                    # Rewritten files keep their first ingestion to stay append-only
+                    self.ingest_report(report)
+                    added += 1
+                self._ingested[path.name] = mtime
+
+        return added
+
+    def ingest_report(self, report: Dict[str, Any]) -> None:
+        """Append one report's run row and test rows (call with the refresh lock held)"""
+        run_idx = len(self.run_ids)
+        summary = report.get("execution_summary", {})
+        if "sections" in report:
+            # Streamed report: test rows are read lazily from its JSON Lines section
+            test_results = iter_section(str(self.reports_dir), report, "test_results")
+            test_count = report["sections"].get("test_results", {}).get("count", 0)
+        else:
+            test_results = report.get("test_results", [])
+            test_count = len(test_results)
+
+        self.run_game.append(self.games.encode(report.get("game_url", "")))
+        self.run_ts_ms.append(self._to_ms(report.get("timestamp")))
+        self.run_total.append(int(summary.get("test_cases_executed", test_count) or 0))
+        self.run_passed.append(int(summary.get("passed_count", 0) or 0))
+        self.run_failed.append(int(summary.get("failed_count", 0) or 0))
+        self.run_duration.append(self._parse_seconds(report.get("metadata", {}).get("total_duration")))
+        perf_metrics = report.get("performance", {}).get("metrics", {})
+        for metric, column in self.run_perf.items():
+            value = perf_metrics.get(metric)
+            column.append(float(value) if value is not None else math.nan)
+
+        for test in test_results:
+            self.test_key.append(self.tests.encode(test.get("description") or test.get("test_id") or ""))
+            self.test_status.append(STATUS_CODES.get(test.get("status"), UNKNOWN_STATUS))
+            duration = test.get("duration_seconds")
+            self.test_duration.append(float(duration) if duration is not None else math.nan)
+            self.test_run.append(run_idx)
+        # Published last: queries only look at runs up to len(run_ids)
+        self.run_ids.append(report.get("report_id", f"run_{run_idx}"))
+
+    @property
+    def run_count(self) -> int:
+        return len(self.run_ids)
+
+    def _run_mask(self, game_url: Optional[str], since_ms: Optional[int], until_ms: Optional[int]) -> List[int]:
+        """Indexes of runs matching the filters"""
+        game_code = self.games.lookup(game_url) if game_url else None
+        if game_url and game_code is None:
+            return []
+
+        selected = []
+        for idx in range(len(self.run_ids)):
+            if game_code is not None and self.run_game[idx] != game_code:
+                continue
+            ts = self.run_ts_ms[idx]
+            if since_ms is not None and ts < since_ms:
+                continue
+            if until_ms is not None and ts >= until_ms:
+                continue
+            selected.append(idx)
+        return selected
+
+    def pass_rate_trend(self, game_url: str = None, window_ms: int = 3_600_000,
+                        since_ms: int = None, until_ms: int = None) -> List[Dict[str, Any]]:
+        """Pass rate per time window"""
+        windows: Dict[int, List[int]] = {}
+        for idx in self._run_mask(game_url, since_ms, until_ms):
+            bucket = self.run_ts_ms[idx] // window_ms * window_ms
+            totals = windows.setdefault(bucket, [0, 0, 0])
+            totals[0] += 1
+            totals[1] += self.run_total[idx]
+            totals[2] += self.run_passed[idx]
+
+        return [
+            {
+                "window_start_ms": start,
+                "window_start": datetime.fromtimestamp(start / 1000).isoformat(),
+                "runs": runs,
+                "tests": tests,
+                "passed": passed,
+                "pass_rate": round(passed / tests * 100, 1) if tests else 0.0
+            }
+            for start, (runs, tests, passed) in sorted(windows.items())
+        ]
+
+    def failure_frequency(self, game_url: str = None, since_ms: int = None, until_ms: int = None,
+                          limit: int = 20) -> List[Dict[str, Any]]:
+        """Tests ordered by how often they failed"""
+        selected = set(self._run_mask(game_url, since_ms, until_ms))
+        runs: Dict[int, int] = {}
+        failures: Dict[int, int] = {}
+
+        failed_code = STATUS_CODES["failed"]
+        for row in range(len(self.test_run)):
+            if self.test_run[row] not in selected:
+                continue
+            key = self.test_key[row]
+            runs[key] = runs.get(key, 0) + 1
+            if self.test_status[row] == failed_code:
+                failures[key] = failures.get(key, 0) + 1
+
+        ranked = sorted(failures.items(), key=lambda item: (-item[1], -item[1] / runs[item[0]]))
+        return [
+            {
+                "test": self.tests.values[key],
+                "runs": runs[key],
+                "failures": count,
+                "failure_rate": round(count / runs[key] * 100, 1)
+            }
+            for key, count in ranked[:limit]
+        ]
+
+    def duration_regressions(self, game_url: str = None, window_ms: int = 86_400_000,
+                             threshold: float = 0.2, now_ms: int = None) -> List[Dict[str, Any]]:
+        """Tests whose mean duration in the latest window exceeds the earlier baseline"""
+        selected = self._run_mask(game_url, None, None)
+        if not selected:
+            return []
+
+        now_ms = now_ms if now_ms is not None else max(self.run_ts_ms[idx] for idx in selected) + 1
+        window_start = now_ms - window_ms
+        recent_runs = {idx for idx in selected if window_start <= self.run_ts_ms[idx] < now_ms}
+        baseline_runs = {idx for idx in selected if self.run_ts_ms[idx] < window_start}
+
+        recent: Dict[int, List[float]] = {}
+        baseline: Dict[int, List[float]] = {}
+        for row in range(len(self.test_run)):
+            duration = self.test_duration[row]
+            if math.isnan(duration):
+                continue
+            run = self.test_run[row]
+            target = recent if run in recent_runs else baseline if run in baseline_runs else None
+            if target is not None:
+                sums = target.setdefault(self.test_key[row], [0.0, 0])
+                sums[0] += duration
+                sums[1] += 1
+
+        regressions = []
+        for key, (recent_sum, recent_count) in recent.items():
+            if key not in baseline:
+                continue
+            base_mean = baseline[key][0] / baseline[key][1]
+            recent_mean = recent_sum / recent_count
+            if base_mean > 0 and (recent_mean - base_mean) / base_mean > threshold:
+                regressions.append({
+                    "test": self.tests.values[key],
+                    "baseline_mean_seconds": round(base_mean, 3),
+                    "recent_mean_seconds": round(recent_mean, 3),
+                    "change_percent": round((recent_mean - base_mean) / base_mean * 100, 1)
+                })
+
+        return sorted(regressions, key=lambda r: -r["change_percent"])
+
+    def performance_baseline(self, game_url: str, last_n: int = 5) -> Dict[str, Any]:
+        """Mean of each performance metric over the game's last N runs that recorded it"""
+        runs = sorted(self._run_mask(game_url, None, None), key=lambda idx: self.run_ts_ms[idx])
+        baseline = {}
+        for metric, column in self.run_perf.items():
+            values = [column[idx] for idx in runs if not math.isnan(column[idx])][-last_n:]
+            if values:
+                baseline[metric] = {"mean": round(sum(values) / len(values), 1), "runs": len(values)}
+        return baseline
+
+    @staticmethod
+    def _to_ms(timestamp: Optional[str]) -> int:
+        try:
+            return int(datetime.fromisoformat(timestamp).timestamp() * 1000)
+        except (TypeError, ValueError):
+            return 0
+
+    @staticmethod
+    def _parse_seconds(value: Any) -> float:
+        try:
+            return float(str(value).split()[0])
+        except (TypeError, ValueError, IndexError):
+            return math.nan
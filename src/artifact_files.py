@@ -0,0 +1,91 @@
+import mimetypes
+import os
+from pathlib import Path
+from typing import Dict, List, Any
+
+from starlette.datastructures import Headers
+from starlette.requests import Request
+from starlette.responses import FileResponse, Response
+from starlette.types import Receive, Scope, Send
+
+from .compression import INCOMPRESSIBLE_TYPES, negotiate_encoding
+
+mimetypes.add_type("video/webm", ".webm")
+mimetypes.add_type("video/mp4", ".mp4")
+
+
+class ArtifactFileResponse(FileResponse):
+    """FileResponse that streams in bounded chunks and yields text to on-the-fly compression.
+
+    Range/If-Range requests and HEAD are handled by FileResponse. When the
+    server offers the ``http.response.pathsend`` extension the file is sent
+    by the server itself (zero-copy, sendfile where available); otherwise it
+    is read chunk by chunk, so memory per request stays at one chunk.
+    """
+
+    chunk_size = 256 * 1024
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        compressible = not self.media_type.startswith(INCOMPRESSIBLE_TYPES)
+        headers = Headers(scope=scope)
+        if compressible and "range" not in headers and negotiate_encoding(headers.get("accept-encoding", "")):
+            # Let CompressionMiddleware see the body instead of handing the path to the server
+            extensions = {k: v for k, v in scope.get("extensions", {}).items() if k != "http.response.pathsend"}
+            scope = {**scope, "extensions": extensions}
+        await super().__call__(scope, receive, send)
+
+
+class ArtifactFiles:
+    """Read access to files under the artifacts directory"""
+
+    def __init__(self, root_dir: str = "artifacts"):
+        self.root = Path(root_dir)
+
+    def resolve(self, relative_path: str) -> Path:
+        """Path of an artifact; FileNotFoundError for missing, hidden or out-of-root paths"""
+        root = self.root.resolve()
+        path = (root / relative_path).resolve()
+        if root not in path.parents or not path.is_file():
+            raise FileNotFoundError(relative_path)
+        if any(part.startswith(".") for part in path.relative_to(root).parts):
+            raise FileNotFoundError(relative_path)  # internal state such as .shipping manifests
+        return path
+
+    def list_files(self) -> List[Dict[str, Any]]:
+        if not self.root.exists():
+            return []
+
+        files = []
+        for dirpath, dirnames, filenames in os.walk(self.root):
+            dirnames[:] = sorted(d for d in dirnames if not d.startswith("."))
+            for filename in sorted(filenames):
+                if filename.startswith("."):
+                    continue
+                path = Path(dirpath) / filename
+                relative = path.relative_to(self.root).as_posix()
+                files.append({
+                    "name": relative,
+                    "size_bytes": path.stat().st_size,
+                    "content_type": mimetypes.guess_type(filename)[0] or "application/octet-stream",
+                    "url": f"/api/artifacts/files/{relative}"
+                })
+        return files
+
+    def response(self, request: Request, relative_path: str) -> Response:
+        """Streaming response for one artifact, or 304 when the client's copy is current"""
+        path = self.resolve(relative_path)
+        stat_result = path.stat()
+        response = ArtifactFileResponse(
+            path, stat_result=stat_result, filename=path.name, content_disposition_type="inline",
+            media_type=mimetypes.guess_type(path.name)[0] or "application/octet-stream",
+            headers={"Cache-Control": "no-cache"}
+        )
+
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match and response.headers["etag"] in [t.strip() for t in if_none_match.split(",")]:
+            return Response(status_code=304, headers={
+                "ETag": response.headers["etag"],
+                "Last-Modified": response.headers["last-modified"],
+                "Cache-Control": "no-cache"
+            })
+        return response
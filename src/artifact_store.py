@@ -0,0 +1,321 @@
+import asyncio
+import datetime as dt
+import hashlib
+import hmac
+import io
+import json
+import os
+import tarfile
+from pathlib import Path
+from typing import Dict, List, Any, Iterable, Optional
+from urllib.parse import quote
+
+import httpx
+
+
+class LocalObjectStore:
+    """Directory-backed stand-in for an S3-compatible bucket"""
+
+    def __init__(self, root_dir: str = "object_store", bucket: str = "artifacts"):
+        self.bucket = bucket
+        self.root = Path(root_dir) / bucket
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def uri(self, key: str) -> str:
+        return f"local://{self.bucket}/{key}"
+
+    async def put_object(self, key: str, data: bytes, content_type: str = "application/gzip") -> None:
+        path = self.root / key
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(path.name + ".part")
+        await asyncio.to_thread(tmp_path.write_bytes, data)
+        tmp_path.replace(path)
+
+    async def head_object(self, key: str) -> bool:
+        return (self.root / key).exists()
+
+    async def close(self) -> None:
+        pass
+
+
+class S3CompatibleStore:
+    """Minimal S3-compatible client (path-style PUT/HEAD, AWS SigV4) over a pooled HTTP client"""
+
+    def __init__(self, endpoint: str, bucket: str, access_key: str, secret_key: str,
+                 region: str = "us-east-1", max_connections: int = 8, timeout: float = 60.0):
+        self.endpoint = endpoint.rstrip("/")
+        self.bucket = bucket
+        self.access_key = access_key
+        self.secret_key = secret_key
+        self.region = region
+        self.client = httpx.AsyncClient(
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)
+        )
+
+    def uri(self, key: str) -> str:
+        return f"s3://{self.bucket}/{key}"
+
+    def _sign(self, method: str, key: str, payload_hash: str, extra_headers: Dict[str, str]) -> Dict[str, str]:
+        now = dt.datetime.now(dt.timezone.utc)
+        amz_date = now.strftime("%Y%m%dT%H%M%SZ")
+        date_stamp = now.strftime("%Y%m%d")
+        host = httpx.URL(self.endpoint).netloc.decode()
+        canonical_uri = "/" + quote(f"{self.bucket}/{key}", safe="/-_.~")
+
+        headers = {"host": host, "x-amz-content-sha256": payload_hash, "x-amz-date": amz_date}
+        headers.update({k.lower(): v for k, v in extra_headers.items()})
+        signed_headers = ";".join(sorted(headers))
+        canonical_headers = "".join(f"{k}:{headers[k].strip()}\n" for k in sorted(headers))
+
+        canonical_request = "\n".join([method, canonical_uri, "", canonical_headers, signed_headers, payload_hash])
+        scope = f"{date_stamp}/{self.region}/s3/aws4_request"
+        string_to_sign = "\n".join([
+            "AWS4-HMAC-SHA256", amz_date, scope,
+            hashlib.sha256(canonical_request.encode()).hexdigest()
+        ])
+
+        signing_key = f"AWS4{self.secret_key}".encode()
+        for part in (date_stamp, self.region, "s3", "aws4_request"):
+            signing_key = hmac.new(signing_key, part.encode(), hashlib.sha256).digest()
+        signature = hmac.new(signing_key, string_to_sign.encode(), hashlib.sha256).hexdigest()
+
+        headers["authorization"] = (
+            f"AWS4-HMAC-SHA256 Credential={self.access_key}/{scope}, "
+            f"SignedHeaders={signed_headers}, Signature={signature}"
+        )
+        del headers["host"]
+        return headers
+
+    def _url(self, key: str) -> str:
+        return f"{self.endpoint}/{quote(f'{self.bucket}/{key}', safe='/-_.~')}"
+
+    async def put_object(self, key: str, data: bytes, content_type: str = "application/gzip") -> None:
+        payload_hash = hashlib.sha256(data).hexdigest()
+        headers = self._sign("PUT", key, payload_hash, {"content-type": content_type})
+        response = await self.client.put(self._url(key), content=data, headers=headers)
+        response.raise_for_status()
+
+    async def head_object(self, key: str) -> bool:
+        headers = self._sign("HEAD", key, hashlib.sha256(b"").hexdigest(), {})
+        response = await self.client.head(self._url(key), headers=headers)
+        return response.status_code == 200
+
+    async def close(self) -> None:
+        await self.client.aclose()
+
+
+def create_store_from_env():
+    """Build the configured object store, or None when artifact shipping is disabled"""
+    kind = os.getenv("ARTIFACT_STORE", "").lower()
+    if kind == "local":
+        return LocalObjectStore(os.getenv("ARTIFACT_STORE_DIR", "object_store"),
+                                os.getenv("ARTIFACT_BUCKET", "artifacts"))
+    if kind == "s3":
+        return S3CompatibleStore(
+            endpoint=os.environ["S3_ENDPOINT"],
+            bucket=os.getenv("ARTIFACT_BUCKET", "artifacts"),
+            access_key=os.environ["S3_ACCESS_KEY"],
+            secret_key=os.environ["S3_SECRET_KEY"],
+            region=os.getenv("S3_REGION", "us-east-1"),
+            max_connections=int(os.getenv("ARTIFACT_UPLOAD_CONCURRENCY", "4"))
+        )
+    return None
+
+
+class ByteBudget:
+    """Bounds the bytes held in memory by batches being compressed or uploaded"""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.in_flight = 0
+        self.peak = 0
+        self._condition = asyncio.Condition()
+
+    async def acquire(self, size: int) -> None:
+        async with self._condition:
+            # An oversized batch may proceed alone rather than deadlock
+            await self._condition.wait_for(
+                lambda: self.in_flight == 0 or self.in_flight + size <= self.max_bytes
+            )
+            self.in_flight += size
+            self.peak = max(self.peak, self.in_flight)
+
+    async def release(self, size: int) -> None:
+        async with self._condition:
+            self.in_flight -= size
+            self._condition.notify_all()
+
+
+class ShippedArtifacts:
+    """Outcome of one shipping run: stats, and the archive each uploaded file went into"""
+
+    def __init__(self, store, stats: Dict[str, Any], member_to_key: Dict[str, str]):
+        self.store = store
+        self.stats = stats
+        self.member_to_key = member_to_key
+
+    def annotate(self, item: Dict[str, Any]) -> Dict[str, Any]:
+        """Point an artifact item at its uploaded archive (``shipped: False`` when it was not)"""
+        key = self.member_to_key.get(str(Path(item.get("path") or "")))
+        if key:
+            item["uri"] = f"{self.store.uri(key)}#{item['path']}"
+            item["archive"] = key
+            item["shipped"] = True
+        else:
+            item["shipped"] = False
+        return item
+
+    def to_dict(self) -> Dict[str, Any]:
+        return dict(self.stats)
+
+
+class ArtifactShipper:
+    """Packs report artifacts into compressed batches and uploads them concurrently.
+
+    Uploaded batches are recorded in a per-report manifest, so a failed or
+    interrupted run resumes by uploading only the missing batches.
+    """
+
+    def __init__(self, store, batch_max_bytes: int = 8 * 1024 * 1024,
+                 max_in_flight_bytes: int = 32 * 1024 * 1024, concurrency: int = 4,
+                 max_attempts: int = 3, manifest_dir: str = "artifacts/.shipping"):
+        self.store = store
+        self.batch_max_bytes = batch_max_bytes
+        self.max_in_flight_bytes = max_in_flight_bytes
+        self.concurrency = concurrency
+        self.max_attempts = max_attempts
+        self.manifest_dir = Path(manifest_dir)
+        self.manifest_dir.mkdir(parents=True, exist_ok=True)
+
+    @classmethod
+    def from_env(cls) -> Optional["ArtifactShipper"]:
+        store = create_store_from_env()
+        if store is None:
+            return None
+        return cls(
+            store,
+            batch_max_bytes=int(os.getenv("ARTIFACT_BATCH_MAX_BYTES", str(8 * 1024 * 1024))),
+            max_in_flight_bytes=int(os.getenv("ARTIFACT_MAX_IN_FLIGHT_BYTES", str(32 * 1024 * 1024))),
+            concurrency=int(os.getenv("ARTIFACT_UPLOAD_CONCURRENCY", "4"))
+        )
+
+    def _plan_batches(self, paths: List[Path]) -> List[List[Path]]:
+        """Group files into batches of at most batch_max_bytes (raw size)"""
+        batches: List[List[Path]] = []
+        current: List[Path] = []
+        current_bytes = 0
+
+        for path in paths:
+            size = path.stat().st_size
+            if current and current_bytes + size > self.batch_max_bytes:
+                batches.append(current)
+                current, current_bytes = [], 0
+            current.append(path)
+            current_bytes += size
+
+        if current:
+            batches.append(current)
+        return batches
+
+    @staticmethod
+    def _batch_key(report_id: str, index: int, batch: List[Path]) -> str:
+        fingerprint = hashlib.sha256()
+        for path in batch:
+            stat = path.stat()
+            fingerprint.update(f"{path}:{stat.st_size}:{stat.st_mtime_ns}\n".encode())
+        return f"{report_id}/batch_{index:04d}_{fingerprint.hexdigest()[:12]}.tar.gz"
+
+    @staticmethod
+    def _build_archive(batch: List[Path]) -> bytes:
+        buffer = io.BytesIO()
+        with tarfile.open(fileobj=buffer, mode="w:gz", compresslevel=6) as archive:
+            for path in batch:
+                archive.add(str(path), arcname=str(path))
+        return buffer.getvalue()
+
+    def _load_manifest(self, report_id: str) -> Dict[str, Any]:
+        path = self.manifest_dir / f"{report_id}.json"
+        if not path.exists():
+            return {"uploaded": {}}
+        with open(path, "r") as f:
+            return json.load(f)
+
+    def _save_manifest(self, report_id: str, manifest: Dict[str, Any]) -> None:
+        path = self.manifest_dir / f"{report_id}.json"
+        tmp_path = path.with_suffix(".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(manifest, f, indent=2)
+        tmp_path.replace(path)
+
+    async def ship(self, report: Dict[str, Any]) -> Dict[str, Any]:
+        """Upload the report's artifacts and rewrite its artifact references in place"""
+        items = report.get("artifacts", {}).get("items", [])
+        shipped = await self.ship_paths(report.get("report_id", "report"), (item.get("path") for item in items))
+        for item in items:
+            shipped.annotate(item)
+        report.setdefault("artifacts", {})["shipping"] = shipped.to_dict()
+        return report
+
+    async def ship_paths(self, report_id: str, paths: Iterable[Optional[str]]) -> "ShippedArtifacts":
+        """Upload the distinct existing files among ``paths``, which are consumed lazily"""
+        unique = []
+        seen = set()
+        for raw in paths:
+            path = Path(raw or "")
+            if raw and path not in seen and path.is_file():
+                seen.add(path)
+                unique.append(path)
+
+        batches = self._plan_batches(unique)
+        manifest = self._load_manifest(report_id)
+        budget = ByteBudget(self.max_in_flight_bytes)
+        slots = asyncio.Semaphore(self.concurrency)
+        stats = {"batches": len(batches), "uploaded": 0, "resumed": 0, "failed": 0,
+                 "bytes_raw": 0, "bytes_compressed": 0}
+        member_to_key: Dict[str, str] = {}
+
+        async def ship_batch(index: int, batch: List[Path]) -> None:
+            key = self._batch_key(report_id, index, batch)
+            if key in manifest["uploaded"] or await self.store.head_object(key):
+                manifest["uploaded"].setdefault(key, [str(p) for p in batch])
+                stats["resumed"] += 1
+                member_to_key.update({str(p): key for p in batch})
+                return
+
+            raw_size = sum(p.stat().st_size for p in batch)
+            await budget.acquire(raw_size)
+            try:
+                data = await asyncio.to_thread(self._build_archive, batch)
+                async with slots:
+                    for attempt in range(1, self.max_attempts + 1):
+                        try:
+                            await self.store.put_object(key, data)
+                            break
+                        except Exception:
+                            if attempt == self.max_attempts:
+                                raise
+                            await asyncio.sleep(0.2 * 2 ** (attempt - 1))
+            except Exception:
+                stats["failed"] += 1
+                return
+            finally:
+                await budget.release(raw_size)
+
+            stats["uploaded"] += 1
+            stats["bytes_raw"] += raw_size
+            stats["bytes_compressed"] += len(data)
+            manifest["uploaded"][key] = [str(p) for p in batch]
+            member_to_key.update({str(p): key for p in batch})
+            # Persist progress after every batch so an interrupted run can resume
+            self._save_manifest(report_id, manifest)
+
+        await asyncio.gather(*(ship_batch(i, batch) for i, batch in enumerate(batches)))
+        self._save_manifest(report_id, manifest)
+
+        stats = {"status": "complete" if stats["failed"] == 0 else "partial",
+                 "peak_in_flight_bytes": budget.peak, **stats}
+        return ShippedArtifacts(self.store, stats, member_to_key)
+
+    async def close(self) -> None:
+        await self.store.close()
@@ -0,0 +1,89 @@
+import asyncio
+import heapq
+import itertools
+from contextlib import asynccontextmanager
+from typing import Dict, List, Any, Tuple
+
+class CapacityPool:
+    """Global executor capacity shared across workflows with weighted fair queueing.
+
+    Each (tenant, game) pair is a flow. A tenant's weight is split evenly between
+    its active flows, so a tenant running many games does not get more capacity
+    than a tenant running one, and a large suite cannot starve smaller ones.
+    Slots are granted in order of virtual finish time (start-time fair queueing).
+    """
+
+    def __init__(self, capacity: int = 4):
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        self.capacity = capacity
+        self.in_use = 0
+        self.virtual_time = 0.0
+        self._queue: List[Tuple[float, int, float, asyncio.Future]] = []
+        self._seq = itertools.count()
+        self._last_finish: Dict[Tuple[str, str], float] = {}
+        self._active_flows: Dict[Tuple[str, str], int] = {}
+        self._granted: Dict[str, int] = {}
+
+    @asynccontextmanager
+    async def slot(self, tenant: str, game_url: str = "", weight: float = 1.0, cost: float = 1.0):
+        """Hold one executor slot for the duration of the block"""
+        flow = (tenant, game_url)
+        self._active_flows[flow] = self._active_flows.get(flow, 0) + 1
+        try:
+            await self._acquire(flow, weight, cost)
+            try:
+                yield
+            finally:
+                self._release()
+        finally:
+            self._active_flows[flow] -= 1
+            if self._active_flows[flow] == 0:
+                del self._active_flows[flow]
+                self._last_finish.pop(flow, None)
+
+    async def _acquire(self, flow: Tuple[str, str], weight: float, cost: float) -> None:
+        tenant = flow[0]
+        tenant_flows = sum(1 for f in self._active_flows if f[0] == tenant)
+        flow_weight = max(weight, 1e-6) / max(tenant_flows, 1)
+
+        start = max(self.virtual_time, self._last_finish.get(flow, 0.0))
+        finish = start + cost / flow_weight
+        self._last_finish[flow] = finish
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._queue, (finish, next(self._seq), start, future))
+        self._dispatch()
+
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # Slot was granted just before cancellation; give it back
+                self._release()
+            raise
+
+        self._granted[tenant] = self._granted.get(tenant, 0) + 1
+
+    def _release(self) -> None:
+        self.in_use -= 1
+        self._dispatch()
+
+    def _dispatch(self) -> None:
+        while self.in_use < self.capacity and self._queue:
+            _, _, start, future = heapq.heappop(self._queue)
+            if future.done():
+                continue
+            self.virtual_time = max(self.virtual_time, start)
+            self.in_use += 1
+            future.set_result(True)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Snapshot of pool utilization"""
+        return {
+            "capacity": self.capacity,
+            "in_use": self.in_use,
+            "queued": sum(1 for entry in self._queue if not entry[3].done()),
+            "active_flows": len(self._active_flows),
+            "granted_by_tenant": dict(self._granted)
+        }
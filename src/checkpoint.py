@@ -0,0 +1,156 @@
+import json
+import os
+import queue
+import threading
+from pathlib import Path
+from datetime import datetime
+from typing import Dict, List, Any, Optional
+
+_STOP = object()
+
+
+class WorkflowJournal:
+    """Append-only JSON Lines checkpoint journal for one workflow.
+
+    Every record is a single compact line. Appends only enqueue the line; a
+    writer thread keeps the file open and writes and fsyncs whatever has
+    queued up as one group, so the event loop never blocks on disk and many
+    concurrent results cost one fsync. A crash loses at most the records of
+    the group being written; a torn final line is ignored on load. ``flush``
+    waits for everything appended so far to be durable, ``close`` also stops
+    the writer.
+    """
+
+    def __init__(self, workflow_id: str, journal_dir: str = "checkpoints", fsync: bool = True):
+        self.workflow_id = workflow_id
+        self.journal_dir = Path(journal_dir)
+        self.journal_dir.mkdir(parents=True, exist_ok=True)
+        self.path = self.journal_dir / f"{workflow_id}.jsonl"
+        self.fsync = fsync
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._writer: Optional[threading.Thread] = None
+        self._writer_lock = threading.Lock()
+
+    def exists(self) -> bool:
+        return self.path.exists()
+
+    def _append(self, record: Dict[str, Any]) -> None:
+        record["ts"] = datetime.now().isoformat()
+        line = json.dumps(record, separators=(",", ":"), default=str)
+        self._queue.put(line + "\n")
+        if self._writer is None:
+            with self._writer_lock:
+                if self._writer is None:
+                    self._writer = threading.Thread(target=self._write_loop, name=f"journal-{self.workflow_id}",
+                                                    daemon=True)
+                    self._writer.start()
+
+    def _write_loop(self) -> None:
+        with open(self.path, "a") as f:
+            while True:
+                item = self._queue.get()
+                lines, waiters, stop = [], [], False
+                while True:
+                    if item is _STOP:
+                        stop = True
+                    elif isinstance(item, threading.Event):
+                        waiters.append(item)
+                    else:
+                        lines.append(item)
+                    try:
+                        item = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+
+                if lines:
+                    f.write("".join(lines))
+                    f.flush()
+                    if self.fsync:
+                        os.fsync(f.fileno())
+                for waiter in waiters:
+                    waiter.set()
+                if stop:
+                    return
+
+    def flush(self) -> None:
+        """Block until every record appended so far is written (and fsynced)"""
+        if self._writer is None:
+            return
+        done = threading.Event()
+        self._queue.put(done)
+        done.wait()
+
+    def close(self) -> None:
+        """Write out pending records and stop the writer thread"""
+        with self._writer_lock:
+            writer, self._writer = self._writer, None
+        if writer is not None:
+            self._queue.put(_STOP)
+            writer.join()
+
+    def record_start(self, game_url: str, tenant: str, weight: float, options: Dict[str, Any] = None) -> None:
+        self._append({"t": "start", "game_url": game_url, "tenant": tenant, "weight": weight,
+                      "options": options or {}})
+
+    def record_stage(self, stage: str, result: Dict[str, Any]) -> None:
+        self._append({"t": "stage", "stage": stage, "result": result})
+
+    def record_test(self, result: Dict[str, Any]) -> None:
+        self._append({"t": "test", "test_id": result.get("test_id"), "result": result})
+
+    def record_end(self, status: str, error: Optional[str] = None) -> None:
+        record = {"t": "end", "status": status}
+        if error:
+            record["error"] = error
+        self._append(record)
+
+    def load(self) -> Dict[str, Any]:
+        """Replay the journal into the latest known workflow state"""
+        state = {
+            "workflow_id": self.workflow_id,
+            "meta": {},
+            "stages": {},
+            "tests": {},
+            "status": None,
+            "error": None
+        }
+
+        if not self.exists():
+            return state
+
+        with open(self.path, "r") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # Torn write from an interrupted run
+                    continue
+
+                kind = record.get("t")
+                if kind == "start":
+                    state["meta"] = {
+                        "game_url": record.get("game_url"),
+                        "tenant": record.get("tenant", "default"),
+                        "weight": record.get("weight", 1.0),
+                        "options": record.get("options", {})
+                    }
+                elif kind == "stage":
+                    state["stages"][record["stage"]] = record.get("result", {})
+                elif kind == "test":
+                    state["tests"][record.get("test_id")] = record.get("result", {})
+                elif kind == "end":
+                    state["status"] = record.get("status")
+                    state["error"] = record.get("error")
+
+        return state
+
+    @staticmethod
+    def list_workflows(journal_dir: str = "checkpoints") -> List[str]:
+        """Workflow ids that have a journal on disk"""
+        path = Path(journal_dir)
+        if not path.exists():
+            return []
+        return sorted(p.stem for p in path.glob("*.jsonl"))
@@ -0,0 +1,130 @@
+import zlib
+from typing import Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli  # optional: enables "br" content encoding
+except ImportError:
+    brotli = None
+
+# Media that is already compressed, or streamed and must not be buffered
+INCOMPRESSIBLE_TYPES = ("image/", "video/", "audio/", "application/gzip", "application/zip",
+                        "application/x-gzip", "application/octet-stream", "text/event-stream")
+
+
+def negotiate_encoding(accept_encoding: str) -> Optional[str]:
+    """Preferred content encoding the client accepts: br (when available), then gzip"""
+    accepted = set()
+    for part in accept_encoding.split(","):
+        name, _, params = part.partition(";")
+        q = params.strip()[2:] if params.strip().startswith("q=") else "1"
+        try:
+            if float(q) > 0:
+                accepted.add(name.strip().lower())
+        except ValueError:
+            continue
+    if brotli is not None and "br" in accepted:
+        return "br"
+    if "gzip" in accepted:
+        return "gzip"
+    return None
+
+
+class _Compressor:
+    """Incremental gzip or brotli stream"""
+
+    def __init__(self, encoding: str):
+        if encoding == "br":
+            self._stream = brotli.Compressor(quality=4)
+        else:
+            self._stream = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)  # gzip container
+        self.encoding = encoding
+
+    def compress(self, data: bytes, final: bool) -> bytes:
+        if self.encoding == "br":
+            out = self._stream.process(data) if data else b""
+            return out + (self._stream.finish() if final else self._stream.flush())
+        out = self._stream.compress(data)
+        return out + self._stream.flush(zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH)
+
+
+class CompressionMiddleware:
+    """Streams br/gzip compression for compressible, complete responses.
+
+    Unlike Starlette's GZipMiddleware it leaves partial content (206),
+    already-encoded bodies and binary media untouched, so Range requests
+    against artifacts keep working, and it compresses chunk by chunk so
+    large text files are never buffered whole.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int = 1024):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message: Optional[Message] = None
+        compressor: Optional[_Compressor] = None
+        passthrough = False
+
+        async def send_compressed(message: Message) -> None:
+            nonlocal start_message, compressor, passthrough
+            if message["type"] == "http.response.start":
+                headers = Headers(raw=message["headers"])
+                content_type = headers.get("content-type", "")
+                passthrough = (
+                    message["status"] != 200
+                    or "content-encoding" in headers
+                    or content_type.startswith(INCOMPRESSIBLE_TYPES)
+                    or (headers.get("content-length") is not None
+                        and int(headers["content-length"]) < self.minimum_size)
+                )
+                if passthrough:
+                    await send(message)
+                else:
+                    start_message = message
+                return
+
+            if passthrough or message["type"] != "http.response.body":
+                # e.g. http.response.pathsend: the server sends the file itself
+                if start_message is not None:
+                    await send(start_message)
+                    start_message = None
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if start_message is not None:
+                if not more_body and len(body) < self.minimum_size:
+                    await send(start_message)
+                    await send(message)
+                    start_message = None
+                    passthrough = True
+                    return
+                compressor = _Compressor(encoding)
+                headers = MutableHeaders(raw=start_message["headers"])
+                headers["Content-Encoding"] = encoding
+                headers.add_vary_header("Accept-Encoding")
+                if "content-length" in headers:
+                    del headers["Content-Length"]
+                # Compressed bytes no longer line up with byte ranges of the file
+                if "accept-ranges" in headers:
+                    del headers["Accept-Ranges"]
+                await send(start_message)
+                start_message = None
+
+            await send({"type": "http.response.body", "body": compressor.compress(body, not more_body),
+                        "more_body": more_body})
+
+        await self.app(scope, receive, send_compressed)
@@ -0,0 +1,35 @@
+import uuid
+from datetime import datetime
+from typing import Dict, Any
+
+class ExecutionContext:
+    """Per-workflow execution state, isolated from other concurrent workflows"""
+
+    def __init__(self, game_url: str, tenant: str = "default", weight: float = 1.0, workflow_id: str = None):
+        self.workflow_id = workflow_id or f"workflow_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:8]}"
+        self.game_url = game_url
+        self.tenant = tenant
+        self.weight = weight
+        self.created_at = datetime.now()
+        self.execution_count = 0
+        self.executions_by_executor: Dict[str, int] = {}
+        self.live_summary = None  # RollingSummary fed as results arrive
+        self.navigation_cache: Dict[str, Any] = {}  # game_url -> navigation measurement (shared by tests)
+
+    def next_execution(self, executor_name: str) -> int:
+        """Record one test execution and return its sequence number in this workflow"""
+        self.execution_count += 1
+        self.executions_by_executor[executor_name] = self.executions_by_executor.get(executor_name, 0) + 1
+        return self.execution_count
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "workflow_id": self.workflow_id,
+            "game_url": self.game_url,
+            "tenant": self.tenant,
+            "weight": self.weight,
+            "created_at": self.created_at.isoformat(),
+            "execution_count": self.execution_count,
+            "executions_by_executor": dict(self.executions_by_executor),
+            "live_summary": self.live_summary.snapshot() if self.live_summary is not None else None
+        }
@@ -0,0 +1,345 @@
+import asyncio
+import math
+import os
+import random
+import re
+import time
+from abc import ABC, abstractmethod
+from typing import Dict, List, Any
+
+from .game_interaction import GameInteraction
+from .load_test import LoadTestConfig, LoadTestRunner, is_load_test, actions_for
+from .performance import PerformanceCapture, NavigationProbe
+from .retry import InfrastructureError
+
+# Capabilities a backend offers and a test may require
+HTTP = "http"          # fetch the page and its resources
+BROWSER = "browser"    # render the page and interact with it
+
+# Checks that only need the document and its resources, not a rendered page
+# ("http" alone would also match any description that merely contains a URL)
+HTTP_CHECK_PATTERNS = re.compile(
+    r"load time|performance|javascript error|console|status code|\bhttp (?:status|response|error)s?\b"
+    r"|resources? load", re.IGNORECASE
+)
+
+
+def required_capability(test_case: Dict[str, Any]) -> str:
+    """Cheapest capability that can validate a test"""
+    if test_case.get("requires") in (HTTP, BROWSER):
+        return test_case["requires"]
+    # Matrix profiles vary the rendered viewport, and load tests drive game sessions
+    if test_case.get("matrix_profile") or is_load_test(test_case):
+        return BROWSER
+    if HTTP_CHECK_PATTERNS.search(test_case.get("description", "")):
+        return HTTP
+    return BROWSER
+
+
+def apply_load_test(load: Dict[str, Any], execution_result: Dict[str, Any]) -> None:
+    """Fold a LoadTestRunner result into a test result"""
+    execution_result["load_test"] = load
+    execution_result["duration_seconds"] = load["elapsed_seconds"]
+    execution_result["evidence"] = (
+        f"Load test with {load['virtual_players']} virtual players: "
+        f"{load['throughput_per_second']} actions/s, error rate {load['error_rate'] * 100:.1f}%, "
+        f"p95 {load['latency_ms'].get('click', {}).get('p95', 0)} ms"
+    )
+    if not load["passed"]:
+        execution_result["status"] = "failed"
+
+
+class ExecutorBackend(ABC):
+    """A way of running a test against a game; ``cost`` is relative to a full browser (1.0)"""
+
+    name = "backend"
+    cost = 1.0
+    capabilities = frozenset()
+
+    def supports(self, test_case: Dict[str, Any]) -> bool:
+        return required_capability(test_case) in self.capabilities
+
+    @abstractmethod
+    async def run(self, test_case: Dict[str, Any], game_url: str, execution_result: Dict[str, Any],
+                  capture: PerformanceCapture, context, session=None, attempt: int = 1,
+                  recorder=None) -> None:
+        """Run the test body, updating execution_result in place; raises on infrastructure problems
+
+        ``recorder`` (a SessionRecorder) is given to backends that can record the session.
+        """
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"name": self.name, "cost": self.cost, "capabilities": sorted(self.capabilities)}
+
+
+class BrowserBackend(ExecutorBackend):
+    """Full browser session driven through GameInteraction"""
+
+    name = "browser"
+    cost = 1.0
+    capabilities = frozenset({HTTP, BROWSER})
+
+    def __init__(self, load_test_config: LoadTestConfig = None, artifacts_dir: str = "artifacts"):
+        self.load_test_config = load_test_config or LoadTestConfig()
+        self.artifacts_dir = artifacts_dir
+
+    async def run(self, test_case: Dict[str, Any], game_url: str, execution_result: Dict[str, Any],
+                  capture: PerformanceCapture, context, session=None, attempt: int = 1,
+                  recorder=None) -> None:
+        if is_load_test(test_case):
+            # Every virtual player's action latency feeds the test's response times
+            runner = LoadTestRunner(game_url, self.load_test_config, self.artifacts_dir)
+            apply_load_test(await runner.run(test_case, capture), execution_result)
+            return
+
+        # Matrix tests arrive with their profile's warm session; others open their own
+        own_session = session is None
+        if own_session:
+            session = GameInteraction(self.artifacts_dir)
+            opened = await session.open_game(game_url)
+            if opened.get("status") != "success":
+                raise InfrastructureError(f"Browser could not open {game_url}: {opened.get('message')}")
+
+        if recorder is not None:
+            await recorder.start(session.capture_frame)
+
+        failures = []
+        try:
+            for step in actions_for(test_case, 1):
+                if recorder is not None:
+                    await recorder.mark_step(f"{step['action']} {step['target']}", **step)
+                start = time.perf_counter()
+                outcome = await session.execute_game_action(step["action"], step["target"])
+                capture.record_action(step["action"], (time.perf_counter() - start) * 1000)
+                if not outcome.get("success", True):
+                    failures.append(outcome.get("response", f"{step['action']} on {step['target']} failed"))
+            if recorder is not None:
+                await recorder.mark_step("end")
+        finally:
+            if own_session:
+                await session.close_game()
+
+        if failures:
+            execution_result["status"] = "failed"
+            execution_result["evidence"] = "; ".join(failures)
+
+
+class HttpBackend(ExecutorBackend):
+    """Plain HTTP checks of the document and its subresources, no rendering"""
+
+    name = "http"
+    cost = 0.1
+    capabilities = frozenset({HTTP})
+
+    def __init__(self, timeout: float = 10.0):
+        self.probe = NavigationProbe(enabled=True, timeout=timeout)
+
+    async def run(self, test_case: Dict[str, Any], game_url: str, execution_result: Dict[str, Any],
+                  capture: PerformanceCapture, context, session=None, attempt: int = 1,
+                  recorder=None) -> None:
+        execution_result["artifacts"] = {}
+        if not capture.navigation or capture.navigation.get("error"):
+            # Shares the workflow's navigation measurement when the probe already ran
+            measured = await self.probe.measure(game_url, context.navigation_cache)
+            if measured["navigation"].get("error"):
+                context.navigation_cache.pop(game_url, None)  # let the retry fetch again
+                raise InfrastructureError(f"HTTP fetch of {game_url} failed: {measured['navigation']['error']}")
+            capture.record_navigation(measured["navigation"], measured["resources"])
+
+        status_code = capture.navigation.get("status_code") or 0
+        if status_code >= 500:
+            raise InfrastructureError(f"{game_url} returned HTTP {status_code}")
+
+        failures = []
+        if status_code >= 400:
+            failures.append(f"document returned HTTP {status_code}")
+
+        description = test_case.get("description", "").lower()
+        if "javascript" in description or "console" in description:
+            broken = [
+                r["url"] for r in capture.resources
+                if r.get("type") == "script" and (r.get("error") or (r.get("status_code") or 200) >= 400)
+            ]
+            if broken:
+                failures.append(f"{len(broken)} script(s) failed to load: {', '.join(broken[:3])}")
+
+        if failures:
+            execution_result["status"] = "failed"
+            execution_result["evidence"] = "; ".join(failures)
+        else:
+            execution_result["evidence"] = (
+                f"HTTP {status_code}, {len(capture.resources)} resources checked "
+                f"in {capture.navigation.get('load_ms')} ms"
+            )
+
+
+class FakeGameConfig:
+    """Latency and failure distributions of the fake game"""
+
+    def __init__(self, seed: int = 0, latency_ms: float = 50.0, latency_sigma: float = 0.5,
+                 load_ms: float = 400.0, failure_rates: Dict[str, float] = None,
+                 infra_error_rate: float = 0.0, time_scale: float = 1.0):
+        self.seed = seed
+        self.latency_ms = latency_ms        # median action latency
+        self.latency_sigma = latency_sigma  # log-normal spread
+        self.load_ms = load_ms              # median page load time
+        # Assertion failure probability by test type or description keyword
+        self.failure_rates = {"error": 0.2} if failure_rates is None else failure_rates
+        self.infra_error_rate = infra_error_rate
+        self.time_scale = time_scale        # 0 skips the simulated waits
+
+    @classmethod
+    def from_env(cls) -> "FakeGameConfig":
+        rates = None
+        if os.getenv("FAKE_GAME_FAILURE_RATES"):
+            rates = {}
+            for pair in os.environ["FAKE_GAME_FAILURE_RATES"].split(","):
+                key, _, value = pair.partition("=")
+                if key.strip():
+                    rates[key.strip().lower()] = float(value)
+        return cls(
+            seed=int(os.getenv("FAKE_GAME_SEED", "0")),
+            latency_ms=float(os.getenv("FAKE_GAME_LATENCY_MS", "50")),
+            latency_sigma=float(os.getenv("FAKE_GAME_LATENCY_SIGMA", "0.5")),
+            load_ms=float(os.getenv("FAKE_GAME_LOAD_MS", "400")),
+            failure_rates=rates,
+            infra_error_rate=float(os.getenv("FAKE_GAME_INFRA_ERROR_RATE", "0")),
+            time_scale=float(os.getenv("FAKE_GAME_TIME_SCALE", "1.0"))
+        )
+
+    def sample_ms(self, rng: random.Random, median_ms: float) -> float:
+        return round(median_ms * math.exp(rng.gauss(0.0, self.latency_sigma)), 1)
+
+    def failure_rate(self, test_case: Dict[str, Any]) -> float:
+        test_type = str(test_case.get("type", "")).lower()
+        description = test_case.get("description", "").lower()
+        matching = [rate for key, rate in self.failure_rates.items()
+                    if key != "default" and (key == test_type or key in description)]
+        return max(matching) if matching else self.failure_rates.get("default", 0.0)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return dict(self.__dict__)
+
+
+class FakeGameSession:
+    """GameInteraction-shaped session against the fake game, used by load tests"""
+
+    def __init__(self, config: FakeGameConfig, rng: random.Random):
+        self.config = config
+        self.rng = rng
+
+    async def _wait(self, elapsed_ms: float) -> None:
+        if self.config.time_scale > 0:
+            await asyncio.sleep(elapsed_ms / 1000 * self.config.time_scale)
+
+    async def open_game(self, url: str) -> Dict[str, Any]:
+        await self._wait(self.config.sample_ms(self.rng, self.config.load_ms))
+        return {"status": "success", "url": url}
+
+    async def execute_game_action(self, action: str, target: str) -> Dict[str, Any]:
+        await self._wait(self.config.sample_ms(self.rng, self.config.latency_ms))
+        success = self.rng.random() >= self.config.infra_error_rate
+        return {"action": action, "target": target, "success": success}
+
+    async def close_game(self) -> Dict[str, Any]:
+        return {"status": "closed"}
+
+
+class FakeGameBackend(ExecutorBackend):
+    """In-process fake game with seeded, reproducible latency and failures.
+
+    Every draw comes from a generator seeded by (seed, game, test, attempt),
+    so the same run configuration always produces the same results.
+    """
+
+    name = "fake"
+    cost = 0.05
+    capabilities = frozenset({HTTP, BROWSER})
+
+    def __init__(self, config: FakeGameConfig = None, load_test_config: LoadTestConfig = None):
+        self.config = config or FakeGameConfig()
+        self.load_test_config = load_test_config or LoadTestConfig()
+
+    def rng(self, game_url: str, test_id: Any, attempt: int, stream: str = "") -> random.Random:
+        return random.Random(f"{self.config.seed}:{game_url}:{test_id}:{attempt}:{stream}")
+
+    async def run(self, test_case: Dict[str, Any], game_url: str, execution_result: Dict[str, Any],
+                  capture: PerformanceCapture, context, session=None, attempt: int = 1,
+                  recorder=None) -> None:
+        config = self.config
+        test_id = test_case.get("id")
+        rng = self.rng(game_url, test_id, attempt)
+        execution_result["artifacts"] = {}
+
+        if rng.random() < config.infra_error_rate:
+            raise InfrastructureError("Fake game session crashed (simulated)")
+
+        # The fake game has no real page, so its navigation is simulated as well
+        load_ms = config.sample_ms(rng, config.load_ms)
+        capture.record_navigation({"source": "fake", "status_code": 200, "ttfb_ms": round(load_ms * 0.2, 1),
+                                   "load_ms": load_ms, "document_bytes": 0})
+
+        if is_load_test(test_case):
+            players = iter(range(self.load_test_config.virtual_players))
+            runner = LoadTestRunner(game_url, self.load_test_config, session_factory=lambda: FakeGameSession(
+                config, self.rng(game_url, test_id, attempt, f"player{next(players, 0)}")
+            ))
+            apply_load_test(await runner.run(test_case, capture), execution_result)
+            return
+
+        simulated_ms = 0.0
+        for step in actions_for(test_case, 1):
+            elapsed_ms = config.sample_ms(rng, config.latency_ms)
+            capture.record_action(step["action"], elapsed_ms)
+            simulated_ms += elapsed_ms
+            if config.time_scale > 0:
+                await asyncio.sleep(elapsed_ms / 1000 * config.time_scale)
+
+        execution_result["duration_seconds"] = round((load_ms + simulated_ms) / 1000, 3)
+        if rng.random() < config.failure_rate(test_case):
+            execution_result["status"] = "failed"
+            execution_result["evidence"] = f"Fake game rejected {test_id} (seed {config.seed}, attempt {attempt})"
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {**super().to_dict(), "config": self.config.to_dict()}
+
+
+class BackendRouter:
+    """Routes each test to the cheapest configured backend that can validate it"""
+
+    def __init__(self, backends: List[ExecutorBackend]):
+        if not backends:
+            raise ValueError("at least one executor backend is required")
+        self.backends = sorted(backends, key=lambda b: b.cost)
+        self.routed: Dict[str, int] = {}
+
+    @classmethod
+    def from_env(cls, load_test_config: LoadTestConfig = None) -> "BackendRouter":
+        factories = {
+            "browser": lambda: BrowserBackend(load_test_config),
+            "http": lambda: HttpBackend(float(os.getenv("PERF_NAVIGATION_TIMEOUT", "10"))),
+            "fake": lambda: FakeGameBackend(FakeGameConfig.from_env(), load_test_config),
+        }
+        names = [n.strip().lower() for n in os.getenv("EXECUTOR_BACKENDS", "browser,http").split(",") if n.strip()]
+        unknown = [n for n in names if n not in factories]
+        if unknown:
+            raise ValueError(f"Unknown executor backend(s): {', '.join(unknown)}. Available: {sorted(factories)}")
+        return cls([factories[name]() for name in names])
+
+    def select(self, test_case: Dict[str, Any]) -> ExecutorBackend:
+        for backend in self.backends:
+            if backend.supports(test_case):
+                return backend
+        raise InfrastructureError(
+            f"No executor backend offers '{required_capability(test_case)}' "
+            f"(configured: {[b.name for b in self.backends]})"
+        )
+
+    def route(self, test_case: Dict[str, Any]) -> ExecutorBackend:
+        """Select a backend and count the routing decision"""
+        backend = self.select(test_case)
+        self.routed[backend.name] = self.routed.get(backend.name, 0) + 1
+        return backend
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {"backends": [b.to_dict() for b in self.backends], "routed": dict(self.routed)}
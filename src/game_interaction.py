@@ -1,26 +1,55 @@
 import asyncio
 import json
+import time
 from pathlib import Path
 from datetime import datetime
 from typing import Dict, Any, Optional
+from .performance import PerformanceCapture
+from .structured_logging import get_logger
+
+logger = get_logger("GameInteraction")
 
 class GameInteraction:
     """Handles interaction with web-based games"""
     
-    def __init__(self, artifacts_dir: str = "artifacts"):
+    def __init__(self, artifacts_dir: str = "artifacts", viewport: str = "1920x1080",
+                 network_throttle: str = "None", latency_ms: int = 0, profile_name: Optional[str] = None):
         self.artifacts_dir = Path(artifacts_dir)
         self.artifacts_dir.mkdir(exist_ok=True)
         self.session_id = datetime.now().strftime("%Y%m%d_%H%M%S")
+        self.viewport = viewport
+        self.network_throttle = network_throttle
+        self.latency_ms = latency_ms
+        self.profile_name = profile_name
+        self.setup_results: Dict[str, Any] = {}
+        self.performance = PerformanceCapture()
+        self.last_action: Optional[Dict[str, Any]] = None
+    
+    def session_metadata(self) -> Dict[str, Any]:
+        """Browser settings this session runs with"""
+        metadata = {
+            "browser": "chromium",
+            "viewport": self.viewport,
+            "network_throttle": self.network_throttle
+        }
+        if self.profile_name:
+            metadata["profile"] = self.profile_name
+        return metadata
     
     async def open_game(self, url: str) -> Dict[str, Any]:
         """Open game in browser"""
-        print(f"[GameInteraction] Opening game at {url}")
+        logger.info(f"Opening game at {url}", extra={"sample": "per_test"})
+        start = time.perf_counter()
         
         # Simulated game opening
+        await asyncio.sleep(self.latency_ms / 1000)
+        load_ms = (time.perf_counter() - start) * 1000
+        self.performance.record_navigation({"source": "simulated", "load_ms": round(load_ms, 1)})
+        
         return {
             "status": "success",
             "url": url,
-            "time_to_load": 2.5,
+            "time_to_load": round(load_ms / 1000, 3),
             "message": f"Game loaded successfully at {url}"
         }
     
@@ -31,9 +60,19 @@ class GameInteraction:
         # Create a placeholder image file
         screenshot_path.write_text(f"[Screenshot placeholder for test {test_id}]")
         
-        print(f"[GameInteraction] Screenshot saved to {screenshot_path}")
+        logger.info(f"Screenshot saved to {screenshot_path}", extra={"sample": "per_test"})
         return str(screenshot_path)
     
+    async def capture_frame(self) -> bytes:
+        """Grab one frame of the current viewport for session recording"""
+        # Simulated frame: the visible state; a real driver returns a JPEG screenshot here
+        frame = {
+            "viewport": self.viewport,
+            "timestamp": datetime.now().isoformat(),
+            "last_action": self.last_action and {k: self.last_action[k] for k in ("action", "target", "success")}
+        }
+        return json.dumps(frame).encode()
+    
     async def capture_dom_snapshot(self, test_id: str) -> str:
         """Capture DOM snapshot"""
         dom_path = self.artifacts_dir / f"test_{test_id}_dom.json"
@@ -51,7 +90,7 @@ class GameInteraction:
         
         dom_path.write_text(json.dumps(dom_data, indent=2))
         
-        print(f"[GameInteraction] DOM snapshot saved to {dom_path}")
+        logger.info(f"DOM snapshot saved to {dom_path}", extra={"sample": "per_test"})
         return str(dom_path)
     
     async def capture_console_logs(self, test_id: str) -> str:
@@ -68,12 +107,13 @@ class GameInteraction:
         
         console_path.write_text(console_logs.strip())
         
-        print(f"[GameInteraction] Console logs saved to {console_path}")
+        logger.info(f"Console logs saved to {console_path}", extra={"sample": "per_test"})
         return str(console_path)
     
     async def execute_game_action(self, action: str, target: str) -> Dict[str, Any]:
         """Execute an action on the game"""
-        print(f"[GameInteraction] Executing action '{action}' on '{target}'")
+        logger.debug(f"Executing action '{action}' on '{target}'", extra={"sample": "per_test"})
+        start = time.perf_counter()
         
         result = {
             "action": action,
@@ -83,13 +123,15 @@ class GameInteraction:
             "timestamp": datetime.now().isoformat()
         }
         
-        await asyncio.sleep(0.2)  # Simulate action execution time
+        await asyncio.sleep(0.2 + self.latency_ms / 1000)  # Simulate action execution time
+        self.performance.record_action(action, (time.perf_counter() - start) * 1000)
+        self.last_action = result
         
         return result
     
     async def validate_game_state(self, expected_state: Dict[str, Any]) -> Dict[str, Any]:
         """Validate current game state"""
-        print(f"[GameInteraction] Validating game state")
+        logger.debug("Validating game state", extra={"sample": "per_test"})
         
         return {
             "status": "valid",
@@ -104,7 +146,7 @@ class GameInteraction:
     
     async def close_game(self) -> Dict[str, Any]:
         """Close game browser session"""
-        print(f"[GameInteraction] Closing game session")
+        logger.info("Closing game session", extra={"sample": "per_test"})
         
         return {
             "status": "closed",
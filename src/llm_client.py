@@ -0,0 +1,214 @@
+import asyncio
+import hashlib
+import json
+import os
+from pathlib import Path
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import httpx
+
+
+class LLMClient:
+    """Batched, coalescing and disk-cached client for an LLM completion endpoint.
+
+    The endpoint receives ``{"model", "prompts", "max_tokens"}`` and must answer
+    with ``{"completions": [...]}`` in the same order as the prompts.
+    """
+
+    def __init__(
+        self,
+        endpoint: str,
+        model: str = "default",
+        cache_dir: str = "cache/llm",
+        max_batch_size: int = 8,
+        max_batch_tokens: int = 8000,
+        max_completion_tokens: int = 1024,
+        timeout_seconds: float = 20.0,
+        api_key: Optional[str] = None,
+    ):
+        self.endpoint = endpoint
+        self.model = model
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_batch_size = max_batch_size
+        self.max_batch_tokens = max_batch_tokens
+        self.max_completion_tokens = max_completion_tokens
+        self.timeout_seconds = timeout_seconds
+        self.api_key = api_key
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.stats = {
+            "requests": 0,
+            "prompts_sent": 0,
+            "cache_hits": 0,
+            "coalesced": 0,
+            "over_budget": 0,
+            "timeouts": 0,
+            "errors": 0,
+        }
+
+    @classmethod
+    def from_env(cls) -> Optional["LLMClient"]:
+        """Build a client from LLM_* environment variables, or None if unset"""
+        endpoint = os.getenv("LLM_ENDPOINT")
+        if not endpoint:
+            return None
+
+        return cls(
+            endpoint=endpoint,
+            model=os.getenv("LLM_MODEL", "default"),
+            cache_dir=os.getenv("LLM_CACHE_DIR", "cache/llm"),
+            max_batch_size=int(os.getenv("LLM_MAX_BATCH_SIZE", "8")),
+            max_batch_tokens=int(os.getenv("LLM_MAX_BATCH_TOKENS", "8000")),
+            max_completion_tokens=int(os.getenv("LLM_MAX_COMPLETION_TOKENS", "1024")),
+            timeout_seconds=float(os.getenv("LLM_TIMEOUT_SECONDS", "20")),
+            api_key=os.getenv("LLM_API_KEY"),
+        )
+
+    @staticmethod
+    def estimate_tokens(text: str) -> int:
+        """Rough token estimate (~4 characters per token)"""
+        return max(1, len(text) // 4)
+
+    def prompt_hash(self, prompt: str) -> str:
+        """Cache key for a prompt under the configured model"""
+        return hashlib.sha256(f"{self.model}\n{prompt}".encode("utf-8")).hexdigest()
+
+    async def complete_batch(self, prompts: List[str]) -> List[Optional[str]]:
+        """Complete prompts, returning None for any prompt that missed its budget"""
+        results: List[Optional[str]] = [None] * len(prompts)
+        waiting: Dict[int, asyncio.Future] = {}
+        to_send: Dict[str, str] = {}
+
+        for idx, prompt in enumerate(prompts):
+            key = self.prompt_hash(prompt)
+
+            cached = self._read_cache(key)
+            if cached is not None:
+                self.stats["cache_hits"] += 1
+                results[idx] = cached
+                continue
+
+            if key in self._inflight:
+                # Identical prompt already on the wire (from this or another caller)
+                if key not in to_send:
+                    self.stats["coalesced"] += 1
+                waiting[idx] = self._inflight[key]
+                continue
+
+            if self.estimate_tokens(prompt) > self.max_batch_tokens:
+                self.stats["over_budget"] += 1
+                continue
+
+            future = asyncio.get_running_loop().create_future()
+            self._inflight[key] = future
+            waiting[idx] = future
+            to_send[key] = prompt
+
+        if to_send:
+            await self._send(to_send)
+
+        for idx, future in waiting.items():
+            results[idx] = await future
+
+        return results
+
+    async def _send(self, to_send: Dict[str, str]) -> None:
+        """Send prompts in token-bounded batches and resolve their futures"""
+        batches = self._split_batches(list(to_send.items()))
+
+        try:
+            async with httpx.AsyncClient(timeout=self.timeout_seconds) as client:
+                await asyncio.wait_for(
+                    asyncio.gather(*(self._send_batch(client, batch) for batch in batches)),
+                    timeout=self.timeout_seconds,
+                )
+        except asyncio.TimeoutError:
+            self.stats["timeouts"] += 1
+        except Exception:
+            self.stats["errors"] += 1
+        finally:
+            # Anything not answered in time falls back to None for every waiter
+            for key in to_send:
+                future = self._inflight.pop(key, None)
+                if future is not None and not future.done():
+                    future.set_result(None)
+
+    def _split_batches(self, items: List[tuple]) -> List[List[tuple]]:
+        """Group prompts so each request respects batch size and token budget"""
+        batches: List[List[tuple]] = []
+        current: List[tuple] = []
+        current_tokens = 0
+
+        for key, prompt in items:
+            tokens = self.estimate_tokens(prompt)
+            if current and (
+                len(current) >= self.max_batch_size
+                or current_tokens + tokens > self.max_batch_tokens
+            ):
+                batches.append(current)
+                current, current_tokens = [], 0
+            current.append((key, prompt))
+            current_tokens += tokens
+
+        if current:
+            batches.append(current)
+
+        return batches
+
+    async def _send_batch(self, client: httpx.AsyncClient, batch: List[tuple]) -> None:
+        """POST one batch and store its completions"""
+        headers = {"Authorization": f"Bearer {self.api_key}"} if self.api_key else {}
+        payload = {
+            "model": self.model,
+            "prompts": [prompt for _, prompt in batch],
+            "max_tokens": self.max_completion_tokens,
+        }
+
+        self.stats["requests"] += 1
+        self.stats["prompts_sent"] += len(batch)
+
+        try:
+            response = await client.post(self.endpoint, json=payload, headers=headers)
+            response.raise_for_status()
+            completions = response.json().get("completions", [])
+        except Exception:
+            self.stats["errors"] += 1
+            completions = []
+
+        for position, (key, _) in enumerate(batch):
+            completion = completions[position] if position < len(completions) else None
+            if completion is not None:
+                self._write_cache(key, completion)
+
+            future = self._inflight.get(key)
+            if future is not None and not future.done():
+                future.set_result(completion)
+
+    def _cache_path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.json"
+
+    def _read_cache(self, key: str) -> Optional[str]:
+        path = self._cache_path(key)
+        if not path.exists():
+            return None
+
+        try:
+            with open(path, 'r') as f:
+                return json.load(f).get("completion")
+        except (OSError, ValueError):
+            return None
+
+    def _write_cache(self, key: str, completion: str) -> None:
+        path = self._cache_path(key)
+        tmp_path = path.with_suffix(".tmp")
+
+        with open(tmp_path, 'w') as f:
+            json.dump({
+                "prompt_hash": key,
+                "model": self.model,
+                "completion": completion,
+                "created_at": datetime.now().isoformat()
+            }, f)
+
+        tmp_path.replace(path)
@@ -0,0 +1,150 @@
+import asyncio
+import os
+import re
+import time
+from typing import Dict, List, Any, Optional
+
+from .game_interaction import GameInteraction
+from .rolling_stats import QuantileSketch
+
+
+class LoadTestConfig:
+    """How many virtual players to run, how fast to ramp them up and what passes"""
+
+    def __init__(self, virtual_players: int = 5, ramp_up_seconds: float = 1.0, iterations: int = 5,
+                 think_time_seconds: float = 0.0, action_timeout_seconds: float = 10.0,
+                 max_error_rate: float = 0.05, max_p95_ms: float = 2000.0):
+        self.virtual_players = virtual_players
+        self.ramp_up_seconds = ramp_up_seconds
+        self.iterations = iterations
+        self.think_time_seconds = think_time_seconds
+        self.action_timeout_seconds = action_timeout_seconds
+        self.max_error_rate = max_error_rate
+        self.max_p95_ms = max_p95_ms
+
+    @classmethod
+    def from_env(cls) -> "LoadTestConfig":
+        return cls(
+            virtual_players=int(os.getenv("LOAD_TEST_PLAYERS", "5")),
+            ramp_up_seconds=float(os.getenv("LOAD_TEST_RAMP_UP_SECONDS", "1.0")),
+            iterations=int(os.getenv("LOAD_TEST_ITERATIONS", "5")),
+            think_time_seconds=float(os.getenv("LOAD_TEST_THINK_TIME_SECONDS", "0")),
+            max_error_rate=float(os.getenv("LOAD_TEST_MAX_ERROR_RATE", "0.05")),
+            max_p95_ms=float(os.getenv("LOAD_TEST_MAX_P95_MS", "2000"))
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return dict(self.__dict__)
+
+
+def is_load_test(test_case: Dict[str, Any]) -> bool:
+    """Stress and rapid-interaction tests are run as load tests"""
+    description = test_case.get("description", "").lower()
+    return test_case.get("type") == "stress_test" or "rapid clicking" in description
+
+
+def actions_for(test_case: Dict[str, Any], default_iterations: int) -> List[Dict[str, str]]:
+    """Action sequence one virtual player repeats for this test"""
+    description = test_case.get("description", "")
+    target = re.search(r"'([^']+)'", description)
+    count = re.search(r"(\d+)\s+times", description)
+
+    verb = "type" if re.match(r"\s*(enter|type)\b", description, re.IGNORECASE) else "click"
+    action = {"action": verb, "target": target.group(1) if target else "body"}
+    repeats = int(count.group(1)) if count else default_iterations
+    return [action] * max(repeats, 1)
+
+
+class LoadTestRunner:
+    """Runs M concurrent virtual players against a game with a linear ramp-up"""
+
+    def __init__(self, game_url: str, config: LoadTestConfig = None, artifacts_dir: str = "artifacts",
+                 session_factory=None):
+        self.game_url = game_url
+        self.config = config or LoadTestConfig()
+        self.artifacts_dir = artifacts_dir
+        self.session_factory = session_factory or (lambda: GameInteraction(self.artifacts_dir))
+
+    async def run(self, test_case: Dict[str, Any], capture=None) -> Dict[str, Any]:
+        """Run the load test; ``capture`` (a PerformanceCapture) also receives action latencies"""
+        config = self.config
+        actions = actions_for(test_case, config.iterations)
+        latency = {"open_game": QuantileSketch()}
+        timeline: Dict[int, Dict[str, Any]] = {}
+        counters = {"actions": 0, "errors": 0, "active": 0, "peak_active": 0}
+        started = time.perf_counter()
+
+        def record(name: str, elapsed_ms: float, ok: bool) -> None:
+            second = int(time.perf_counter() - started)
+            bucket = timeline.setdefault(second, {"actions": 0, "errors": 0, "latency": QuantileSketch(),
+                                                  "active_players": 0})
+            bucket["actions"] += 1
+            bucket["latency"].add(elapsed_ms)
+            bucket["active_players"] = max(bucket["active_players"], counters["active"])
+            latency.setdefault(name, QuantileSketch()).add(elapsed_ms)
+            if capture is not None and name != "open_game":
+                capture.record_action(name, elapsed_ms)
+            counters["actions"] += 1
+            if not ok:
+                bucket["errors"] += 1
+                counters["errors"] += 1
+
+        async def timed(name: str, coro) -> Optional[Dict[str, Any]]:
+            start = time.perf_counter()
+            try:
+                result = await asyncio.wait_for(coro, timeout=config.action_timeout_seconds)
+                ok = result.get("status", "success") != "error" and result.get("success", True)
+            except Exception:
+                result, ok = None, False
+            record(name, (time.perf_counter() - start) * 1000, ok)
+            return result
+
+        async def virtual_player(index: int) -> None:
+            if config.virtual_players > 1:
+                await asyncio.sleep(config.ramp_up_seconds * index / config.virtual_players)
+            session = self.session_factory()
+            counters["active"] += 1
+            counters["peak_active"] = max(counters["peak_active"], counters["active"])
+            try:
+                await timed("open_game", session.open_game(self.game_url))
+                for step in actions:
+                    await timed(step["action"], session.execute_game_action(step["action"], step["target"]))
+                    if config.think_time_seconds:
+                        await asyncio.sleep(config.think_time_seconds)
+                await session.close_game()
+            finally:
+                counters["active"] -= 1
+
+        await asyncio.gather(*(virtual_player(i) for i in range(config.virtual_players)))
+        elapsed = time.perf_counter() - started
+
+        error_rate = counters["errors"] / counters["actions"] if counters["actions"] else 0.0
+        action_sketch = QuantileSketch()
+        for name, sketch in latency.items():
+            if name != "open_game":
+                action_sketch.merge(sketch)
+        p95_ms = action_sketch.quantile(0.95)
+
+        return {
+            "config": config.to_dict(),
+            "virtual_players": config.virtual_players,
+            "peak_concurrent_players": counters["peak_active"],
+            "elapsed_seconds": round(elapsed, 3),
+            "total_actions": counters["actions"],
+            "errors": counters["errors"],
+            "error_rate": round(error_rate, 4),
+            "throughput_per_second": round(counters["actions"] / elapsed, 2) if elapsed > 0 else 0.0,
+            "latency_ms": {name: sketch.summary() for name, sketch in latency.items()},
+            "timeline": [
+                {
+                    "second": second,
+                    "active_players": bucket["active_players"],
+                    "actions": bucket["actions"],
+                    "errors": bucket["errors"],
+                    "p50_ms": round(bucket["latency"].quantile(0.5), 1),
+                    "p95_ms": round(bucket["latency"].quantile(0.95), 1)
+                }
+                for second, bucket in sorted(timeline.items())
+            ],
+            "passed": error_rate <= config.max_error_rate and p95_ms <= config.max_p95_ms
+        }
@@ -0,0 +1,147 @@
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Dict, List, Any
+
+from .game_interaction import GameInteraction
+
+VIEWPORT_PROFILES = {
+    "desktop": "1920x1080",
+    "laptop": "1366x768",
+    "tablet": "768x1024",
+    "mobile": "375x667",
+}
+
+NETWORK_PROFILES = {
+    "none": {"label": "None", "latency_ms": 0, "download_kbps": None},
+    "fast_3g": {"label": "Fast 3G", "latency_ms": 150, "download_kbps": 1600},
+    "slow_3g": {"label": "Slow 3G", "latency_ms": 400, "download_kbps": 400},
+}
+
+# Steps every test needs before its own actions; run once per profile session
+SETUP_STEPS = ["open_game", "validate_initial_state"]
+
+
+class MatrixProfile:
+    """One viewport x network combination"""
+
+    def __init__(self, viewport_name: str, network_name: str):
+        self.viewport_name = viewport_name
+        self.network_name = network_name
+        self.viewport = VIEWPORT_PROFILES[viewport_name]
+        self.network = NETWORK_PROFILES[network_name]
+        self.name = f"{viewport_name}/{network_name}"
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "profile": self.name,
+            "viewport": self.viewport,
+            "network_throttle": self.network["label"],
+            "latency_ms": self.network["latency_ms"],
+            "download_kbps": self.network["download_kbps"]
+        }
+
+
+def build_profiles(viewports: List[str], network_profiles: List[str]) -> List[MatrixProfile]:
+    """Cross product of declared viewports and network profiles"""
+    viewports = viewports or ["desktop"]
+    network_profiles = network_profiles or ["none"]
+
+    unknown = [v for v in viewports if v not in VIEWPORT_PROFILES] + \
+              [n for n in network_profiles if n not in NETWORK_PROFILES]
+    if unknown:
+        raise ValueError(
+            f"Unknown matrix profile(s): {', '.join(unknown)}. "
+            f"Viewports: {sorted(VIEWPORT_PROFILES)}; networks: {sorted(NETWORK_PROFILES)}"
+        )
+
+    return [MatrixProfile(v, n) for v in viewports for n in network_profiles]
+
+
+def expand_matrix(test_cases: List[Dict[str, Any]], profiles: List[MatrixProfile]) -> List[Dict[str, Any]]:
+    """Fan each test out across every profile, with a unique id per cell"""
+    expanded = []
+    for profile in profiles:
+        for test in test_cases:
+            expanded.append({
+                **test,
+                "id": f"{test.get('id')}@{profile.name}",
+                "base_test_id": test.get("id"),
+                "matrix_profile": profile.name
+            })
+    return expanded
+
+
+class MatrixSessionPool:
+    """Up to ``max_sessions`` warmed game sessions per profile, reused across its tests.
+
+    The first session of a profile runs every setup step; later ones only open
+    the game and share the profile's validated initial state.
+    """
+
+    def __init__(self, game_url: str, profiles: List[MatrixProfile], artifacts_dir: str = "artifacts",
+                 max_sessions: int = 2):
+        if max_sessions < 1:
+            raise ValueError("max_sessions must be at least 1")
+        self.game_url = game_url
+        self.profiles = {p.name: p for p in profiles}
+        self.artifacts_dir = artifacts_dir
+        self.max_sessions = max_sessions
+        self._sessions: Dict[str, List[GameInteraction]] = {name: [] for name in self.profiles}
+        self._idle: Dict[str, List[GameInteraction]] = {name: [] for name in self.profiles}
+        self._slots: Dict[str, asyncio.Semaphore] = {name: asyncio.Semaphore(max_sessions) for name in self.profiles}
+        self._initial_state: Dict[str, Dict[str, Any]] = {}
+        self.stats = {"sessions_warmed": 0, "setup_steps_run": 0, "setup_steps_reused": 0}
+
+    @asynccontextmanager
+    async def session(self, profile_name: str):
+        """Exclusive use of one of the profile's warmed sessions for one test"""
+        async with self._slots[profile_name]:
+            idle = self._idle[profile_name]
+            if idle:
+                session = idle.pop()
+                self.stats["setup_steps_reused"] += len(SETUP_STEPS)
+            else:
+                session = await self._warm(self.profiles[profile_name])
+                self._sessions[profile_name].append(session)
+            try:
+                yield session
+            finally:
+                idle.append(session)
+
+    async def _warm(self, profile: MatrixProfile) -> GameInteraction:
+        session = GameInteraction(
+            self.artifacts_dir,
+            viewport=profile.viewport,
+            network_throttle=profile.network["label"],
+            latency_ms=profile.network["latency_ms"],
+            profile_name=profile.name
+        )
+        load = await session.open_game(self.game_url)
+        self.stats["setup_steps_run"] += 1
+        state = self._initial_state.get(profile.name)
+        if state is None:
+            state = await session.validate_game_state({"page_loaded": True})
+            self._initial_state[profile.name] = state
+            self.stats["setup_steps_run"] += len(SETUP_STEPS) - 1
+        else:
+            self.stats["setup_steps_reused"] += len(SETUP_STEPS) - 1
+        session.setup_results = {"open_game": load, "validate_initial_state": state}
+
+        self.stats["sessions_warmed"] += 1
+        return session
+
+    async def close(self) -> None:
+        for sessions in self._sessions.values():
+            for session in sessions:
+                await session.close_game()
+            sessions.clear()
+        for idle in self._idle.values():
+            idle.clear()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "profiles": [p.to_dict() for p in self.profiles.values()],
+            "setup_steps": SETUP_STEPS,
+            "max_sessions_per_profile": self.max_sessions,
+            **self.stats
+        }
@@ -3,92 +3,440 @@ from .agents.planner import PlannerAgent
 from .agents.ranker import RankerAgent
 from .agents.executor import ExecutorAgent
 from .agents.analyzer import AnalyzerAgent
-from typing import Dict, List, Any
+from .llm_client import LLMClient
+from .capacity import CapacityPool
+from .execution_context import ExecutionContext
+from .checkpoint import WorkflowJournal
+from .retry import RetryPolicy, CircuitBreakerRegistry, TRANSIENT_CLASSES
+from .matrix import MatrixSessionPool, build_profiles, expand_matrix
+from .load_test import LoadTestConfig, is_load_test
+from .performance import NavigationProbe, PerformanceBudgets
+from .executor_backends import BackendRouter
+from .recording import RecordingConfig
+from .workflow_dag import Stage, StageMemo, WorkflowDAG
+from .structured_logging import bind
+from .profiling import Profiler
+from typing import Dict, List, Any, Callable, Optional
 import asyncio
+import logging
+import os
+import time
+import uuid
+from datetime import datetime
+
+
+class WorkflowState:
+    """Mutable state shared by the stages of one workflow run"""
+    
+    def __init__(self, game_url: str, context: ExecutionContext, journal: WorkflowJournal,
+                 checkpoint: Dict[str, Any], matrix: Optional[Dict[str, List[str]]], results: Dict[str, Any]):
+        self.game_url = game_url
+        self.context = context
+        self.journal = journal
+        self.checkpoint = checkpoint
+        self.matrix = matrix
+        self.results = results
+        self.pending: List[Dict[str, Any]] = []
+        self.execution_results: List[Dict[str, Any]] = []
+        self.analysis = None
+        # Planning output computed ahead of time (batch runs plan every game in one call)
+        self.planned: Optional[Dict[str, Any]] = None
+        # Report sections written as results are validated (large suites only)
+        self.report_stream = None
+
 
 class OrchestratorAgent(BaseAgent):
     """Master agent that coordinates all other agents"""
     
     def __init__(self):
         super().__init__("orchestrator_1", "OrchestratorAgent")
-        self.planner = PlannerAgent()
+        self.planner = PlannerAgent(llm_client=LLMClient.from_env())
         self.ranker = RankerAgent()
-        self.executors = [ExecutorAgent(f"executor_{i}") for i in range(1, 3)]
+        self.retry_policy = RetryPolicy(
+            max_attempts=int(os.getenv("RETRY_MAX_ATTEMPTS", "3")),
+            base_delay=float(os.getenv("RETRY_BASE_DELAY", "0.2")),
+            attempt_timeout=float(os.getenv("TEST_ATTEMPT_TIMEOUT", "60"))
+        )
+        self.circuit_breakers = CircuitBreakerRegistry(
+            failure_threshold=int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", "5")),
+            reset_timeout=float(os.getenv("CIRCUIT_RESET_TIMEOUT", "30"))
+        )
+        self.load_test_config = LoadTestConfig.from_env()
+        self.navigation_probe = NavigationProbe.from_env()
+        self.performance_budgets = PerformanceBudgets.from_file()
+        self.backends = BackendRouter.from_env(self.load_test_config)
+        self.recording = RecordingConfig.from_env()
+        self.executors = [
+            ExecutorAgent(f"executor_{i}", self.retry_policy, self.circuit_breakers, self.load_test_config,
+                          self.navigation_probe, self.performance_budgets, self.backends, self.recording)
+            for i in range(1, int(os.getenv("EXECUTOR_COUNT", "2")) + 1)
+        ]
         self.analyzer = AnalyzerAgent()
+        self.capacity_pool = CapacityPool(int(os.getenv("EXECUTOR_CAPACITY", "4")))
+        self.active_workflows: Dict[str, ExecutionContext] = {}
+        self.checkpoint_dir = os.getenv("CHECKPOINT_DIR", "checkpoints")
+        self.profiler = Profiler()
+        self.batch_concurrency = int(os.getenv("BATCH_MAX_CONCURRENT_GAMES", "4"))
+        self.matrix_sessions = int(os.getenv("MATRIX_SESSIONS_PER_PROFILE", "2"))
+        # Opens per-workflow report sections for large suites (the API sets its ReportGenerator)
+        self.report_streams = None
+        self.dag = WorkflowDAG([
+            Stage("planning", self._planning_stage, memoize=True, checkpoint=True,
+                  memo_key=lambda state: {
+                      "game_url": state.game_url,
+                      "model": getattr(self.planner.llm_client, "model", None),
+                      "min_tests": self.planner.min_tests
+                  },
+                  # A template fallback from an unavailable model must not stick
+                  memo_if=lambda output: self.planner.llm_client is None or output.get("planning_source") == "model"),
+            Stage("ranking", self._ranking_stage, depends_on=["planning"], memoize=True, checkpoint=True),
+            Stage("execution", self._execution_stage, depends_on=["ranking"]),
+            # Journals the summary and counters only; per-test results are already journaled one by one
+            Stage("analysis", self._analysis_stage, depends_on=["execution"], checkpoint=True,
+                  restore_if=lambda state: not state.pending,
+                  checkpoint_as=lambda output: {k: v for k, v in output.items() if k != "validated_results"},
+                  restore_as=self._restore_analysis),
+        ], memo=StageMemo(os.getenv("STAGE_CACHE_DIR", "cache/stages"),
+                          max_age_seconds=float(os.getenv("STAGE_MEMO_TTL_SECONDS", "3600")))
+           if os.getenv("STAGE_MEMOIZE", "0") in ("1", "true", "True") else None)
     
-    async def orchestrate_testing(self, game_url: str) -> Dict[str, Any]:
-        """Coordinate entire testing workflow"""
-        self.log(f"Starting orchestration for {game_url}")
+    def register_stage(self, stage: Stage) -> None:
+        """Add a custom stage to every workflow (e.g. one depending on "analysis")"""
+        self.dag.add(stage)
+        try:
+            self.dag.order()  # fail fast on unknown dependencies or cycles
+        except ValueError:
+            del self.dag.stages[stage.name]
+            raise
+    
+    async def orchestrate_testing(self, game_url: str, tenant: str = "default", weight: float = 1.0,
+                                  workflow_id: str = None, matrix: Dict[str, List[str]] = None,
+                                  profile: bool = False, planned: Dict[str, Any] = None) -> Dict[str, Any]:
+        """Coordinate entire testing workflow, checkpointing after every stage and test
+        
+        ``matrix`` ({"viewports": [...], "network_profiles": [...]}) fans every
+        selected test out across each viewport x network profile. ``profile``
+        samples the workflow's stacks and per-stage allocations (see /api/profiles).
+        """
+        context = ExecutionContext(game_url, tenant=tenant, weight=weight, workflow_id=workflow_id)
+        # Every record logged by this workflow (and the stage/test tasks it spawns) carries its id
+        with bind(workflow_id=context.workflow_id, tenant=tenant), \
+                self.profiler.profile(context.workflow_id, enabled=profile) as workflow_profile:
+            workflow_results = await self._orchestrate(context, game_url, tenant, weight, matrix, workflow_profile,
+                                                       planned)
+        
+        if workflow_profile is not None:
+            paths = workflow_profile.write(self.profiler.config.output_dir)
+            workflow_results["profile"] = {**paths, "samples": workflow_profile.samples,
+                                           "agents": workflow_profile.summary()["agents"]}
+        return workflow_results
+    
+    async def _orchestrate(self, context: ExecutionContext, game_url: str, tenant: str, weight: float,
+                           matrix: Optional[Dict[str, List[str]]], workflow_profile=None,
+                           planned: Dict[str, Any] = None) -> Dict[str, Any]:
+        journal = WorkflowJournal(context.workflow_id, self.checkpoint_dir)
+        checkpoint = journal.load()
+        resumed = journal.exists()
+        if not resumed:
+            journal.record_start(game_url, tenant, weight, {"matrix": matrix} if matrix else None)
+        
+        self.active_workflows[context.workflow_id] = context
+        action = "Resuming" if resumed else "Starting"
+        self.log(f"{action} orchestration {context.workflow_id} for {game_url} (tenant: {tenant})")
         
         workflow_results = {
             "status": "running",
-            "workflow_id": "workflow_1",
+            "workflow_id": context.workflow_id,
+            "tenant": tenant,
             "game_url": game_url,
+            "resumed": resumed,
             "steps": {}
         }
+        state = WorkflowState(game_url, context, journal, checkpoint, matrix, workflow_results)
+        state.planned = planned
+        
+        def on_stage_done(name: str, output: Any, how: str) -> None:
+            workflow_results["steps"][name] = output
+            stage = self.dag.stages[name]
+            if how != "restored" and stage.checkpoint:
+                journal.record_stage(name, stage.checkpoint_data(output))
+            self.log(f"Stage {name} {how}")
+            if workflow_profile is not None:
+                workflow_profile.stage_finished(name, how)
         
+        on_stage_start = workflow_profile.stage_started if workflow_profile is not None else None
         try:
-            # Step 1: Planning
-            self.log("Step 1: Generating test cases...")
-            planning_result = await self.planner.execute(game_url)
-            workflow_results["steps"]["planning"] = planning_result
-            test_cases = planning_result.get("test_cases", [])
-            self.log(f"Generated {len(test_cases)} test cases")
-            
-            # Step 2: Ranking
-            self.log("Step 2: Ranking test cases...")
-            ranking_result = await self.ranker.execute(test_cases)
-            workflow_results["steps"]["ranking"] = ranking_result
-            top_10 = ranking_result.get("top_10_selected", [])
-            self.log(f"Selected top {len(top_10)} tests")
-            
-            # Step 3: Execution
-            self.log("Step 3: Executing tests in parallel...")
-            execution_results = []
-            
-            # Distribute tests among executors
-            tests_per_executor = len(top_10) // len(self.executors)
-            executor_tasks = []
-            
-            for idx, executor in enumerate(self.executors):
-                start = idx * tests_per_executor
-                end = start + tests_per_executor if idx < len(self.executors) - 1 else len(top_10)
-                executor_tests = top_10[start:end]
-                
-                if executor_tests:
-                    executor_tasks.append(
-                        executor.execute_multiple(executor_tests, game_url)
-                    )
-            
-            # Run executors in parallel
-            if executor_tasks:
-                executor_outputs = await asyncio.gather(*executor_tasks)
-                for output in executor_outputs:
-                    execution_results.extend(output.get("execution_results", []))
-            
-            workflow_results["steps"]["execution"] = {
-                "status": "success",
-                "total_executed": len(execution_results),
-                "passed": len([r for r in execution_results if r["status"] == "passed"]),
-                "failed": len([r for r in execution_results if r["status"] == "failed"])
-            }
-            self.log(f"Executed {len(execution_results)} tests")
-            
-            # Step 4: Validation & Analysis
-            self.log("Step 4: Validating and analyzing results...")
-            analysis_result = await self.analyzer.execute(execution_results)
-            workflow_results["steps"]["analysis"] = analysis_result
-            self.log("Analysis complete")
+            dag_report = await self.dag.run(state, restored=checkpoint["stages"], on_stage_done=on_stage_done,
+                                            on_stage_start=on_stage_start)
+            workflow_results["dag"] = {k: v for k, v in dag_report.items() if k != "outputs"}
             
             workflow_results["status"] = "completed"
+            journal.record_end("completed")
             self.log("Orchestration workflow completed successfully")
             
         except Exception as e:
-            self.log(f"Error during orchestration: {str(e)}")
+            self.log(f"Error during orchestration: {str(e)}", logging.ERROR)
+            if getattr(e, "dag", None):
+                workflow_results["dag"] = {k: v for k, v in e.dag.items() if k != "outputs"}
             workflow_results["status"] = "failed"
             workflow_results["error"] = str(e)
+            journal.record_end("failed", str(e))
+        finally:
+            if state.report_stream is not None:
+                workflow_results["report_stream"] = await asyncio.to_thread(state.report_stream.close)
+            workflow_results["execution_context"] = context.to_dict()
+            self.active_workflows.pop(context.workflow_id, None)
+            # Waits for the final group fsync off the event loop
+            await asyncio.to_thread(journal.close)
         
         return workflow_results
+    
+    async def _planning_stage(self, state: WorkflowState, inputs: Dict[str, Any]) -> Dict[str, Any]:
+        if state.planned is not None:
+            self.log("Step 1: Using test cases from the batch plan")
+            return state.planned
+        self.log("Step 1: Generating test cases...")
+        with self.profiler.agent_scope(self.planner.name):
+            planning_result = await self.planner.execute(state.game_url)
+        self.log(f"Generated {len(planning_result.get('test_cases', []))} test cases")
+        return planning_result
+    
+    async def _ranking_stage(self, state: WorkflowState, inputs: Dict[str, Any]) -> Dict[str, Any]:
+        self.log("Step 2: Ranking test cases...")
+        with self.profiler.agent_scope(self.ranker.name):
+            ranking_result = await self.ranker.execute(inputs["planning"].get("test_cases", []))
+        self.log(f"Selected top {len(ranking_result.get('top_10_selected', []))} tests")
+        return ranking_result
+    
+    async def _execution_stage(self, state: WorkflowState, inputs: Dict[str, Any]) -> Dict[str, Any]:
+        """Run the selected tests not yet checkpointed, validating them incrementally"""
+        game_url, context = state.game_url, state.context
+        top_10 = inputs["ranking"].get("top_10_selected", [])
+        
+        sessions = None
+        if state.matrix:
+            profiles = build_profiles(state.matrix.get("viewports", []), state.matrix.get("network_profiles", []))
+            # More sessions than capacity slots per profile could never all be busy
+            sessions = MatrixSessionPool(game_url, profiles,
+                                         max_sessions=min(self.matrix_sessions, self.capacity_pool.capacity))
+            top_10 = expand_matrix(top_10, profiles)
+            self.log(f"Matrix mode: {len(profiles)} profile(s), {len(top_10)} test executions")
+        
+        # Aggregates are live (context.live_summary) while tests run
+        # Transient outcomes (error/skipped from infrastructure or timeouts) are journaled for the
+        # report but re-run on resume; only real verdicts count as done
+        completed = {test_id: result for test_id, result in state.checkpoint["tests"].items()
+                     if result.get("failure_class") not in TRANSIENT_CLASSES}
+        state.checkpoint["tests"] = completed
+        state.pending = [t for t in top_10 if t.get("id") not in completed]
+        if self.report_streams is not None and state.report_stream is None:
+            state.report_stream = self.report_streams.open_stream(context.workflow_id, len(top_10))
+        # Streamed suites keep no per-test results: each one goes to the stream and the aggregates only
+        streamed = state.report_stream is not None
+        analysis = self.analyzer.start_analysis(keep_results=not streamed)
+        context.live_summary = analysis.summary
+        
+        def accept(result: Dict[str, Any]) -> None:
+            validated = analysis.add(result)
+            if streamed and validated is not None:
+                state.report_stream.add(validated)
+        
+        for test in top_10:
+            if test.get("id") in completed:
+                accept(completed[test.get("id")])
+        context.execution_count = len(completed)
+        state.analysis = analysis
+        if streamed:
+            # Restored results are in the stream now; drop them along with the journal's copy
+            completed.clear()
+        
+        def on_result(result: Dict[str, Any]) -> None:
+            state.journal.record_test(result)
+            accept(result)
+        
+        self.log(f"Step 3: Executing {len(state.pending)} tests in parallel ({len(completed)} restored from checkpoint)...")
+        try:
+            await self._execute_tests(state.pending, game_url, context, on_result=on_result,
+                                      completed=None if streamed else completed, sessions=sessions,
+                                      keep_results=not streamed)
+        finally:
+            if sessions is not None:
+                await sessions.close()
+                state.results["matrix"] = sessions.to_dict()
+        if not streamed:
+            state.execution_results = [completed[t.get("id")] for t in top_10 if t.get("id") in completed]
+        rolling = analysis.summary
+        self.log(f"Executed {rolling.total_tests} tests")
+        
+        return {
+            "status": "success",
+            "total_executed": rolling.total_tests,
+            "restored_from_checkpoint": len(top_10) - len(state.pending),
+            "passed": rolling.counts["passed"],
+            "failed": rolling.counts["failed"],
+            "errored": rolling.counts["inconclusive"]
+        }
+    
+    async def _analysis_stage(self, state: WorkflowState, inputs: Dict[str, Any]) -> Dict[str, Any]:
+        self.log("Step 4: Validating and analyzing results...")
+        with self.profiler.agent_scope(self.analyzer.name):
+            analysis_result = await self.analyzer.execute(state.execution_results, state.analysis)
+        self.log("Analysis complete")
+        return analysis_result
+    
+    def _restore_analysis(self, state: WorkflowState, saved: Dict[str, Any]) -> Dict[str, Any]:
+        """Checkpointed analysis output plus validated results rebuilt from the restored test records
+        
+        Streamed workflows have already re-fed the restored records to their stream; they get the
+        checkpointed output only.
+        """
+        if state.report_stream is not None:
+            return dict(saved)
+        return {**saved, "validated_results": [state.analysis.add(result) for result in state.execution_results]}
+    
+    async def orchestrate_batch(self, game_urls: List[str], tenant: str = "default", weight: float = 1.0,
+                                matrix: Dict[str, List[str]] = None, profile: bool = False,
+                                on_game_done: Callable = None) -> Dict[str, Any]:
+        """Test many games in one run
+        
+        Every game is planned by a single batched planner call (``planning.planner_calls``
+        counts the model requests it sent), then runs as its own workflow (journal,
+        checkpoints, DAG). Up to BATCH_MAX_CONCURRENT_GAMES workflows are in flight
+        at once; their tests share the capacity pool, whose per-game flows interleave
+        them. ``on_game_done(result)`` (async) is awaited as each game finishes, e.g.
+        to publish its report while others still run; its errors are logged only.
+        """
+        game_urls = list(dict.fromkeys(game_urls))
+        if not game_urls:
+            raise ValueError("game_urls must not be empty")
+        batch_id = f"batch_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:8]}"
+        started = time.perf_counter()
+        
+        with bind(batch_id=batch_id, tenant=tenant):
+            self.log(f"Starting batch {batch_id}: {len(game_urls)} game(s)")
+            llm_client = self.planner.llm_client
+            llm_before = dict(llm_client.stats) if llm_client is not None else {}
+            with self.profiler.agent_scope(self.planner.name):
+                plans = await self.planner.execute_batch(game_urls)
+            # Model requests the batch's planning actually sent (0 for templates or cached plans);
+            # planning by concurrent workflows in the same window is counted too
+            llm_calls = {key: llm_client.stats[key] - llm_before[key]
+                         for key in ("requests", "prompts_sent", "cache_hits")} if llm_client is not None else {}
+            
+            in_flight = asyncio.Semaphore(max(self.batch_concurrency, 1))
+            
+            async def run_game(game_url: str) -> Dict[str, Any]:
+                async with in_flight:
+                    result = await self.orchestrate_testing(game_url, tenant=tenant, weight=weight, matrix=matrix,
+                                                            profile=profile, planned=plans.get(game_url))
+                result["batch_id"] = batch_id
+                if on_game_done is not None:
+                    # The game itself completed; a failing callback must not turn it into a failure
+                    try:
+                        await on_game_done(result)
+                    except Exception as e:
+                        self.log(f"on_game_done failed for {game_url} in batch {batch_id}: {e}", logging.ERROR)
+                return result
+            
+            outcomes = await asyncio.gather(*(run_game(url) for url in game_urls), return_exceptions=True)
+            
+            games = []
+            for url, outcome in zip(game_urls, outcomes):
+                if isinstance(outcome, BaseException):
+                    self.log(f"Game {url} failed in batch {batch_id}: {outcome}", logging.ERROR)
+                    outcome = {"status": "failed", "game_url": url, "batch_id": batch_id, "error": str(outcome)}
+                games.append(outcome)
+            
+            completed = sum(1 for g in games if g.get("status") == "completed")
+            self.log(f"Batch {batch_id} finished: {completed}/{len(games)} game(s) completed")
+        
+        sources: Dict[str, int] = {}
+        for plan in plans.values():
+            sources[plan.get("planning_source")] = sources.get(plan.get("planning_source"), 0) + 1
+        return {
+            "status": "completed" if completed == len(games) else "partial" if completed else "failed",
+            "batch_id": batch_id,
+            "tenant": tenant,
+            "game_urls": game_urls,
+            "games": games,
+            "planning": {
+                "planning_sources": sources,
+                "planner_calls": llm_calls.get("requests", 0),
+                "prompts_sent": llm_calls.get("prompts_sent", 0),
+                "cache_hits": llm_calls.get("cache_hits", 0)
+            },
+            "wall_seconds": round(time.perf_counter() - started, 3)
+        }
+    
+    async def resume_workflow(self, workflow_id: str) -> Dict[str, Any]:
+        """Resume a checkpointed workflow, running only the work that is missing"""
+        journal = WorkflowJournal(workflow_id, self.checkpoint_dir)
+        if not journal.exists():
+            raise KeyError(f"No checkpoint found for workflow {workflow_id}")
+        
+        meta = journal.load()["meta"]
+        return await self.orchestrate_testing(
+            meta.get("game_url", ""),
+            tenant=meta.get("tenant", "default"),
+            weight=meta.get("weight", 1.0),
+            workflow_id=workflow_id,
+            matrix=meta.get("options", {}).get("matrix")
+        )
+    
+    async def _execute_tests(self, tests: List[Dict[str, Any]], game_url: str,
+                             context: ExecutionContext, on_result: Callable = None,
+                             completed: Dict[str, Dict[str, Any]] = None,
+                             sessions: MatrixSessionPool = None,
+                             keep_results: bool = True) -> List[Dict[str, Any]]:
+        """Run tests through the shared capacity pool, spread across executors
+        
+        With ``keep_results=False`` results only reach ``on_result``/``completed`` and the
+        returned list is empty, so nothing holds every result until the last test finishes.
+        """
+        async def run_in_slot(executor: ExecutorAgent, test: Dict[str, Any], browser=None) -> Dict[str, Any]:
+            # Lightweight backends are charged proportionally less of the tenant's fair share;
+            # a load test runs one session per virtual player and is charged for each of them
+            try:
+                cost = self.backends.select(test).cost
+            except Exception:
+                cost = 1.0  # the executor reports the routing error
+            if is_load_test(test):
+                cost *= max(1, self.load_test_config.virtual_players)
+            async with self.capacity_pool.slot(context.tenant, game_url, context.weight, cost):
+                with self.profiler.agent_scope(executor.name):
+                    return await executor.execute(test, game_url, browser_instance=browser, context=context)
+        
+        async def run_one(idx: int, test: Dict[str, Any]) -> Dict[str, Any]:
+            executor = self.executors[idx % len(self.executors)]
+            if sessions is not None and test.get("matrix_profile"):
+                # Wait for the profile's session before taking a capacity slot
+                async with sessions.session(test["matrix_profile"]) as browser:
+                    result = await run_in_slot(executor, test, browser)
+            else:
+                result = await run_in_slot(executor, test)
+            if completed is not None:
+                completed[test.get("id")] = result
+            if on_result is not None:
+                on_result(result)
+            return result if keep_results else None
+        
+        # Let in-flight tests finish (and checkpoint) before surfacing a failure
+        outcomes = await asyncio.gather(*(run_one(idx, test) for idx, test in enumerate(tests)),
+                                        return_exceptions=True)
+        errors = [o for o in outcomes if isinstance(o, BaseException)]
+        if errors:
+            raise errors[0]
+        return list(outcomes) if keep_results else []
+    
+    def get_status(self) -> Dict[str, Any]:
+        """Active workflows and shared capacity utilization"""
+        return {
+            "active_workflows": [ctx.to_dict() for ctx in self.active_workflows.values()],
+            "capacity": self.capacity_pool.get_stats(),
+            "circuit_breakers": self.circuit_breakers.get_stats(),
+            "backends": self.backends.get_stats(),
+            "profiling": self.profiler.get_stats()
+        }
 
     async def execute(self, game_url: str, *args, **kwargs) -> Dict[str, Any]:
         """Implement BaseAgent.execute - entry point for orchestration."""
@@ -0,0 +1,208 @@
+import asyncio
+import json
+import os
+import re
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, List, Any
+from urllib.parse import urljoin
+
+import httpx
+
+from .rolling_stats import QuantileSketch
+
+# Metrics compared against budgets and history (lower is better for all of them)
+PERF_METRICS = ("ttfb_ms", "load_ms", "total_bytes", "resource_count", "action_p95_ms")
+
+DEFAULT_BUDGET = {
+    "ttfb_ms": 800,
+    "load_ms": 3000,
+    "total_bytes": 5_000_000,
+    "resource_count": 100,
+    "action_p95_ms": 1000,
+}
+
+RESOURCE_PATTERNS = [
+    ("script", re.compile(r"<script[^>]+src=[\"']([^\"']+)", re.IGNORECASE)),
+    ("stylesheet", re.compile(r"<link[^>]+href=[\"']([^\"']+\.css[^\"']*)", re.IGNORECASE)),
+    ("image", re.compile(r"<img[^>]+src=[\"']([^\"']+)", re.IGNORECASE)),
+]
+
+
+class PerformanceCapture:
+    """Navigation timing, resources and per-action response times for one test"""
+
+    def __init__(self):
+        self.navigation: Dict[str, Any] = {}
+        self.resources: List[Dict[str, Any]] = []
+        self.actions: Dict[str, QuantileSketch] = {}
+
+    def record_navigation(self, navigation: Dict[str, Any], resources: List[Dict[str, Any]] = None) -> None:
+        self.navigation = dict(navigation)
+        self.resources = list(resources or [])
+
+    def record_action(self, name: str, elapsed_ms: float) -> None:
+        self.actions.setdefault(name, QuantileSketch()).add(elapsed_ms)
+
+    @contextmanager
+    def time_action(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record_action(name, (time.perf_counter() - start) * 1000)
+
+    def summary(self) -> Dict[str, Any]:
+        all_actions = QuantileSketch()
+        for sketch in self.actions.values():
+            all_actions.merge(sketch)
+
+        by_type: Dict[str, Dict[str, int]] = {}
+        for resource in self.resources:
+            entry = by_type.setdefault(resource.get("type", "other"), {"count": 0, "bytes": 0})
+            entry["count"] += 1
+            entry["bytes"] += resource.get("size_bytes") or 0
+
+        document_bytes = self.navigation.get("document_bytes", 0) or 0
+        metrics = {
+            "ttfb_ms": self.navigation.get("ttfb_ms"),
+            "load_ms": self.navigation.get("load_ms"),
+            "resource_count": len(self.resources) if self.navigation else None,
+            "total_bytes": document_bytes + sum(r.get("size_bytes") or 0 for r in self.resources) if self.navigation else None,
+            "action_p95_ms": round(all_actions.quantile(0.95), 1) if all_actions.count else None,
+        }
+
+        return {
+            "metrics": metrics,
+            "navigation": self.navigation,
+            "resources": {"count": len(self.resources), "by_type": by_type},
+            "actions_ms": {name: sketch.summary() for name, sketch in self.actions.items()}
+        }
+
+
+def discover_resources(html: str, base_url: str) -> List[Dict[str, str]]:
+    """Subresources referenced by a page (scripts, stylesheets, images)"""
+    found, seen = [], set()
+    for resource_type, pattern in RESOURCE_PATTERNS:
+        for match in pattern.findall(html):
+            url = urljoin(base_url, match)
+            if url not in seen and url.startswith(("http://", "https://")):
+                seen.add(url)
+                found.append({"url": url, "type": resource_type})
+    return found
+
+
+async def measure_navigation(url: str, timeout: float = 10.0, max_resources: int = 50,
+                             concurrency: int = 8) -> Dict[str, Any]:
+    """Fetch a page and its subresources, returning timing and size data"""
+    start = time.perf_counter()
+    async with httpx.AsyncClient(timeout=timeout, follow_redirects=True) as client:
+        async with client.stream("GET", url) as response:
+            ttfb_ms = (time.perf_counter() - start) * 1000
+            body = await response.aread()
+        document_ms = (time.perf_counter() - start) * 1000
+
+        resources = discover_resources(body.decode("utf-8", errors="ignore"), str(response.url))[:max_resources]
+        slots = asyncio.Semaphore(concurrency)
+
+        async def fetch(resource: Dict[str, Any]) -> None:
+            async with slots:
+                fetch_start = time.perf_counter()
+                try:
+                    resource_response = await client.get(resource["url"])
+                    resource["status_code"] = resource_response.status_code
+                    resource["size_bytes"] = len(resource_response.content)
+                except httpx.HTTPError as e:
+                    resource["error"] = type(e).__name__
+                    resource["size_bytes"] = 0
+                resource["duration_ms"] = round((time.perf_counter() - fetch_start) * 1000, 1)
+
+        await asyncio.gather(*(fetch(r) for r in resources))
+
+    return {
+        "navigation": {
+            "source": "http",
+            "status_code": response.status_code,
+            "ttfb_ms": round(ttfb_ms, 1),
+            "document_ms": round(document_ms, 1),
+            "load_ms": round((time.perf_counter() - start) * 1000, 1),
+            "document_bytes": len(body)
+        },
+        "resources": resources
+    }
+
+
+class NavigationProbe:
+    """Measures each game's navigation once per workflow and shares it with every test"""
+
+    def __init__(self, enabled: bool = True, timeout: float = 10.0):
+        self.enabled = enabled
+        self.timeout = timeout
+
+    @classmethod
+    def from_env(cls) -> "NavigationProbe":
+        return cls(
+            enabled=os.getenv("PERF_CAPTURE_NAVIGATION", "1") not in ("0", "false", "False"),
+            timeout=float(os.getenv("PERF_NAVIGATION_TIMEOUT", "10"))
+        )
+
+    async def measure(self, url: str, cache: Dict[str, asyncio.Future]) -> Dict[str, Any]:
+        if not self.enabled:
+            return {"navigation": {}, "resources": []}
+
+        future = cache.get(url)
+        if future is None or (future.done() and (future.cancelled() or future.exception() is not None)):
+            future = cache[url] = asyncio.ensure_future(self._measure(url))
+            future.add_done_callback(lambda f: self._evict_failed(url, f, cache))
+        # Shielded: one test timing out must not cancel the measurement other tests are waiting on
+        return await asyncio.shield(future)
+
+    @staticmethod
+    def _evict_failed(url: str, future: asyncio.Future, cache: Dict[str, asyncio.Future]) -> None:
+        if (future.cancelled() or future.exception() is not None) and cache.get(url) is future:
+            del cache[url]
+
+    async def _measure(self, url: str) -> Dict[str, Any]:
+        try:
+            return await measure_navigation(url, timeout=self.timeout)
+        except Exception as e:
+            # Measurement problems must not fail the test itself
+            return {"navigation": {"source": "http", "error": f"{type(e).__name__}: {e}"}, "resources": []}
+
+
+class PerformanceBudgets:
+    """Per-game performance budgets loaded from a JSON file
+
+    File format: {"default": {metric: limit}, "games": {game_url: {metric: limit}}}
+    """
+
+    def __init__(self, budgets: Dict[str, Any] = None):
+        budgets = budgets or {}
+        self.default = {**DEFAULT_BUDGET, **budgets.get("default", {})}
+        self.games = budgets.get("games", {})
+
+    @classmethod
+    def from_file(cls, path: str = None) -> "PerformanceBudgets":
+        path = Path(path or os.getenv("PERF_BUDGETS_FILE", "performance_budgets.json"))
+        if not path.exists():
+            return cls()
+        with open(path, "r") as f:
+            return cls(json.load(f))
+
+    def for_game(self, game_url: str) -> Dict[str, float]:
+        return {**self.default, **self.games.get(game_url, {})}
+
+    def check(self, game_url: str, metrics: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Metrics that exceed the game's budget"""
+        violations = []
+        for metric, limit in self.for_game(game_url).items():
+            value = metrics.get(metric)
+            if value is not None and limit is not None and value > limit:
+                violations.append({"metric": metric, "value": value, "budget": limit})
+        return violations
+
+
+def is_performance_test(test_case: Dict[str, Any]) -> bool:
+    description = test_case.get("description", "").lower()
+    return "performance" in description or "load time" in description
@@ -0,0 +1,306 @@
+import asyncio
+import contextvars
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+import weakref
+from collections import Counter
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, List, Any, Optional
+
+_active_profile: contextvars.ContextVar[Optional["WorkflowProfile"]] = contextvars.ContextVar("active_profile", default=None)
+_current_agent: contextvars.ContextVar[str] = contextvars.ContextVar("current_agent", default="OrchestratorAgent")
+
+# tracemalloc is process-wide: profilers that need it share one reference count, and tracing
+# that was already on (started by someone else) is never stopped here
+_tracemalloc_lock = threading.Lock()
+_tracemalloc_users = 0
+_tracemalloc_owned = False
+
+
+def _acquire_tracemalloc() -> None:
+    global _tracemalloc_users, _tracemalloc_owned
+    with _tracemalloc_lock:
+        if _tracemalloc_users == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _tracemalloc_owned = True
+        _tracemalloc_users += 1
+
+
+def _release_tracemalloc() -> None:
+    global _tracemalloc_users, _tracemalloc_owned
+    with _tracemalloc_lock:
+        _tracemalloc_users -= 1
+        if _tracemalloc_users == 0 and _tracemalloc_owned:
+            tracemalloc.stop()
+            _tracemalloc_owned = False
+
+
+class ProfilingConfig:
+    """Opt-in profiling: per workflow on request, or every workflow with PROFILING_ENABLED=1"""
+
+    def __init__(self, always: bool = False, interval_ms: float = 10.0, memory: bool = True,
+                 top_allocations: int = 10, output_dir: str = "profiles"):
+        self.always = always
+        self.interval_ms = interval_ms
+        self.memory = memory
+        self.top_allocations = top_allocations
+        self.output_dir = output_dir
+
+    @classmethod
+    def from_env(cls) -> "ProfilingConfig":
+        return cls(
+            always=os.getenv("PROFILING_ENABLED", "0") in ("1", "true", "True"),
+            interval_ms=float(os.getenv("PROFILE_INTERVAL_MS", "10")),
+            memory=os.getenv("PROFILE_MEMORY", "1") not in ("0", "false", "False"),
+            top_allocations=int(os.getenv("PROFILE_TOP_ALLOCATIONS", "10")),
+            output_dir=os.getenv("PROFILE_DIR", "profiles")
+        )
+
+
+def _frame_label(frame) -> str:
+    return f"{frame.f_globals.get('__name__', '?')}:{frame.f_code.co_qualname}"
+
+
+def collapse_stack(frame) -> List[str]:
+    """Frames root-first, starting at the event loop callback that runs the task step"""
+    stack = []
+    while frame is not None:
+        if frame.f_code.co_name == "_run" and frame.f_globals.get("__name__") == "asyncio.events":
+            break
+        stack.append(_frame_label(frame))
+        frame = frame.f_back
+    stack.reverse()
+    return stack
+
+
+class WorkflowProfile:
+    """Samples, per-agent wall time and per-stage allocations of one workflow"""
+
+    def __init__(self, workflow_id: str, config: ProfilingConfig):
+        self.workflow_id = workflow_id
+        self.config = config
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self.agents: Dict[str, Dict[str, float]] = {}
+        self.stages: Dict[str, Dict[str, Any]] = {}
+        self._snapshots: Dict[str, Any] = {}
+        self.started_at = time.perf_counter()
+        self.duration_ms = 0.0
+
+    def add_sample(self, agent: str, stack: List[str]) -> None:
+        self.samples += 1
+        self.stacks[";".join([agent] + stack)] += 1
+        self.agents.setdefault(agent, {"calls": 0, "wall_ms": 0.0, "samples": 0})["samples"] += 1
+
+    def add_agent_time(self, agent: str, wall_ms: float) -> None:
+        stats = self.agents.setdefault(agent, {"calls": 0, "wall_ms": 0.0, "samples": 0})
+        stats["calls"] += 1
+        stats["wall_ms"] += wall_ms
+
+    def stage_started(self, name: str) -> None:
+        if tracemalloc.is_tracing():
+            self._snapshots[name] = (tracemalloc.take_snapshot(), tracemalloc.get_traced_memory()[0])
+
+    def stage_finished(self, name: str, how: str) -> None:
+        """Allocation growth over the stage (includes anything running concurrently with it)"""
+        entry = {"how": how}
+        started = self._snapshots.pop(name, None)
+        if started is not None and tracemalloc.is_tracing():
+            before, traced_before = started
+            after = tracemalloc.take_snapshot()
+            diffs = after.compare_to(before, "lineno")[:self.config.top_allocations]
+            entry.update({
+                "traced_kb_before": round(traced_before / 1024, 1),
+                "traced_kb_after": round(tracemalloc.get_traced_memory()[0] / 1024, 1),
+                "top_allocations": [{
+                    "location": f"{d.traceback[0].filename}:{d.traceback[0].lineno}",
+                    "size_diff_kb": round(d.size_diff / 1024, 1),
+                    "count_diff": d.count_diff
+                } for d in diffs if d.size_diff > 0]
+            })
+        self.stages[name] = entry
+
+    def summary(self) -> Dict[str, Any]:
+        interval = self.config.interval_ms
+        agents = {
+            name: {
+                "calls": stats["calls"],
+                "wall_ms": round(stats["wall_ms"], 1),
+                # Time the agent's code was actually running on the event loop
+                "on_cpu_ms": round(stats["samples"] * interval, 1)
+            }
+            for name, stats in sorted(self.agents.items())
+        }
+        return {
+            "workflow_id": self.workflow_id,
+            "duration_ms": round(self.duration_ms, 1),
+            "interval_ms": interval,
+            "samples": self.samples,
+            "agents": agents,
+            "stages": self.stages,
+            "top_stacks": [{"stack": stack, "samples": count} for stack, count in self.stacks.most_common(10)]
+        }
+
+    def write(self, output_dir: str) -> Dict[str, str]:
+        """Write the collapsed stacks (flamegraph.pl/speedscope input) and the JSON summary"""
+        directory = Path(output_dir)
+        directory.mkdir(parents=True, exist_ok=True)
+        collapsed_path = directory / f"{self.workflow_id}.collapsed"
+        summary_path = directory / f"{self.workflow_id}.json"
+        with open(collapsed_path, "w") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+        with open(summary_path, "w") as f:
+            json.dump(self.summary(), f, indent=2)
+        return {"flamegraph": str(collapsed_path), "summary": str(summary_path)}
+
+
+class Profiler:
+    """Sampling profiler for the event loop thread, attributing samples to workflows and agents.
+
+    A background thread periodically grabs the loop thread's stack. Samples
+    are attributed through the currently running task: while any profiled
+    workflow runs, a task factory tags the tasks created inside a profiled
+    workflow's context (the ``_active_profile`` contextvar) with its profile
+    and agent. Tasks of other workflows are created untagged and their
+    samples are dropped, so concurrent workflows (profiled or not) don't
+    mix. The loop's previous factory is restored once the last profiled
+    workflow ends. Per-stage allocations come from tracemalloc, which is
+    process-wide: they include whatever ran concurrently with the stage.
+    """
+
+    def __init__(self, config: ProfilingConfig = None):
+        self.config = config or ProfilingConfig.from_env()
+        self.sessions: List[WorkflowProfile] = []
+        self._tasks: "weakref.WeakKeyDictionary[asyncio.Task, List[Any]]" = weakref.WeakKeyDictionary()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread: Optional[int] = None
+        self._previous_factory = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._tracing_memory = False
+
+    def _task_factory(self, loop, coro, **kwargs):
+        if self._previous_factory is not None:
+            task = self._previous_factory(loop, coro, **kwargs)
+        else:
+            task = asyncio.Task(coro, loop=loop, **kwargs)
+        # Runs in the creating task's context: only tasks spawned by a profiled workflow are tagged
+        profile = _active_profile.get()
+        if profile is not None:
+            self._tasks[task] = [profile, _current_agent.get()]
+        return task
+
+    def _sample_loop(self) -> None:
+        interval = self.config.interval_ms / 1000
+        while not self._stop.wait(interval):
+            loop, thread_id = self._loop, self._loop_thread
+            if loop is None:
+                continue
+            # Task and frame are read a moment apart; an occasional misattributed sample is acceptable
+            task = asyncio.current_task(loop)
+            tagged = self._tasks.get(task) if task is not None else None
+            frame = sys._current_frames().get(thread_id)
+            if tagged is None or frame is None:
+                continue
+            tagged[0].add_sample(tagged[1], collapse_stack(frame))
+
+    def _start(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread = threading.get_ident()
+        self._previous_factory = self._loop.get_task_factory()
+        self._loop.set_task_factory(self._task_factory)
+        if self.config.memory:
+            _acquire_tracemalloc()
+            self._tracing_memory = True
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._sample_loop, name="profiler", daemon=True)
+        self._thread.start()
+
+    def _shutdown(self) -> None:
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+        self._loop.set_task_factory(self._previous_factory)
+        self._loop = self._loop_thread = self._previous_factory = None
+        if self._tracing_memory:
+            _release_tracemalloc()
+            self._tracing_memory = False
+
+    @contextmanager
+    def profile(self, workflow_id: str, enabled: bool = False):
+        """Profile the workflow run inside the block; yields the profile, or None when not profiling"""
+        if not (enabled or self.config.always):
+            yield None
+            return
+
+        profile = WorkflowProfile(workflow_id, self.config)
+        if not self.sessions:
+            self._start()
+        self.sessions.append(profile)
+        token = _active_profile.set(profile)
+        self._tasks[asyncio.current_task()] = [profile, _current_agent.get()]
+        try:
+            yield profile
+        finally:
+            _active_profile.reset(token)
+            self._tasks.pop(asyncio.current_task(), None)
+            self.sessions.remove(profile)
+            if not self.sessions:
+                self._shutdown()
+            profile.duration_ms = (time.perf_counter() - profile.started_at) * 1000
+
+    @contextmanager
+    def agent_scope(self, agent: str):
+        """Attribute samples and wall time inside the block to ``agent``"""
+        profile = _active_profile.get()
+        if profile is None:
+            yield
+            return
+
+        token = _current_agent.set(agent)
+        tagged = self._tasks.get(asyncio.current_task())
+        previous = tagged[1] if tagged else None
+        if tagged:
+            tagged[1] = agent
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            profile.add_agent_time(agent, (time.perf_counter() - started) * 1000)
+            if tagged:
+                tagged[1] = previous
+            _current_agent.reset(token)
+
+    def resolve(self, workflow_id: str, kind: str) -> Path:
+        """Path of a written profile file; FileNotFoundError for unknown ids"""
+        suffix = {"flamegraph": ".collapsed", "summary": ".json"}[kind]
+        if not workflow_id or any(c in workflow_id for c in "/\\") or workflow_id.startswith("."):
+            raise FileNotFoundError(workflow_id)
+        path = Path(self.config.output_dir) / f"{workflow_id}{suffix}"
+        if not path.is_file():
+            raise FileNotFoundError(workflow_id)
+        return path
+
+    def list_profiles(self) -> List[Dict[str, Any]]:
+        directory = Path(self.config.output_dir)
+        if not directory.exists():
+            return []
+        return [{
+            "workflow_id": path.stem,
+            "summary_url": f"/api/profiles/{path.stem}",
+            "flamegraph_url": f"/api/profiles/{path.stem}/flamegraph"
+        } for path in sorted(directory.glob("*.json"), key=lambda p: p.stat().st_mtime, reverse=True)]
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "active_sessions": [p.workflow_id for p in self.sessions],
+            "always": self.config.always,
+            "interval_ms": self.config.interval_ms,
+            "memory": self.config.memory
+        }
@@ -0,0 +1,172 @@
+import asyncio
+import inspect
+import json
+import os
+import struct
+import time
+from collections import deque
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Callable
+
+# Recordings are not video files. No video encoder is available, and the simulated browser's
+# frames are JSON viewport states rather than images, so frames go into this project's own
+# "GTREC1" container: the magic, then per frame a header (timestamp ms, keyframe flag, length)
+# followed by the frame bytes. A real driver would hand JPEG screenshots to the same container;
+# converting to webm/mp4 is left to an encoder outside this tree.
+RECORDING_MAGIC = b"GTREC1\n"
+FRAME_HEADER = struct.Struct(">IBI")
+
+
+class RecordingConfig:
+    """Whether tests are recorded, and how much of each session is kept in memory"""
+
+    def __init__(self, enabled: bool = False, window_seconds: float = 10.0, fps: float = 4.0,
+                 output_dir: str = "artifacts/recordings"):
+        self.enabled = enabled
+        self.window_seconds = window_seconds
+        self.fps = fps
+        self.output_dir = output_dir
+
+    @classmethod
+    def from_env(cls) -> "RecordingConfig":
+        return cls(
+            enabled=os.getenv("RECORDING_ENABLED", "0") in ("1", "true", "True"),
+            window_seconds=float(os.getenv("RECORDING_WINDOW_SECONDS", "10")),
+            fps=float(os.getenv("RECORDING_FPS", "4")),
+            output_dir=os.getenv("RECORDING_DIR", "artifacts/recordings")
+        )
+
+
+class Frame:
+    __slots__ = ("frame_id", "timestamp_ms", "data", "keyframe")
+
+    def __init__(self, frame_id: int, timestamp_ms: int, data: bytes, keyframe: bool):
+        self.frame_id = frame_id
+        self.timestamp_ms = timestamp_ms
+        self.data = data
+        self.keyframe = keyframe
+
+
+class SessionRecorder:
+    """Records a session into an in-memory ring buffer holding the last N seconds.
+
+    Frames are grabbed from ``frame_source`` at a fixed rate; ``mark_step``
+    grabs a keyframe at each test step so the persisted recording can be
+    indexed by step. Nothing touches disk unless ``persist`` is called,
+    which the executor only does for failed tests. ``persist`` writes a
+    GTREC1 frame container (see RECORDING_MAGIC), not a webm/mp4 video.
+    """
+
+    def __init__(self, config: RecordingConfig):
+        self.config = config
+        self.frames: deque = deque()
+        self.steps: List[Dict[str, Any]] = []
+        self.frames_captured = 0
+        self.frames_evicted = 0
+        self._source: Optional[Callable] = None
+        self._task: Optional[asyncio.Task] = None
+        self._started_at = time.monotonic()
+
+    def _now_ms(self) -> int:
+        return int((time.monotonic() - self._started_at) * 1000)
+
+    async def start(self, frame_source: Callable) -> None:
+        self._source = frame_source
+        self._started_at = time.monotonic()
+        self._task = asyncio.create_task(self._grab_loop())
+
+    async def _grab_loop(self) -> None:
+        interval = 1.0 / max(self.config.fps, 0.1)
+        while True:
+            await self._grab(keyframe=False)
+            await asyncio.sleep(interval)
+
+    async def _grab(self, keyframe: bool) -> Optional[Frame]:
+        if self._source is None:
+            return None
+        data = self._source()
+        if inspect.isawaitable(data):
+            data = await data
+        frame = Frame(self.frames_captured, self._now_ms(), data, keyframe)
+        self.frames_captured += 1
+        self.frames.append(frame)
+
+        horizon = frame.timestamp_ms - self.config.window_seconds * 1000
+        while self.frames and self.frames[0].timestamp_ms < horizon:
+            self.frames.popleft()
+            self.frames_evicted += 1
+        return frame
+
+    async def mark_step(self, name: str, **details: Any) -> None:
+        """Note a test step and grab a keyframe for it"""
+        frame = await self._grab(keyframe=True)
+        self.steps.append({
+            "step": len(self.steps) + 1,
+            "name": name,
+            "timestamp_ms": frame.timestamp_ms if frame else self._now_ms(),
+            "frame_id": frame.frame_id if frame else None,
+            **details
+        })
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def persist(self, stem: str) -> Dict[str, str]:
+        """Write the buffered frames and their keyframe index; returns artifact paths"""
+        output_dir = Path(self.config.output_dir)
+        output_dir.mkdir(parents=True, exist_ok=True)
+        recording_path = output_dir / f"{stem}_recording.rec"
+        index_path = output_dir / f"{stem}_recording_index.json"
+
+        offsets: Dict[int, int] = {}
+        keyframes = []
+        with open(recording_path, "wb") as f:
+            f.write(RECORDING_MAGIC)
+            for frame in self.frames:
+                offsets[frame.frame_id] = f.tell()
+                if frame.keyframe:
+                    keyframes.append({"frame_id": frame.frame_id, "timestamp_ms": frame.timestamp_ms,
+                                      "byte_offset": offsets[frame.frame_id]})
+                f.write(FRAME_HEADER.pack(frame.timestamp_ms, int(frame.keyframe), len(frame.data)))
+                f.write(frame.data)
+
+        steps = []
+        for step in self.steps:
+            # Steps older than the window keep their timestamp but lost their frame
+            offset = offsets.get(step["frame_id"])
+            steps.append({**step, "byte_offset": offset, "in_recording": offset is not None})
+
+        index = {
+            "format": RECORDING_MAGIC.decode().strip(),
+            "frame_header": "uint32 timestamp_ms, uint8 keyframe, uint32 length (big-endian)",
+            "window_seconds": self.config.window_seconds,
+            "fps": self.config.fps,
+            "start_ms": self.frames[0].timestamp_ms if self.frames else None,
+            "end_ms": self.frames[-1].timestamp_ms if self.frames else None,
+            "frames": len(self.frames),
+            "frames_evicted": self.frames_evicted,
+            "keyframes": keyframes,
+            "steps": steps
+        }
+        with open(index_path, "w") as f:
+            json.dump(index, f, indent=2)
+
+        return {"recording": str(recording_path), "recording_index": str(index_path)}
+
+    def discard(self) -> None:
+        self.frames.clear()
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "frames_captured": self.frames_captured,
+            "frames_buffered": len(self.frames),
+            "frames_evicted": self.frames_evicted,
+            "bytes_buffered": sum(len(frame.data) for frame in self.frames),
+            "steps": len(self.steps)
+        }
@@ -1,42 +1,267 @@
+import copy
 import json
 from pathlib import Path
 from datetime import datetime
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Callable, Iterator, Optional, Tuple
+from .analytics import TrendAnalytics
+from .performance import PerformanceBudgets, PERF_METRICS
+from .rolling_stats import QuantileSketch
+from .structured_logging import get_logger
+from .report_stream import ReportStream, StreamingReportWriter, iter_section, read_section_page
+
+logger = get_logger("ReportGenerator")
+
+# Navigation is measured once per workflow, so any test that has these metrics carries the workflow's value
+NAVIGATION_METRICS = ("ttfb_ms", "load_ms", "total_bytes", "resource_count")
+
+
+class ReportAggregates:
+    """Report totals folded in one validated result at a time
+    
+    Covers what the report derives from every test: navigation metrics and the
+    action p95 sketch, budget violations, load tests, per-profile matrix counts,
+    executors and artifact counts. With ``keep_items=False`` (streamed reports,
+    whose per-test rows are in the sections) the per-test lists are not kept,
+    only their counts.
+    """
+    
+    def __init__(self, keep_items: bool = True):
+        self.keep_items = keep_items
+        self.navigation: Dict[str, Any] = {}
+        self.action_p95 = QuantileSketch()
+        self.budget_violations: List[Dict[str, Any]] = []
+        self.budget_violation_count = 0
+        self.load_tests: List[Dict[str, Any]] = []
+        self.load_test_count = 0
+        self.matrix: Dict[str, Dict[str, Any]] = {}
+        self.executors = set()
+        self.artifacts = {"total_count": 0, "by_type": {"screenshots": 0, "dom_snapshots": 0,
+                                                        "console_logs": 0, "recordings": 0}}
+    
+    def add(self, test: Dict[str, Any]) -> None:
+        if test.get("executor"):
+            self.executors.add(test["executor"])
+        
+        performance = test.get("performance")
+        if performance:
+            test_metrics = performance.get("metrics", {})
+            for metric in NAVIGATION_METRICS:
+                if self.navigation.get(metric) is None and test_metrics.get(metric) is not None:
+                    self.navigation[metric] = test_metrics[metric]
+            if test_metrics.get("action_p95_ms") is not None:
+                self.action_p95.add(test_metrics["action_p95_ms"])
+            for violation in performance.get("budget_violations", []):
+                self.budget_violation_count += 1
+                if self.keep_items:
+                    self.budget_violations.append(ReportGenerator._violation_row(test, violation))
+        
+        if test.get("load_test"):
+            self.load_test_count += 1
+            if self.keep_items:
+                self.load_tests.append(ReportGenerator._load_test_row(test))
+        
+        profile_name = test.get("matrix_profile") or test.get("metadata", {}).get("profile")
+        if profile_name:
+            profile = self.matrix.setdefault(profile_name, {"total": 0, "passed": 0, "failed": 0,
+                                                            **({"test_ids": []} if self.keep_items else {})})
+            profile["total"] += 1
+            verdict = test.get("validation", {}).get("verdict")
+            if verdict == "PASSED":
+                profile["passed"] += 1
+            elif verdict == "FAILED":
+                profile["failed"] += 1
+            if self.keep_items:
+                profile["test_ids"].append(test.get("test_id"))
+        
+        by_type = self.artifacts["by_type"]
+        for artifact_type in (test.get("artifacts") or {}):
+            self.artifacts["total_count"] += 1
+            if "screenshot" in artifact_type:
+                by_type["screenshots"] += 1
+            elif "dom" in artifact_type:
+                by_type["dom_snapshots"] += 1
+            elif "console" in artifact_type:
+                by_type["console_logs"] += 1
+            elif artifact_type == "recording":
+                by_type["recordings"] += 1
+    
+    def to_dict(self) -> Dict[str, Any]:
+        metrics: Dict[str, Any] = {metric: self.navigation.get(metric) for metric in PERF_METRICS}
+        if self.action_p95.count:
+            metrics["action_p95_ms"] = round(self.action_p95.quantile(0.95), 1)
+        return {
+            "metrics": metrics,
+            "budget_violations": self.budget_violations,
+            "budget_violation_count": self.budget_violation_count,
+            "load_tests": self.load_tests,
+            "load_test_count": self.load_test_count,
+            "matrix": self.matrix,
+            "executors": sorted(self.executors),
+            "artifacts": self.artifacts
+        }
+
 
 class ReportGenerator:
     """Generates comprehensive test reports"""
     
-    def __init__(self, reports_dir: str = "reports"):
+    def __init__(self, reports_dir: str = "reports", budgets: PerformanceBudgets = None,
+                 regression_threshold: float = 0.2, stream_threshold: int = 2000):
         self.reports_dir = Path(reports_dir)
         self.reports_dir.mkdir(exist_ok=True)
+        self.budgets = budgets or PerformanceBudgets.from_file()
+        self.regression_threshold = regression_threshold
+        # Suites with more tests than this write their per-test sections as JSON Lines while they run
+        self.stream_threshold = stream_threshold
+        # Report archive index, also used for performance history
+        self.history = TrendAnalytics(str(self.reports_dir))
+        # Called with the saved path after every save_report (e.g. cache invalidation)
+        self.save_listeners: List[Callable[[str], None]] = []
+    
+    def open_stream(self, workflow_id: str, expected_tests: int) -> Optional[ReportStream]:
+        """Per-workflow report sections for suites above the stream threshold (None otherwise)"""
+        if expected_tests <= self.stream_threshold:
+            return None
+        return ReportStream(str(self.reports_dir), workflow_id, self.stream_rows,
+                            ReportAggregates(keep_items=False))
+    
+    def stream_rows(self, test: Dict[str, Any]) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """Section rows of one validated result: its test_results entry, artifact items,
+        load test curves and per-test budget violations
+        """
+        yield "test_results", self._test_row(test)
+        for artifact_type, artifact_path in (test.get("artifacts") or {}).items():
+            yield "artifacts", self._artifact_item(test, artifact_type, artifact_path)
+        if test.get("load_test"):
+            yield "load_tests", self._load_test_row(test)
+        for violation in (test.get("performance") or {}).get("budget_violations", []):
+            yield "budget_violations", self._violation_row(test, violation)
     
     def generate_report(self, orchestration_result: Dict[str, Any], game_url: str) -> Dict[str, Any]:
-        """Generate comprehensive test report"""
+        """Generate comprehensive test report
+        
+        When the workflow streamed its per-test sections (``report_stream``), the
+        report is only the header: test results, artifact items, load tests and
+        per-test budget violations stay in the JSON Lines files its ``sections``
+        point to, and the totals come from the stream's aggregates.
+        """
+        stream = orchestration_result.get("report_stream")
+        streamed = stream is not None
+        aggregates = self._aggregates(orchestration_result)
+        performance = self._extract_performance(aggregates, game_url)
+        # Workflow suffix keeps ids unique when several games finish in the same second
+        workflow_id = orchestration_result.get("workflow_id")
+        suffix = f"_{workflow_id.rsplit('_', 1)[-1]}" if workflow_id else ""
         
         report = {
-            "report_id": f"report_{datetime.now().strftime('%Y%m%d_%H%M%S')}",
+            "report_id": f"report_{datetime.now().strftime('%Y%m%d_%H%M%S')}{suffix}",
             "timestamp": datetime.now().isoformat(),
             "game_url": game_url,
-            "execution_summary": self._extract_summary(orchestration_result),
-            "test_results": self._extract_test_results(orchestration_result),
+            "execution_summary": self._extract_summary(orchestration_result)
+        }
+        if not streamed:
+            report["test_results"] = self._extract_test_results(orchestration_result)
+        report.update({
             "validation_report": self._extract_validation(orchestration_result),
             "cross_agent_analysis": self._extract_cross_agent(orchestration_result),
-            "artifacts": self._extract_artifacts(orchestration_result),
+            "artifacts": self.extract_artifacts(orchestration_result, include_items=not streamed,
+                                                aggregates=aggregates),
             "verdicts": self._generate_verdicts(orchestration_result),
-            "recommendations": self._generate_recommendations(orchestration_result),
+            "performance": performance,
+            "recommendations": self._generate_recommendations(orchestration_result, performance),
             "metadata": {
                 "total_duration": self._calculate_duration(orchestration_result),
-                "agents_involved": ["PlannerAgent", "RankerAgent", "ExecutorAgent-1", "ExecutorAgent-2", "AnalyzerAgent"],
+                "agents_involved": ["PlannerAgent", "RankerAgent", *aggregates["executors"], "AnalyzerAgent"],
+                "workflow_stages": orchestration_result.get("dag", {}),
                 "report_version": "1.0"
             }
-        }
+        })
+        
+        if orchestration_result.get("matrix"):
+            report["matrix"] = self._extract_matrix(orchestration_result, aggregates)
+        
+        if aggregates["load_tests"]:
+            report["load_tests"] = aggregates["load_tests"]
+        
+        if orchestration_result.get("batch_id"):
+            report["batch_id"] = orchestration_result["batch_id"]
+        
+        if streamed:
+            report["stream_id"] = stream["stream_id"]
+            report["sections"] = dict(stream["sections"])
         
         return report
     
+    def generate_batch_report(self, batch_result: Dict[str, Any],
+                              game_reports: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+        """Combined report of a batch run; ``game_reports`` maps game URL to its own report
+        
+        Saved as <batch_id>.json, outside the report_*.json archive, so trend
+        analytics only count the per-game runs.
+        """
+        games = []
+        executed = passed = failed = 0
+        for result in batch_result.get("games", []):
+            game_url = result.get("game_url", "")
+            report = game_reports.get(game_url)
+            summary = report.get("execution_summary", {}) if report else {}
+            executed += summary.get("test_cases_executed", 0)
+            passed += summary.get("passed_count", 0)
+            failed += summary.get("failed_count", 0)
+            games.append({
+                "game_url": game_url,
+                "workflow_id": result.get("workflow_id"),
+                "status": result.get("status"),
+                "report_id": report.get("report_id") if report else None,
+                "tests_executed": summary.get("test_cases_executed", 0),
+                "passed_count": summary.get("passed_count", 0),
+                "failed_count": summary.get("failed_count", 0),
+                "success_rate": summary.get("success_rate"),
+                "overall_verdict": report.get("verdicts", {}).get("overall_verdict") if report else None,
+                "error": result.get("error")
+            })
+        
+        # Sum of per-game workflow times vs the batch's wall time: >1 means games overlapped
+        game_seconds = sum(r.get("dag", {}).get("total_ms", 0) for r in batch_result.get("games", [])) / 1000
+        wall_seconds = batch_result.get("wall_seconds", 0)
+        
+        return {
+            "report_id": batch_result["batch_id"],
+            "batch_id": batch_result["batch_id"],
+            "timestamp": datetime.now().isoformat(),
+            "tenant": batch_result.get("tenant"),
+            "status": batch_result.get("status"),
+            "execution_summary": {
+                "games": len(games),
+                "games_completed": sum(1 for g in games if g["status"] == "completed"),
+                "games_failing": [g["game_url"] for g in games if g["overall_verdict"] == "FAIL" or g["error"]],
+                "test_cases_executed": executed,
+                "passed_count": passed,
+                "failed_count": failed,
+                "success_rate": f"{(passed / executed * 100):.1f}%" if executed else "0%"
+            },
+            "games": games,
+            "metadata": {
+                "wall_seconds": wall_seconds,
+                "game_seconds": round(game_seconds, 3),
+                "concurrency": round(game_seconds / wall_seconds, 2) if wall_seconds else None,
+                "planning": batch_result.get("planning", {}),
+                "report_version": "1.0"
+            }
+        }
+    
+    def get_batch_report(self, batch_id: str) -> Dict[str, Any]:
+        """Saved combined report of a batch run; FileNotFoundError when unknown"""
+        path = self.reports_dir / f"{batch_id}.json"
+        if not batch_id.startswith("batch_") or "/" in batch_id or "\\" in batch_id or not path.is_file():
+            raise FileNotFoundError(batch_id)
+        with open(path, "r") as f:
+            return json.load(f)
+    
     def _extract_summary(self, result: Dict[str, Any]) -> Dict[str, Any]:
         """Extract execution summary"""
         steps = result.get("steps", {})
         execution = steps.get("execution", {})
+        rolling = steps.get("analysis", {}).get("summary", {})
         
         return {
             "test_cases_generated": steps.get("planning", {}).get("total_tests_generated", 0),
@@ -44,29 +269,120 @@ class ReportGenerator:
             "test_cases_executed": execution.get("total_executed", 0),
             "passed_count": execution.get("passed", 0),
             "failed_count": execution.get("failed", 0),
-            "success_rate": f"{(execution.get('passed', 0) / max(execution.get('total_executed', 1), 1) * 100):.1f}%"
+            "success_rate": rolling.get("success_rate") or f"{(execution.get('passed', 0) / max(execution.get('total_executed', 1), 1) * 100):.1f}%",
+            "duration_seconds": rolling.get("duration_seconds", {})
         }
     
     def _extract_test_results(self, result: Dict[str, Any]) -> List[Dict[str, Any]]:
         """Extract individual test results"""
-        analysis = result.get("steps", {}).get("analysis", {})
-        validated_results = analysis.get("validated_results", [])
-        
-        test_results = []
-        for test in validated_results:
-            test_results.append({
-                "test_id": test.get("test_id"),
-                "description": test.get("description"),
-                "status": test.get("status"),
-                "verdict": test.get("validation", {}).get("verdict"),
-                "evidence": test.get("evidence"),
-                "executor": test.get("executor"),
-                "artifacts": test.get("artifacts"),
-                "validation": test.get("validation"),
-                "triage_notes": test.get("triage_notes")
-            })
+        return [self._test_row(test) for test in self._validated_results(result)]
+    
+    @staticmethod
+    def _validated_results(result: Dict[str, Any]) -> List[Dict[str, Any]]:
+        return result.get("steps", {}).get("analysis", {}).get("validated_results", [])
+    
+    def _aggregates(self, result: Dict[str, Any]) -> Dict[str, Any]:
+        """Per-test totals: folded while streaming, or from the validated results of inline reports"""
+        stream = result.get("report_stream")
+        if stream is not None:
+            return stream["aggregates"]
+        aggregates = ReportAggregates()
+        for test in self._validated_results(result):
+            aggregates.add(test)
+        return aggregates.to_dict()
+    
+    @staticmethod
+    def _test_row(test: Dict[str, Any]) -> Dict[str, Any]:
+        """One test_results entry"""
+        return {
+            "test_id": test.get("test_id"),
+            "description": test.get("description"),
+            "status": test.get("status"),
+            "duration_seconds": test.get("duration_seconds"),
+            "verdict": test.get("validation", {}).get("verdict"),
+            "evidence": test.get("evidence"),
+            "executor": test.get("executor"),
+            "backend": test.get("backend"),
+            "attempts": test.get("attempts", 1),
+            "failure_class": test.get("failure_class"),
+            "artifacts": test.get("artifacts"),
+            "validation": test.get("validation"),
+            "triage_notes": test.get("triage_notes")
+        }
+    
+    def _extract_matrix(self, result: Dict[str, Any], aggregates: Dict[str, Any]) -> Dict[str, Any]:
+        """Group test results per viewport/network profile (streamed reports: counts only, no test_ids)"""
+        matrix = result.get("matrix", {})
+        
+        empty = {"total": 0, "passed": 0, "failed": 0}
+        if result.get("report_stream") is None:
+            empty["test_ids"] = []
+        profiles = {
+            p["profile"]: {**p, **copy.deepcopy(aggregates["matrix"].get(p["profile"], empty))}
+            for p in matrix.get("profiles", [])
+        }
+        
+        for profile in profiles.values():
+            profile["success_rate"] = f"{(profile['passed'] / profile['total'] * 100):.1f}%" if profile["total"] else "0%"
         
-        return test_results
+        return {
+            "setup_steps": matrix.get("setup_steps", []),
+            "sessions_warmed": matrix.get("sessions_warmed", 0),
+            "setup_steps_run": matrix.get("setup_steps_run", 0),
+            "setup_steps_reused": matrix.get("setup_steps_reused", 0),
+            "by_profile": profiles
+        }
+    
+    def _extract_performance(self, aggregates: Dict[str, Any], game_url: str) -> Dict[str, Any]:
+        """Workflow performance metrics, budget violations and regressions against history
+        
+        Per-test violations of streamed reports are in their ``budget_violations`` section;
+        ``test_budget_violations`` counts them either way.
+        """
+        metrics = dict(aggregates["metrics"])
+        violations = list(aggregates["budget_violations"])
+        # Workflow-level check of the aggregated metrics
+        violations.extend({"test_id": None, **v} for v in self.budgets.check(game_url, metrics))
+        
+        self.history.refresh()
+        baseline = self.history.performance_baseline(game_url)
+        regressions = []
+        for metric, value in metrics.items():
+            base = baseline.get(metric, {}).get("mean")
+            if value is None or not base:
+                continue
+            change = (value - base) / base
+            if change > self.regression_threshold:
+                regressions.append({
+                    "metric": metric,
+                    "value": value,
+                    "baseline": base,
+                    "change_percent": round(change * 100, 1)
+                })
+        
+        return {
+            "metrics": metrics,
+            "budget": self.budgets.for_game(game_url),
+            "budget_violations": violations,
+            "test_budget_violations": aggregates["budget_violation_count"],
+            "baseline": baseline,
+            "regressions": regressions,
+            "regression_threshold_percent": round(self.regression_threshold * 100, 1)
+        }
+    
+    @staticmethod
+    def _load_test_row(test: Dict[str, Any]) -> Dict[str, Any]:
+        """Throughput, error rate and latency curves of one load-tested case"""
+        return {
+            "test_id": test.get("test_id"),
+            "description": test.get("description"),
+            "status": test.get("status"),
+            **{k: v for k, v in test["load_test"].items() if k != "config"}
+        }
+    
+    @staticmethod
+    def _violation_row(test: Dict[str, Any], violation: Dict[str, Any]) -> Dict[str, Any]:
+        return {"test_id": test.get("test_id"), **violation}
     
     def _extract_validation(self, result: Dict[str, Any]) -> Dict[str, Any]:
         """Extract validation details"""
@@ -78,6 +394,7 @@ class ReportGenerator:
             "validation_passed": summary.get("passed", 0),
             "validation_failed": summary.get("failed", 0),
             "flaky_tests": summary.get("flaky", 0),
+            "inconclusive_tests": summary.get("inconclusive", 0),
             "overall_success_rate": summary.get("success_rate", "0%")
         }
     
@@ -91,39 +408,27 @@ class ReportGenerator:
             "notes": "High consistency achieved across multiple agents"
         })
     
-    def _extract_artifacts(self, result: Dict[str, Any]) -> Dict[str, Any]:
-        """Extract artifact information"""
-        test_results = result.get("steps", {}).get("analysis", {}).get("validated_results", [])
-        
-        artifacts = {
-            "total_count": 0,
-            "by_type": {
-                "screenshots": 0,
-                "dom_snapshots": 0,
-                "console_logs": 0
-            },
-            "items": []
-        }
-        
-        for test in test_results:
-            test_artifacts = test.get("artifacts", {})
-            for artifact_type, artifact_path in test_artifacts.items():
-                artifacts["total_count"] += 1
-                if "screenshot" in artifact_type:
-                    artifacts["by_type"]["screenshots"] += 1
-                elif "dom" in artifact_type:
-                    artifacts["by_type"]["dom_snapshots"] += 1
-                elif "console" in artifact_type:
-                    artifacts["by_type"]["console_logs"] += 1
-                
-                artifacts["items"].append({
-                    "test_id": test.get("test_id"),
-                    "type": artifact_type,
-                    "path": artifact_path
-                })
-        
+    def extract_artifacts(self, result: Dict[str, Any], include_items: bool = True,
+                          aggregates: Dict[str, Any] = None) -> Dict[str, Any]:
+        """Extract artifact information (``include_items=False``: counts only)"""
+        counts = (aggregates or self._aggregates(result))["artifacts"]
+        artifacts = {"total_count": counts["total_count"], "by_type": dict(counts["by_type"])}
+        if include_items:
+            artifacts["items"] = [
+                self._artifact_item(test, artifact_type, artifact_path)
+                for test in self._validated_results(result)
+                for artifact_type, artifact_path in (test.get("artifacts") or {}).items()
+            ]
         return artifacts
     
+    @staticmethod
+    def _artifact_item(test: Dict[str, Any], artifact_type: str, artifact_path: str) -> Dict[str, Any]:
+        return {
+            "test_id": test.get("test_id"),
+            "type": artifact_type,
+            "path": artifact_path
+        }
+    
     def _generate_verdicts(self, result: Dict[str, Any]) -> Dict[str, Any]:
         """Generate overall verdicts"""
         analysis = result.get("steps", {}).get("analysis", {})
@@ -148,7 +453,7 @@ class ReportGenerator:
             "recommendation": recommendation
         }
     
-    def _generate_recommendations(self, result: Dict[str, Any]) -> List[str]:
+    def _generate_recommendations(self, result: Dict[str, Any], performance: Dict[str, Any] = None) -> List[str]:
         """Generate recommendations based on results"""
         recommendations = [
             "Continue regression testing in production-like environment",
@@ -166,6 +471,10 @@ class ReportGenerator:
         if flaky_count > 0:
             recommendations.insert(0, f"Investigate {flaky_count} flaky test(s)")
         
+        if performance and performance["regressions"]:
+            metrics = ", ".join(r["metric"] for r in performance["regressions"])
+            recommendations.insert(0, f"Investigate performance regression(s) against recent runs: {metrics}")
+        
         return recommendations
     
     def _calculate_duration(self, result: Dict[str, Any]) -> str:
@@ -183,17 +492,64 @@ class ReportGenerator:
         with open(report_path, 'w') as f:
             json.dump(report, f, indent=2)
         
-        print(f"Report saved to {report_path}")
+        logger.info(f"Report saved to {report_path}", extra={"report_id": report["report_id"]})
+        for listener in self.save_listeners:
+            listener(str(report_path))
         return str(report_path)
     
+    def save_streaming_report(self, report: Dict[str, Any], shipped=None) -> str:
+        """Save a streamed report's header; with ``shipped`` (ShippedArtifacts) the artifacts
+        section is first rewritten row by row with each item's archive URI
+        """
+        if shipped is not None:
+            if "artifacts" in report["sections"]:
+                with StreamingReportWriter(str(self.reports_dir), report["stream_id"]) as writer:
+                    for item in iter_section(str(self.reports_dir), report, "artifacts"):
+                        writer.write("artifacts", shipped.annotate(item))
+                report["sections"].update(writer.sections())
+            report["artifacts"]["shipping"] = shipped.to_dict()
+        return self.save_report(report)
+    
+    def _report_header(self, report_id: str) -> Dict[str, Any]:
+        path = self.reports_dir / f"{report_id}.json"
+        if not report_id.startswith("report_") or "/" in report_id or "\\" in report_id or not path.is_file():
+            raise FileNotFoundError(report_id)
+        with open(path, "r") as f:
+            return json.load(f)
+    
+    def get_report_section(self, report_id: str, section: str, offset: int = 0, limit: int = 500) -> Dict[str, Any]:
+        """One page of a saved report's section; FileNotFoundError for unknown reports or sections"""
+        report = self._report_header(report_id)
+        if "sections" in report:
+            entry = report["sections"].get(section)
+            if entry is None:
+                raise FileNotFoundError(f"{report_id}/{section}")
+            rows, total = read_section_page(str(self.reports_dir), report, section, offset, limit), entry["count"]
+        else:
+            # Small reports keep their sections inline
+            inline = None
+            if section == "test_results":
+                inline = report.get("test_results")
+            elif section == "artifacts":
+                inline = report.get("artifacts", {}).get("items")
+            elif section == "load_tests":
+                inline = report.get("load_tests", [])
+            elif section == "budget_violations":
+                inline = [v for v in report.get("performance", {}).get("budget_violations", [])
+                          if v.get("test_id") is not None]
+            if inline is None:
+                raise FileNotFoundError(f"{report_id}/{section}")
+            rows, total = inline[offset:offset + limit], len(inline)
+        return {"report_id": report_id, "section": section, "offset": offset, "limit": limit,
+                "total": total, "rows": rows}
+    
     def get_latest_report(self) -> Dict[str, Any]:
-        """Get latest report from disk"""
+        """Get latest report from disk (streamed reports: the header, sections are read by page)"""
         reports = list(self.reports_dir.glob("report_*.json"))
         
         if not reports:
             return {"error": "No reports found"}
         
         latest = sorted(reports)[-1]
-        
-        with open(latest, 'r') as f:
+        with open(latest, "r") as f:
             return json.load(f)
@@ -0,0 +1,54 @@
+import asyncio
+from typing import Dict, Any
+
+from .report_stream import iter_section
+from .workflow_dag import Stage, WorkflowDAG
+
+
+class ReportPipeline:
+    """Post-workflow stages: report building and artifact shipping overlap, then save and history refresh"""
+
+    def __init__(self, report_generator, artifact_shipper=None):
+        self.report_generator = report_generator
+        self.artifact_shipper = artifact_shipper
+        self.dag = WorkflowDAG([
+            Stage("build_report", self._build_report),
+            Stage("ship_artifacts", self._ship_artifacts),
+            Stage("save_report", self._save_report, depends_on=["build_report", "ship_artifacts"]),
+            Stage("refresh_history", self._refresh_history, depends_on=["save_report"]),
+        ])
+
+    async def run(self, workflow_result: Dict[str, Any]) -> Dict[str, Any]:
+        """Build, ship and save the report for a finished workflow"""
+        dag = await self.dag.run(workflow_result)
+        outputs = dag.pop("outputs")
+        return {"report": outputs["build_report"], "report_path": outputs["save_report"], "stages": dag}
+
+    async def _build_report(self, result: Dict[str, Any], inputs: Dict[str, Any]) -> Dict[str, Any]:
+        # Off the event loop so it overlaps with the artifact uploads; streamed workflows only get the header
+        return await asyncio.to_thread(self.report_generator.generate_report, result, result.get("game_url", ""))
+
+    async def _ship_artifacts(self, result: Dict[str, Any], inputs: Dict[str, Any]) -> Any:
+        if self.artifact_shipper is None:
+            return None
+        # Keyed by workflow id, so a resumed workflow reuses batches already uploaded
+        report_id = result.get("workflow_id") or "report"
+        stream = result.get("report_stream")
+        if stream is not None:
+            # Paths are read lazily from the streamed artifacts section; save_report rewrites it with URIs
+            items = iter_section(str(self.report_generator.reports_dir), stream, "artifacts")
+            return await self.artifact_shipper.ship_paths(report_id, (item.get("path") for item in items))
+        shipped = {"report_id": report_id, "artifacts": self.report_generator.extract_artifacts(result)}
+        await self.artifact_shipper.ship(shipped)
+        return shipped["artifacts"]
+
+    async def _save_report(self, result: Dict[str, Any], inputs: Dict[str, Any]) -> str:
+        report, shipped = inputs["build_report"], inputs["ship_artifacts"]
+        if "sections" in report:
+            return await asyncio.to_thread(self.report_generator.save_streaming_report, report, shipped)
+        if shipped is not None:
+            report["artifacts"] = shipped
+        return self.report_generator.save_report(report)
+
+    async def _refresh_history(self, result: Dict[str, Any], inputs: Dict[str, Any]) -> int:
+        return self.report_generator.history.refresh()
@@ -0,0 +1,102 @@
+import json
+from itertools import islice
+from pathlib import Path
+from typing import Dict, List, Any, Callable, Iterable, Iterator, Tuple
+
+# Sections stored as JSON Lines next to the report header when a report is streamed
+SECTIONS = ("test_results", "artifacts", "load_tests", "budget_violations")
+
+
+class StreamingReportWriter:
+    """Writes report sections row by row as JSON Lines, so memory stays constant.
+
+    Each section goes to ``<report_id>.<section>.jsonl`` under a temporary
+    name and is renamed into place on a clean exit; the caller writes the
+    small JSON header (with ``sections``) afterwards, so a reader that finds
+    the header always finds complete sections.
+    """
+
+    def __init__(self, reports_dir: str, report_id: str, buffer_bytes: int = 1024 * 1024):
+        self.reports_dir = Path(reports_dir)
+        self.report_id = report_id
+        self.buffer_bytes = buffer_bytes
+        self._files: Dict[str, Any] = {}
+        self.counts: Dict[str, int] = {}
+
+    def _path(self, section: str) -> Path:
+        return self.reports_dir / f"{self.report_id}.{section}.jsonl"
+
+    def write(self, section: str, row: Dict[str, Any]) -> None:
+        f = self._files.get(section)
+        if f is None:
+            f = open(self._path(section).with_suffix(".tmp"), "w", buffering=self.buffer_bytes)
+            self._files[section] = f
+            self.counts[section] = 0
+        f.write(json.dumps(row))
+        f.write("\n")
+        self.counts[section] += 1
+
+    def sections(self) -> Dict[str, Dict[str, Any]]:
+        """Header entry: file name and row count per section"""
+        return {name: {"file": self._path(name).name, "count": count} for name, count in self.counts.items()}
+
+    def __enter__(self) -> "StreamingReportWriter":
+        self.reports_dir.mkdir(parents=True, exist_ok=True)
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        for section, f in self._files.items():
+            f.close()
+            tmp_path = self._path(section).with_suffix(".tmp")
+            if exc_type is None:
+                tmp_path.replace(self._path(section))
+            else:
+                tmp_path.unlink(missing_ok=True)
+
+
+def iter_section(reports_dir: str, report: Dict[str, Any], section: str) -> Iterator[Dict[str, Any]]:
+    """Rows of a streamed report's section, read lazily (nothing for inline reports)"""
+    entry = report.get("sections", {}).get(section)
+    if not entry:
+        return
+    with open(Path(reports_dir) / entry["file"], "r") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def read_section_page(reports_dir: str, report: Dict[str, Any], section: str, offset: int = 0,
+                      limit: int = 500) -> List[Dict[str, Any]]:
+    """One page of a streamed section, reading only up to the rows requested"""
+    return list(islice(iter_section(reports_dir, report, section), offset, offset + limit))
+
+
+class ReportStream:
+    """A workflow's report sections, written as its validated results arrive.
+
+    ``rows`` maps one validated result to its (section, row) pairs, and
+    ``aggregates`` (anything with ``add(result)`` and ``to_dict()``) folds
+    it into the report's totals, so the result itself can be dropped. The
+    sections are named after the workflow, not the report (whose id is
+    only assigned when the report is built), and referenced from the
+    report header through ``sections``.
+    """
+
+    def __init__(self, reports_dir: str, stream_id: str,
+                 rows: Callable[[Dict[str, Any]], Iterable[Tuple[str, Dict[str, Any]]]], aggregates: Any = None):
+        self.stream_id = stream_id
+        self.rows = rows
+        self.aggregates = aggregates
+        self.writer = StreamingReportWriter(reports_dir, stream_id).__enter__()
+
+    def add(self, validated_result: Dict[str, Any]) -> None:
+        for section, row in self.rows(validated_result):
+            self.writer.write(section, row)
+        if self.aggregates is not None:
+            self.aggregates.add(validated_result)
+
+    def close(self) -> Dict[str, Any]:
+        """Publish the sections written so far (also after a failed workflow: every row is complete)"""
+        self.writer.__exit__(None, None, None)
+        return {"stream_id": self.stream_id, "sections": self.writer.sections(),
+                "aggregates": self.aggregates.to_dict() if self.aggregates is not None else {}}
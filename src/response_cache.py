@@ -0,0 +1,149 @@
+import gzip
+import hashlib
+import inspect
+import json
+import time
+from collections import OrderedDict
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Dict, List, Any, Optional, Callable, Tuple
+
+from starlette.requests import Request
+from starlette.responses import Response
+
+from .compression import brotli, negotiate_encoding
+
+# Compressed variants carry the encoding in their ETag so caches never mix them up
+ENCODING_SUFFIX = {"br": "-br", "gzip": "-gz"}
+
+
+class CachedResponse:
+    """One serialized JSON body plus its validators and compressed variants"""
+
+    def __init__(self, body: bytes, versions: Tuple[int, ...], fingerprint: Any, expires_at: Optional[float],
+                 last_modified: float = None):
+        self.body = body
+        self.etag = hashlib.sha256(body).hexdigest()[:32]
+        self.versions = versions
+        self.fingerprint = fingerprint
+        self.expires_at = expires_at
+        self.last_modified = int(last_modified if last_modified is not None else time.time())
+        self.encoded: Dict[str, bytes] = {}
+
+    def variant(self, encoding: Optional[str], min_bytes: int) -> Tuple[Optional[str], bytes]:
+        """Body for the negotiated encoding, compressed at most once per entry"""
+        if encoding is None or len(self.body) < min_bytes:
+            return None, self.body
+        if encoding not in self.encoded:
+            if encoding == "br":
+                self.encoded[encoding] = brotli.compress(self.body, quality=5)
+            else:
+                self.encoded[encoding] = gzip.compress(self.body, compresslevel=6)
+        return encoding, self.encoded[encoding]
+
+
+class ResponseCache:
+    """Cache for read-only JSON endpoints with conditional request support.
+
+    Entries are tagged with event names ("workflow", "reports", "artifacts");
+    ``invalidate`` bumps a tag's version and every entry built under an older
+    version is rebuilt on its next request. An optional ``fingerprint`` (e.g.
+    a directory mtime) catches changes made outside this process, and a
+    ``ttl`` bounds entries whose content drifts without an event.
+    """
+
+    def __init__(self, max_entries: int = 256, min_compress_bytes: int = 1024):
+        self.max_entries = max_entries
+        self.min_compress_bytes = min_compress_bytes
+        self.versions: Dict[str, int] = {}
+        self._entries: "OrderedDict[str, CachedResponse]" = OrderedDict()
+        self.stats = {"hits": 0, "misses": 0, "not_modified": 0, "invalidations": 0}
+
+    def invalidate(self, *tags: str) -> None:
+        for tag in tags:
+            self.versions[tag] = self.versions.get(tag, 0) + 1
+        self.stats["invalidations"] += 1
+
+    def _current(self, key: str, versions: Tuple[int, ...], fingerprint: Any) -> Optional[CachedResponse]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry.versions != versions or entry.fingerprint != fingerprint:
+            return None
+        if entry.expires_at is not None and time.monotonic() >= entry.expires_at:
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    async def respond(self, request: Request, key: str, producer: Callable[[], Any], tags: List[str] = (),
+                      fingerprint: Callable[[], Any] = None, ttl: float = None) -> Response:
+        """Serve ``producer()``'s JSON from cache, answering 304 when the client's copy is current"""
+        versions = tuple(self.versions.get(tag, 0) for tag in tags)
+        marker = fingerprint() if fingerprint else None
+
+        entry = self._current(key, versions, marker)
+        if entry is not None:
+            self.stats["hits"] += 1
+        else:
+            self.stats["misses"] += 1
+            content = producer()
+            if inspect.isawaitable(content):
+                content = await content
+            body = json.dumps(content, ensure_ascii=False, separators=(",", ":"), default=str).encode("utf-8")
+
+            previous = self._entries.get(key)
+            entry = CachedResponse(body, versions, marker,
+                                   time.monotonic() + ttl if ttl is not None else None)
+            if previous is not None and previous.etag == entry.etag:
+                # Rebuilt but unchanged: keep the validators clients already hold
+                entry.last_modified = previous.last_modified
+                entry.encoded = previous.encoded
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+        encoding = negotiate_encoding(request.headers.get("accept-encoding", ""))
+        encoding, payload = entry.variant(encoding, self.min_compress_bytes)
+        headers = {
+            "ETag": f'"{entry.etag}{ENCODING_SUFFIX.get(encoding, "")}"',
+            "Last-Modified": formatdate(entry.last_modified, usegmt=True),
+            "Cache-Control": "no-cache",
+            "Vary": "Accept-Encoding"
+        }
+
+        if self._not_modified(request, entry):
+            self.stats["not_modified"] += 1
+            return Response(status_code=304, headers=headers)
+
+        if encoding:
+            headers["Content-Encoding"] = encoding
+        return Response(content=payload, media_type="application/json", headers=headers)
+
+    @staticmethod
+    def _not_modified(request: Request, entry: CachedResponse) -> bool:
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match is not None:
+            for tag in if_none_match.split(","):
+                tag = tag.strip()
+                if tag == "*":
+                    return True
+                tag = tag[2:] if tag.startswith("W/") else tag
+                tag = tag.strip('"')
+                for suffix in ENCODING_SUFFIX.values():
+                    if tag.endswith(suffix):
+                        tag = tag[:-len(suffix)]
+                if tag == entry.etag:
+                    return True
+            # If-None-Match takes precedence over If-Modified-Since
+            return False
+
+        if_modified_since = request.headers.get("if-modified-since")
+        if if_modified_since:
+            try:
+                return entry.last_modified <= parsedate_to_datetime(if_modified_since).timestamp()
+            except (TypeError, ValueError):
+                return False
+        return False
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {"entries": len(self._entries), "versions": dict(self.versions), **self.stats}
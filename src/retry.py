@@ -0,0 +1,158 @@
+import asyncio
+import random
+import time
+from typing import Dict, Any, Optional, Iterable
+from urllib.parse import urlparse
+
+# Failure classes
+INFRASTRUCTURE = "infrastructure"
+TIMEOUT = "timeout"
+ASSERTION = "assertion"
+# Anything else raised by the harness: a bug in a backend or in our own code, not worth retrying
+ERROR = "error"
+
+TRANSIENT_CLASSES = (INFRASTRUCTURE, TIMEOUT)
+
+# Exception type names treated as infrastructure problems even when the
+# defining library (httpx, playwright, ...) is not imported here
+INFRASTRUCTURE_ERROR_NAMES = {
+    "ConnectError", "ConnectTimeout", "NetworkError", "RemoteProtocolError",
+    "ReadError", "WriteError", "PoolTimeout", "TargetClosedError", "BrowserError",
+}
+
+
+class InfrastructureError(Exception):
+    """Raised when the test harness, browser or network failed (not the game)"""
+
+
+class CircuitOpenError(InfrastructureError):
+    """Raised when a host's circuit breaker rejects a call"""
+
+
+def classify_failure(exc: Optional[BaseException] = None, result: Optional[Dict[str, Any]] = None) -> Optional[str]:
+    """Classify a failed attempt as infrastructure, timeout, assertion or error"""
+    if exc is not None:
+        if isinstance(exc, (asyncio.TimeoutError, TimeoutError)):
+            return TIMEOUT
+        if isinstance(exc, (InfrastructureError, ConnectionError, OSError)):
+            return INFRASTRUCTURE
+        if type(exc).__name__ in INFRASTRUCTURE_ERROR_NAMES:
+            return INFRASTRUCTURE
+        if isinstance(exc, AssertionError):
+            return ASSERTION
+        # KeyError, TypeError, ... are programming errors; retrying won't help and the host is not at fault
+        return ERROR
+
+    if result is not None:
+        if result.get("failure_class"):
+            return result["failure_class"]
+        if result.get("status") == "failed":
+            return ASSERTION
+
+    return None
+
+
+def host_of(url: str) -> str:
+    """Circuit breaker key for a game URL"""
+    parsed = urlparse(url)
+    return parsed.netloc or parsed.path or url
+
+
+class RetryPolicy:
+    """Retry transient failure classes with exponential backoff and full jitter"""
+
+    def __init__(self, max_attempts: int = 3, base_delay: float = 0.2, max_delay: float = 5.0,
+                 retry_on: Iterable[str] = TRANSIENT_CLASSES, attempt_timeout: float = 60.0):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.retry_on = set(retry_on)
+        self.attempt_timeout = attempt_timeout
+
+    def should_retry(self, failure_class: Optional[str], attempt: int) -> bool:
+        return failure_class in self.retry_on and attempt < self.max_attempts
+
+    def backoff(self, attempt: int) -> float:
+        """Delay before the next attempt (attempt is 1-based)"""
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** (attempt - 1))))
+
+
+class CircuitBreaker:
+    """Closed -> open after consecutive transient failures -> half-open probe after cooldown"""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self._probe_in_flight = False
+        self._probe_started = 0.0
+
+    def allow(self) -> bool:
+        if self.state == self.CLOSED:
+            return True
+        now = time.monotonic()
+        if self.state == self.OPEN and now - self.opened_at >= self.reset_timeout:
+            self.state = self.HALF_OPEN
+            self._probe_in_flight = False
+        if self.state == self.HALF_OPEN and self._probe_in_flight and now - self._probe_started >= self.reset_timeout:
+            # The probe never reported back (cancelled with its workflow); treat it as lost
+            self._probe_in_flight = False
+        if self.state == self.HALF_OPEN and not self._probe_in_flight:
+            # Let exactly one probe through
+            self._probe_in_flight = True
+            self._probe_started = now
+            return True
+        return False
+
+    def release_probe(self) -> None:
+        """Give up a half-open probe that ended without a verdict (e.g. cancelled)"""
+        self._probe_in_flight = False
+
+    def record_success(self) -> None:
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self._probe_in_flight = False
+
+    def record_failure(self, failure_class: Optional[str]) -> None:
+        if failure_class not in TRANSIENT_CLASSES:
+            # Game assertion failures say nothing about host health; a harness error
+            # says nothing either way, so the probe is given up rather than counted
+            if self.state == self.HALF_OPEN:
+                if failure_class == ERROR:
+                    self.release_probe()
+                else:
+                    self.record_success()
+            return
+
+        self.consecutive_failures += 1
+        if self.state == self.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            self.state = self.OPEN
+            self.opened_at = time.monotonic()
+            self._probe_in_flight = False
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"state": self.state, "consecutive_failures": self.consecutive_failures}
+
+
+class CircuitBreakerRegistry:
+    """One circuit breaker per game host, shared by all executors"""
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._breakers: Dict[str, CircuitBreaker] = {}
+
+    def for_url(self, url: str) -> CircuitBreaker:
+        host = host_of(url)
+        if host not in self._breakers:
+            self._breakers[host] = CircuitBreaker(self.failure_threshold, self.reset_timeout)
+        return self._breakers[host]
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {host: breaker.to_dict() for host, breaker in self._breakers.items()}
@@ -0,0 +1,105 @@
+import math
+from typing import Dict, Any, Iterable
+
+class QuantileSketch:
+    """Streaming quantile sketch with bounded relative error (DDSketch-style).
+
+    Values are counted in logarithmic buckets, so memory grows with the
+    dynamic range of the data rather than the number of samples, and any
+    quantile is accurate to within ``relative_accuracy`` of the true value.
+    """
+
+    def __init__(self, relative_accuracy: float = 0.01):
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.buckets: Dict[int, int] = {}
+        self.zero_count = 0
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+
+    def add(self, value: float) -> None:
+        value = max(float(value), 0.0)
+        self.count += 1
+        self.total += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+        if value <= 1e-9:
+            self.zero_count += 1
+            return
+
+        key = math.ceil(math.log(value) / self._log_gamma)
+        self.buckets[key] = self.buckets.get(key, 0) + 1
+
+    def merge(self, other: "QuantileSketch") -> None:
+        for key, count in other.buckets.items():
+            self.buckets[key] = self.buckets.get(key, 0) + count
+        self.zero_count += other.zero_count
+        self.count += other.count
+        self.total += other.total
+        if other.min is not None:
+            self.min = other.min if self.min is None else min(self.min, other.min)
+            self.max = other.max if self.max is None else max(self.max, other.max)
+
+    def quantile(self, q: float) -> float:
+        if self.count == 0:
+            return 0.0
+
+        rank = q * (self.count - 1)
+        if rank < self.zero_count:
+            return 0.0
+
+        seen = self.zero_count
+        for key in sorted(self.buckets):
+            seen += self.buckets[key]
+            if seen > rank:
+                # Midpoint of the bucket in relative terms
+                estimate = 2 * self.gamma ** key / (self.gamma + 1)
+                return min(max(estimate, self.min), self.max)
+
+        return self.max
+
+    def summary(self, quantiles: Iterable[float] = (0.5, 0.9, 0.95, 0.99)) -> Dict[str, float]:
+        result = {f"p{int(q * 100)}": round(self.quantile(q), 3) for q in quantiles}
+        result["mean"] = round(self.total / self.count, 3) if self.count else 0.0
+        result["min"] = round(self.min, 3) if self.min is not None else 0.0
+        result["max"] = round(self.max, 3) if self.max is not None else 0.0
+        return result
+
+
+class RollingSummary:
+    """Running test counts, success rate and duration percentiles, updated per result"""
+
+    VERDICT_KEYS = {"PASSED": "passed", "FAILED": "failed", "FLAKY": "flaky", "INCONCLUSIVE": "inconclusive"}
+
+    def __init__(self):
+        self.total_tests = 0
+        self.counts = {"passed": 0, "failed": 0, "flaky": 0, "inconclusive": 0}
+        self.durations = QuantileSketch()
+
+    def add(self, validated_result: Dict[str, Any]) -> None:
+        """Fold one validated result into the aggregates"""
+        self.total_tests += 1
+        verdict = validated_result.get("validation", {}).get("verdict", "INCONCLUSIVE")
+        key = self.VERDICT_KEYS.get(verdict, "inconclusive")
+        self.counts[key] += 1
+        self.durations.add(validated_result.get("duration_seconds", 0.0) or 0.0)
+
+    @property
+    def success_rate(self) -> float:
+        return self.counts["passed"] / self.total_tests * 100 if self.total_tests > 0 else 0.0
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Current aggregates in the analyzer's summary format"""
+        return {
+            "total_tests": self.total_tests,
+            "passed": self.counts["passed"],
+            "failed": self.counts["failed"],
+            "flaky": self.counts["flaky"],
+            "inconclusive": self.counts["inconclusive"],
+            "success_rate": f"{self.success_rate:.1f}%" if self.total_tests > 0 else "0%",
+            "duration_seconds": self.durations.summary()
+        }
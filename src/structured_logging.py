@@ -0,0 +1,169 @@
+import atexit
+import contextvars
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Any, Optional
+
+ROOT_LOGGER = "game_tester"
+
+# Correlation fields (workflow_id, tenant, ...) of the running task
+log_context: contextvars.ContextVar[Dict[str, Any]] = contextvars.ContextVar("log_context", default={})
+
+_STANDARD_ATTRS = set(logging.LogRecord("", 0, "", 0, "", (), None).__dict__) | {"message", "asctime", "taskName"}
+_configured = False
+_config_lock = threading.Lock()
+_listener: Optional[logging.handlers.QueueListener] = None
+_queue_handler: Optional[logging.handlers.QueueHandler] = None
+
+
+@contextmanager
+def bind(**fields: Any):
+    """Attach correlation fields to every record logged inside the block (and tasks it spawns)"""
+    token = log_context.set({**log_context.get(), **fields})
+    try:
+        yield
+    finally:
+        log_context.reset(token)
+
+
+class CorrelationFilter(logging.Filter):
+    """Copies the task's correlation fields onto the record while still in the caller's context"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        for key, value in log_context.get().items():
+            if not hasattr(record, key):
+                setattr(record, key, value)
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """Keeps 1 in N records per call site of a sampled category (extra={"sample": "per_test"}).
+
+    Warnings and errors always pass; counting per call site keeps e.g. both
+    the "started" and "completed" lines of a test represented.
+    """
+
+    def __init__(self, rates: Dict[str, float]):
+        super().__init__()
+        self.every = {category: max(1, round(1 / rate)) if rate > 0 else 0 for category, rate in rates.items()}
+        self.seen: Dict[tuple, int] = {}
+        self.dropped = 0
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        category = getattr(record, "sample", None)
+        if category is None or record.levelno >= logging.WARNING or category not in self.every:
+            return True
+        site = (category, record.pathname, record.lineno)
+        count = self.seen.get(site, 0)
+        self.seen[site] = count + 1
+        every = self.every[category]
+        keep = every > 0 and count % every == 0
+        if not keep:
+            self.dropped += 1
+        return keep
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: timestamp, level, logger, message, correlation and extra fields"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage()
+        }
+        for key, value in record.__dict__.items():
+            if key not in _STANDARD_ATTRS and key != "sample":
+                entry[key] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    """Human-readable lines for local development"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        ts = datetime.fromtimestamp(record.created).strftime("%Y-%m-%d %H:%M:%S")
+        workflow = getattr(record, "workflow_id", None)
+        prefix = f"[{ts}] {getattr(record, 'agent', record.name)}"
+        line = f"{prefix}{f' [{workflow}]' if workflow else ''}: {record.getMessage()}"
+        if record.exc_info:
+            line += "\n" + self.formatException(record.exc_info)
+        return line
+
+
+def _parse_pairs(value: str) -> Dict[str, str]:
+    pairs = {}
+    for part in value.split(","):
+        key, _, setting = part.partition("=")
+        if key.strip() and setting.strip():
+            pairs[key.strip()] = setting.strip()
+    return pairs
+
+
+def logger_name(name: str) -> str:
+    """Full logger name under the package root (agents use <Class>.<agent_id>)"""
+    return name if name.startswith(ROOT_LOGGER) else f"{ROOT_LOGGER}.{name}"
+
+
+def configure_logging(stream=None) -> None:
+    """Install the queue-based handler once; formatting and writes happen on a listener thread
+
+    LOG_LEVEL: root level; LOG_LEVELS: per agent/component, e.g. "ExecutorAgent=WARNING,GameInteraction=ERROR";
+    LOG_SAMPLE_RATES: e.g. "per_test=0.1"; LOG_FORMAT: json (default) or text.
+    """
+    global _configured, _listener, _queue_handler
+    with _config_lock:
+        if _configured:
+            return
+
+        root = logging.getLogger(ROOT_LOGGER)
+        root.setLevel(os.getenv("LOG_LEVEL", "INFO").upper())
+        root.propagate = False
+        for name, level in _parse_pairs(os.getenv("LOG_LEVELS", "")).items():
+            logging.getLogger(logger_name(name)).setLevel(level.upper())
+
+        output = logging.StreamHandler(stream or sys.stdout)
+        output.setFormatter(TextFormatter() if os.getenv("LOG_FORMAT", "json") == "text" else JsonFormatter())
+
+        log_queue: queue.SimpleQueue = queue.SimpleQueue()
+        queue_handler = logging.handlers.QueueHandler(log_queue)
+        queue_handler.addFilter(CorrelationFilter())
+        rates = {k: float(v) for k, v in _parse_pairs(os.getenv("LOG_SAMPLE_RATES", "")).items()}
+        queue_handler.addFilter(SamplingFilter(rates))
+        root.addHandler(queue_handler)
+        _queue_handler = queue_handler
+
+        _listener = logging.handlers.QueueListener(log_queue, output, respect_handler_level=True)
+        _listener.start()
+        atexit.unregister(shutdown_logging)
+        atexit.register(shutdown_logging)
+        _configured = True
+
+
+def shutdown_logging() -> None:
+    """Flush queued records and stop the listener thread; configure_logging can start it again"""
+    global _configured, _listener, _queue_handler
+    with _config_lock:
+        if _queue_handler is not None:
+            # Detach first so nothing is queued after the listener's final drain
+            logging.getLogger(ROOT_LOGGER).removeHandler(_queue_handler)
+            _queue_handler = None
+        if _listener is not None:
+            _listener.stop()
+            _listener = None
+        _configured = False
+
+
+def get_logger(name: str) -> logging.Logger:
+    configure_logging()
+    return logging.getLogger(logger_name(name))
@@ -0,0 +1,230 @@
+import asyncio
+import hashlib
+import json
+import time
+from pathlib import Path
+from typing import Dict, List, Any, Callable, Iterable, Optional
+
+
+class StageSkipped(Exception):
+    """Raised for a stage whose dependency failed"""
+
+
+class Stage:
+    """One node of a workflow DAG.
+
+    ``run(state, inputs)`` is an async callable; ``inputs`` maps each
+    dependency name to that stage's output. With ``memoize`` the output is
+    cached by a hash of the inputs (plus ``memo_key(state)``), and with
+    ``checkpoint`` it is restored from the workflow journal on resume
+    (when ``restore_if(state)`` allows it). ``checkpoint_as(output)`` picks
+    what is journaled and ``restore_as(state, saved)`` rebuilds the output
+    from it, so bulky parts can be derived from state instead of stored.
+    """
+
+    def __init__(self, name: str, run: Callable, depends_on: Iterable[str] = (), memoize: bool = False,
+                 memo_key: Callable = None, memo_if: Callable = None, checkpoint: bool = False,
+                 restore_if: Callable = None, checkpoint_as: Callable = None, restore_as: Callable = None,
+                 version: str = "1"):
+        self.name = name
+        self.run = run
+        self.depends_on = list(depends_on)
+        self.memoize = memoize
+        self.memo_key = memo_key
+        self.memo_if = memo_if
+        self.checkpoint = checkpoint
+        self.restore_if = restore_if
+        self.checkpoint_as = checkpoint_as
+        self.restore_as = restore_as
+        self.version = version
+
+    def checkpoint_data(self, output: Any) -> Any:
+        """What the journal stores for this stage's output"""
+        return self.checkpoint_as(output) if self.checkpoint_as else output
+
+
+class StageMemo:
+    """Disk cache of memoized stage outputs, keyed by stage name and input hash
+
+    Entries older than ``max_age_seconds`` (None: never) are treated as
+    misses and recomputed, so e.g. a game's test plan is eventually refreshed.
+    """
+
+    def __init__(self, cache_dir: str = "cache/stages", max_age_seconds: Optional[float] = None):
+        self.cache_dir = Path(cache_dir)
+        self.max_age_seconds = max_age_seconds
+        self.stats = {"hits": 0, "misses": 0}
+
+    def key(self, stage: Stage, inputs: Dict[str, Any], state: Any) -> Optional[str]:
+        material = {
+            "stage": stage.name,
+            "version": stage.version,
+            "inputs": inputs,
+            "extra": stage.memo_key(state) if stage.memo_key else None
+        }
+        try:
+            encoded = json.dumps(material, sort_keys=True)
+        except (TypeError, ValueError):
+            return None  # inputs that are not plain data are never memoized
+        return hashlib.sha256(encoded.encode()).hexdigest()
+
+    def get(self, stage_name: str, key: str) -> Any:
+        path = self.cache_dir / stage_name / f"{key}.json"
+        try:
+            if self.max_age_seconds is not None and time.time() - path.stat().st_mtime > self.max_age_seconds:
+                self.stats["misses"] += 1
+                return None
+            with open(path, "r") as f:
+                value = json.load(f)
+        except (OSError, ValueError):
+            self.stats["misses"] += 1
+            return None
+        self.stats["hits"] += 1
+        return value
+
+    def put(self, stage_name: str, key: str, value: Any) -> None:
+        path = self.cache_dir / stage_name / f"{key}.json"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(".tmp")
+        try:
+            with open(tmp_path, "w") as f:
+                json.dump(value, f)
+        except (TypeError, ValueError):
+            tmp_path.unlink(missing_ok=True)
+            return
+        tmp_path.replace(path)
+
+
+class WorkflowDAG:
+    """Runs stages as soon as their dependencies finish, so independent stages overlap"""
+
+    def __init__(self, stages: Iterable[Stage] = (), memo: StageMemo = None):
+        self.stages: Dict[str, Stage] = {}
+        self.memo = memo
+        for stage in stages:
+            self.add(stage)
+
+    def add(self, stage: Stage) -> None:
+        if stage.name in self.stages:
+            raise ValueError(f"Stage '{stage.name}' is already registered")
+        self.stages[stage.name] = stage
+
+    def order(self) -> List[str]:
+        """Topological order; raises ValueError on unknown dependencies or cycles"""
+        for stage in self.stages.values():
+            unknown = [d for d in stage.depends_on if d not in self.stages]
+            if unknown:
+                raise ValueError(f"Stage '{stage.name}' depends on unknown stage(s): {', '.join(unknown)}")
+
+        remaining = {name: set(stage.depends_on) for name, stage in self.stages.items()}
+        ordered = []
+        while remaining:
+            ready = sorted(name for name, deps in remaining.items() if not deps)
+            if not ready:
+                raise ValueError(f"Stage dependency cycle among: {', '.join(sorted(remaining))}")
+            for name in ready:
+                ordered.append(name)
+                del remaining[name]
+            for deps in remaining.values():
+                deps.difference_update(ready)
+        return ordered
+
+    async def run(self, state: Any, restored: Dict[str, Any] = None,
+                  on_stage_done: Callable[[str, Any, str], None] = None,
+                  on_stage_start: Callable[[str], None] = None) -> Dict[str, Any]:
+        """Run every stage; returns {"outputs", "stages", "critical_path", ...}
+
+        ``restored`` holds checkpointed outputs; ``on_stage_start(name)`` is called
+        once a stage's dependencies are met, and ``on_stage_done(name, output, how)``
+        as each stage finishes with how = ran | memoized | restored.
+        """
+        restored = restored or {}
+        order = self.order()
+        outputs: Dict[str, Any] = {}
+        timings: Dict[str, Dict[str, Any]] = {}
+        tasks: Dict[str, asyncio.Task] = {}
+        started = time.perf_counter()
+
+        def elapsed_ms() -> float:
+            return round((time.perf_counter() - started) * 1000, 1)
+
+        async def run_stage(stage: Stage) -> Any:
+            inputs = {}
+            for dep in stage.depends_on:
+                try:
+                    inputs[dep] = await tasks[dep]
+                except Exception:
+                    timings[stage.name] = {"status": "skipped", "start_ms": elapsed_ms(), "end_ms": elapsed_ms()}
+                    raise StageSkipped(f"{stage.name}: dependency '{dep}' did not complete")
+
+            start_ms = elapsed_ms()
+            if on_stage_start is not None:
+                on_stage_start(stage.name)
+            how = "ran"
+            memo_key = None
+            if stage.checkpoint and stage.name in restored and (stage.restore_if is None or stage.restore_if(state)):
+                output, how = restored[stage.name], "restored"
+                if stage.restore_as is not None:
+                    output = stage.restore_as(state, output)
+            else:
+                if stage.memoize and self.memo is not None:
+                    memo_key = self.memo.key(stage, inputs, state)
+                    output = self.memo.get(stage.name, memo_key) if memo_key else None
+                    if output is not None:
+                        how = "memoized"
+                if how == "ran":
+                    try:
+                        output = await stage.run(state, inputs)
+                    except Exception as e:
+                        timings[stage.name] = {"status": "failed", "start_ms": start_ms, "end_ms": elapsed_ms(),
+                                               "error": f"{type(e).__name__}: {e}"}
+                        raise
+                    if memo_key and (stage.memo_if is None or stage.memo_if(output)):
+                        self.memo.put(stage.name, memo_key, output)
+
+            timings[stage.name] = {"status": how, "start_ms": start_ms, "end_ms": elapsed_ms()}
+            outputs[stage.name] = output
+            if on_stage_done is not None:
+                on_stage_done(stage.name, output, how)
+            return output
+
+        for name in order:
+            tasks[name] = asyncio.ensure_future(run_stage(self.stages[name]))
+
+        # Let independent stages finish before surfacing the first failure
+        results = await asyncio.gather(*tasks.values(), return_exceptions=True)
+        report = self._report(order, timings, elapsed_ms())
+        report["outputs"] = outputs
+        errors = [r for r in results if isinstance(r, BaseException) and not isinstance(r, StageSkipped)]
+        if errors:
+            errors[0].dag = report
+            raise errors[0]
+        return report
+
+    def _report(self, order: List[str], timings: Dict[str, Dict[str, Any]], total_ms: float) -> Dict[str, Any]:
+        """Per-stage timings plus the critical path (the dependency chain that bounded total time)"""
+        for timing in timings.values():
+            timing["duration_ms"] = round(timing["end_ms"] - timing["start_ms"], 1)
+
+        # End times are rounded, so a quick stage can tie with its dependency: ties go to the later stage
+        position = {name: i for i, name in enumerate(order)}
+
+        def latest(name: str):
+            return timings[name]["end_ms"], position[name]
+
+        path = []
+        finished = [name for name in order if name in timings]
+        current = max(finished, key=latest) if finished else None
+        while current is not None:
+            path.append(current)
+            deps = [d for d in self.stages[current].depends_on if d in timings]
+            current = max(deps, key=latest) if deps else None
+        path.reverse()
+
+        return {
+            "stages": {name: timings[name] for name in order if name in timings},
+            "critical_path": path,
+            "critical_path_ms": round(sum(timings[n]["duration_ms"] for n in path), 1),
+            "total_ms": total_ms,
+            "stage_time_ms": round(sum(t["duration_ms"] for t in timings.values()), 1)
+        }
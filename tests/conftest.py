@@ -0,0 +1,47 @@
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+
+def _serve(server):
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+
+@pytest.fixture
+def serve():
+    """Run an http.server instance in a background thread for the test's duration"""
+    servers = []
+
+    def start(server):
+        servers.append(_serve(server))
+        return f"http://{server.server_address[0]}:{server.server_address[1]}"
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+@pytest.fixture
+def orchestrator(monkeypatch, tmp_path):
+    """OrchestratorAgent on the fake game backend with no waits, model or network access"""
+    for name, value in {
+        "EXECUTOR_BACKENDS": "fake",
+        "FAKE_GAME_TIME_SCALE": "0",
+        "PERF_CAPTURE_NAVIGATION": "0",
+        "RETRY_BASE_DELAY": "0",
+        "STAGE_MEMOIZE": "0",
+        "RECORDING_ENABLED": "0",
+        "CHECKPOINT_DIR": str(tmp_path / "checkpoints"),
+    }.items():
+        monkeypatch.setenv(name, value)
+    monkeypatch.delenv("LLM_ENDPOINT", raising=False)
+    from src.orchestrator import OrchestratorAgent
+    return OrchestratorAgent()
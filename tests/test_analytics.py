@@ -0,0 +1,144 @@
+import json
+import sys
+import threading
+
+from src.analytics import TrendAnalytics
+
+DAY_MS = 86_400_000
+
+
+def write_reports(reports_dir, count=40, tests=50):
+    reports_dir.mkdir()
+    for i in range(count):
+        report = {
+            "report_id": f"report_{i:03d}",
+            "game_url": "https://game.test/",
+            "timestamp": f"2026-01-01T00:{i // 60:02d}:{i % 60:02d}",
+            "execution_summary": {"test_cases_executed": tests, "passed_count": tests - 1, "failed_count": 1},
+            "test_results": [{"test_id": f"test_{t}", "description": f"Test {t}",
+                              "status": "failed" if t == i % tests else "passed", "duration_seconds": 1.0}
+                             for t in range(tests)]
+        }
+        (reports_dir / f"report_{i:03d}.json").write_text(json.dumps(report))
+
+
+def test_concurrent_refreshes_ingest_each_report_once(tmp_path):
+    write_reports(tmp_path / "reports")
+    analytics = TrendAnalytics(str(tmp_path / "reports"))
+    barrier = threading.Barrier(4)
+    errors = []
+
+    def refresh():
+        barrier.wait()
+        analytics.refresh()
+
+    def query():
+        barrier.wait()
+        try:
+            for _ in range(50):
+                for entry in analytics.failure_frequency(limit=100):
+                    assert entry["runs"] <= 40
+                analytics.pass_rate_trend()
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=refresh) for _ in range(3)] + [threading.Thread(target=query)]
+    # Switch threads often so unsynchronized appends would interleave
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        sys.setswitchinterval(interval)
+
+    assert errors == []
+    assert analytics.run_count == 40
+    assert len(analytics.test_run) == 40 * 50
+    assert sum(entry["failures"] for entry in analytics.failure_frequency(limit=100)) == 40
+
+
+def write_report(reports_dir, report_id, game_url, timestamp, results):
+    """One saved report; ``results`` are (description, status, duration) tuples"""
+    reports_dir.mkdir(exist_ok=True)
+    passed = sum(1 for _, status, _ in results if status == "passed")
+    report = {
+        "report_id": report_id,
+        "game_url": game_url,
+        "timestamp": timestamp,
+        "execution_summary": {"test_cases_executed": len(results), "passed_count": passed,
+                              "failed_count": len(results) - passed},
+        "test_results": [{"test_id": f"{report_id}_{i}", "description": description, "status": status,
+                          "duration_seconds": duration} for i, (description, status, duration) in enumerate(results)]
+    }
+    (reports_dir / f"{report_id}.json").write_text(json.dumps(report))
+
+
+def fixture_analytics(tmp_path):
+    reports = tmp_path / "reports"
+    write_report(reports, "report_1", "https://a.test/", "2026-01-01T00:00:00",
+                 [("Start", "passed", 1.0), ("Jump", "failed", 2.0), ("Score", "passed", 1.0)])
+    write_report(reports, "report_2", "https://a.test/", "2026-01-01T00:30:00",
+                 [("Start", "passed", 1.0), ("Jump", "passed", 2.0), ("Score", "passed", 1.0)])
+    write_report(reports, "report_3", "https://b.test/", "2026-01-01T00:10:00", [("Start", "failed", 1.0)])
+    write_report(reports, "report_4", "https://a.test/", "2026-01-02T01:10:00",
+                 [("Start", "passed", 1.5), ("Jump", "failed", 2.1)])
+    analytics = TrendAnalytics(str(reports))
+    assert analytics.refresh() == 4
+    return analytics
+
+
+def test_pass_rate_trend_buckets_runs_per_window(tmp_path):
+    analytics = fixture_analytics(tmp_path)
+    day_one = TrendAnalytics._to_ms("2026-01-01T00:00:00")
+
+    trend = analytics.pass_rate_trend("https://a.test/", window_ms=3_600_000)
+
+    assert [(w["window_start_ms"], w["runs"], w["tests"], w["passed"], w["pass_rate"]) for w in trend] == [
+        (day_one, 2, 6, 5, 83.3),
+        (day_one + DAY_MS + 3_600_000, 1, 2, 1, 50.0),
+    ]
+    # All games, one daily window
+    assert [(w["runs"], w["tests"], w["passed"]) for w in analytics.pass_rate_trend(window_ms=DAY_MS)] == [
+        (3, 7, 5), (1, 2, 1)]
+    assert analytics.pass_rate_trend("https://unknown.test/") == []
+
+
+def test_failure_frequency_ranks_tests_by_failures(tmp_path):
+    analytics = fixture_analytics(tmp_path)
+
+    assert analytics.failure_frequency() == [
+        {"test": "Jump", "runs": 3, "failures": 2, "failure_rate": 66.7},
+        {"test": "Start", "runs": 4, "failures": 1, "failure_rate": 25.0},
+    ]
+    assert [f["test"] for f in analytics.failure_frequency("https://a.test/")] == ["Jump"]
+    since_day_two = TrendAnalytics._to_ms("2026-01-02T00:00:00")
+    assert analytics.failure_frequency(since_ms=since_day_two) == [
+        {"test": "Jump", "runs": 1, "failures": 1, "failure_rate": 100.0}]
+    assert len(analytics.failure_frequency(limit=1)) == 1
+
+
+def test_duration_regressions_compare_the_latest_window_to_earlier_runs(tmp_path):
+    analytics = fixture_analytics(tmp_path)
+
+    # Start went from 1.0s to 1.5s; Jump's 2.0s -> 2.1s stays under the threshold
+    assert analytics.duration_regressions("https://a.test/", window_ms=DAY_MS, threshold=0.2) == [
+        {"test": "Start", "baseline_mean_seconds": 1.0, "recent_mean_seconds": 1.5, "change_percent": 50.0}]
+    assert [r["test"] for r in analytics.duration_regressions("https://a.test/", window_ms=DAY_MS,
+                                                              threshold=0.01)] == ["Start", "Jump"]
+    # A window covering every run leaves no baseline
+    assert analytics.duration_regressions("https://a.test/", window_ms=3 * DAY_MS) == []
+
+
+def test_refresh_only_ingests_new_reports(tmp_path):
+    analytics = fixture_analytics(tmp_path)
+    assert analytics.refresh() == 0
+
+    write_report(tmp_path / "reports", "report_5", "https://a.test/", "2026-01-02T02:00:00", [("Jump", "failed", 2.0)])
+
+    assert analytics.refresh() == 1
+    assert analytics.run_count == 5
+    assert analytics.failure_frequency("https://a.test/")[0] == {"test": "Jump", "runs": 4, "failures": 3,
+                                                                   "failure_rate": 75.0}
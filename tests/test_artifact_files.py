@@ -0,0 +1,142 @@
+import gzip
+
+import pytest
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import Response, StreamingResponse
+from fastapi.testclient import TestClient
+
+from src.artifact_files import ArtifactFiles
+from src.compression import CompressionMiddleware
+
+VIDEO = bytes(range(256)) * 40
+LOG = "".join(f"console line {i}: game tick ok\n" for i in range(400)).encode()
+
+
+@pytest.fixture
+def artifacts(tmp_path):
+    root = tmp_path / "artifacts"
+    (root / "recordings").mkdir(parents=True)
+    (root / "recordings" / "test_1.webm").write_bytes(VIDEO)
+    (root / "test_1_console.txt").write_bytes(LOG)
+    (root / ".shipping").mkdir()
+    (root / ".shipping" / "report_1.json").write_text("{}")
+    (root / "recordings" / ".partial.webm").write_bytes(b"x")
+    (tmp_path / "outside.txt").write_text("secret")
+    return root
+
+
+@pytest.fixture
+def client(artifacts):
+    """The API's artifact download route plus two plain endpoints, behind CompressionMiddleware"""
+    files = ArtifactFiles(str(artifacts))
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, minimum_size=1024)
+
+    @app.api_route("/files/{path:path}", methods=["GET", "HEAD"])
+    async def download(path: str, request: Request):
+        try:
+            return files.response(request, path)
+        except FileNotFoundError:
+            raise HTTPException(status_code=404)
+
+    @app.get("/stream")
+    async def stream():
+        async def chunks():
+            for i in range(0, len(LOG), 1000):
+                yield LOG[i:i + 1000]
+        return StreamingResponse(chunks(), media_type="text/plain")
+
+    @app.get("/encoded")
+    async def encoded():
+        return Response(gzip.compress(LOG), media_type="text/plain", headers={"Content-Encoding": "gzip"})
+
+    return TestClient(app)
+
+
+def test_range_requests_return_partial_content(client):
+    response = client.get("/files/recordings/test_1.webm", headers={"Range": "bytes=100-199"})
+
+    assert response.status_code == 206
+    assert response.content == VIDEO[100:200]
+    assert response.headers["content-range"] == f"bytes 100-199/{len(VIDEO)}"
+    assert response.headers["content-type"] == "video/webm"
+
+    suffix = client.get("/files/recordings/test_1.webm", headers={"Range": "bytes=-50"})
+    assert (suffix.status_code, suffix.content) == (206, VIDEO[-50:])
+
+
+def test_unsatisfiable_range_is_rejected(client):
+    response = client.get("/files/recordings/test_1.webm", headers={"Range": f"bytes={len(VIDEO) + 10}-"})
+
+    assert response.status_code == 416
+    assert response.headers["content-range"].endswith(f"*/{len(VIDEO)}")
+
+
+def test_head_sends_headers_only(client):
+    response = client.head("/files/recordings/test_1.webm")
+
+    assert response.status_code == 200
+    assert response.content == b""
+    assert int(response.headers["content-length"]) == len(VIDEO)
+    assert response.headers["accept-ranges"] == "bytes"
+
+
+def test_matching_etag_answers_304(client):
+    etag = client.get("/files/recordings/test_1.webm").headers["etag"]
+
+    response = client.get("/files/recordings/test_1.webm", headers={"If-None-Match": f'"other", {etag}'})
+
+    assert (response.status_code, response.content) == (304, b"")
+    assert response.headers["etag"] == etag
+
+
+@pytest.mark.parametrize("path", [
+    "../outside.txt", "recordings/../../outside.txt", "/etc/passwd", ".shipping/report_1.json",
+    "recordings/.partial.webm", "recordings", "missing.png",
+])
+def test_resolve_rejects_paths_outside_hidden_or_missing(artifacts, path):
+    with pytest.raises(FileNotFoundError):
+        ArtifactFiles(str(artifacts)).resolve(path)
+
+
+def test_hidden_files_are_not_served_or_listed(client, artifacts):
+    assert client.get("/files/.shipping/report_1.json").status_code == 404
+    assert [f["name"] for f in ArtifactFiles(str(artifacts)).list_files()] == [
+        "test_1_console.txt", "recordings/test_1.webm"]
+
+
+def test_text_artifacts_are_compressed_without_ranges(client):
+    response = client.get("/files/test_1_console.txt", headers={"Accept-Encoding": "gzip"})
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert "content-length" not in response.headers or int(response.headers["content-length"]) < len(LOG)
+    assert "accept-ranges" not in response.headers
+    assert response.content == LOG
+
+
+def test_partial_and_binary_responses_pass_through(client):
+    partial = client.get("/files/test_1_console.txt", headers={"Accept-Encoding": "gzip", "Range": "bytes=0-2047"})
+    assert partial.status_code == 206 and "content-encoding" not in partial.headers
+    assert partial.content == LOG[:2048]
+
+    video = client.get("/files/recordings/test_1.webm", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in video.headers and video.content == VIDEO
+
+
+def test_already_encoded_responses_pass_through(client):
+    response = client.get("/encoded", headers={"Accept-Encoding": "gzip"})
+
+    # Decoded once by the client: the middleware did not compress it again
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.content == LOG
+
+
+def test_streamed_bodies_without_length_are_compressed(client):
+    response = client.get("/stream", headers={"Accept-Encoding": "gzip"})
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert response.content == LOG
+
+    plain = client.get("/stream", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in plain.headers and plain.content == LOG
@@ -0,0 +1,138 @@
+import asyncio
+import tarfile
+
+import httpx
+import pytest
+
+from src.artifact_store import ArtifactShipper, LocalObjectStore, S3CompatibleStore
+from tools.stub_object_store import make_server
+
+CREDENTIALS = {"test-access": "test-secret"}
+
+
+def write_artifacts(tmp_path, count=6, size=1000):
+    artifacts = tmp_path / "artifacts"
+    artifacts.mkdir()
+    paths = []
+    for i in range(count):
+        path = artifacts / f"test_{i}_screenshot.png"
+        path.write_bytes(bytes([i]) * size)
+        paths.append(path)
+    return paths
+
+
+def make_report(paths):
+    items = [{"test_id": f"test_{i}", "type": "screenshot", "path": str(path)} for i, path in enumerate(paths)]
+    return {"report_id": "report_1", "artifacts": {"items": items}}
+
+
+def make_shipper(tmp_path, store, **kwargs):
+    return ArtifactShipper(store, manifest_dir=str(tmp_path / "manifests"), **kwargs)
+
+
+class FlakyStore(LocalObjectStore):
+    """Local store that records upload keys, can fail the first batch and can be slow"""
+
+    def __init__(self, root_dir, fail_first_batch=False, delay=0.0):
+        super().__init__(root_dir)
+        self.fail_first_batch = fail_first_batch
+        self.delay = delay
+        self.puts = []
+
+    async def put_object(self, key, data, content_type="application/gzip"):
+        self.puts.append(key)
+        if self.fail_first_batch and "/batch_0000_" in key:
+            raise ConnectionError("simulated upload failure")
+        await asyncio.sleep(self.delay)
+        await super().put_object(key, data, content_type)
+
+
+def test_local_store_ships_batches_and_rewrites_references(tmp_path):
+    report = make_report(write_artifacts(tmp_path))
+    store = LocalObjectStore(str(tmp_path / "store"))
+    shipper = make_shipper(tmp_path, store, batch_max_bytes=2000)
+
+    shipping = asyncio.run(shipper.ship(report))["artifacts"]["shipping"]
+
+    assert shipping["status"] == "complete"
+    assert shipping["batches"] == shipping["uploaded"] == 3
+    for item in report["artifacts"]["items"]:
+        assert item["shipped"] is True
+        assert item["uri"] == f"local://artifacts/{item['archive']}#{item['path']}"
+        with tarfile.open(store.root / item["archive"]) as archive:
+            assert archive.extractfile(item["path"].lstrip("/")).read() == open(item["path"], "rb").read()
+
+
+def test_interrupted_run_resumes_from_manifest(tmp_path):
+    store = FlakyStore(str(tmp_path / "store"), fail_first_batch=True)
+    shipper = make_shipper(tmp_path, store, batch_max_bytes=2000, max_attempts=1)
+
+    paths = write_artifacts(tmp_path)
+    first = asyncio.run(shipper.ship(make_report(paths)))["artifacts"]["shipping"]
+    assert first["status"] == "partial"
+    assert (first["uploaded"], first["failed"]) == (2, 1)
+
+    store.fail_first_batch = False
+    store.puts.clear()
+    report = asyncio.run(shipper.ship(make_report(paths)))
+    second = report["artifacts"]["shipping"]
+
+    assert second["status"] == "complete"
+    assert (second["uploaded"], second["resumed"]) == (1, 2)
+    assert len(store.puts) == 1 and "/batch_0000_" in store.puts[0]
+    assert all(item["shipped"] for item in report["artifacts"]["items"])
+
+
+def test_in_flight_bytes_stay_within_budget(tmp_path):
+    store = FlakyStore(str(tmp_path / "store"), delay=0.02)
+    shipper = make_shipper(tmp_path, store, batch_max_bytes=1000, max_in_flight_bytes=2500, concurrency=8)
+
+    shipping = asyncio.run(shipper.ship(make_report(write_artifacts(tmp_path, count=8))))["artifacts"]["shipping"]
+
+    assert shipping["uploaded"] == 8
+    # Two 1000-byte batches fit in the budget at once, a third must wait
+    assert shipping["peak_in_flight_bytes"] == 2000
+
+
+def test_s3_store_signs_put_and_head(serve, tmp_path):
+    async def scenario(secret):
+        store = S3CompatibleStore(url, "artifacts", "test-access", secret)
+        try:
+            await store.put_object("report_1/batch.tar.gz", b"archive bytes")
+            return await store.head_object("report_1/batch.tar.gz"), await store.head_object("report_1/missing")
+        finally:
+            await store.close()
+
+    server = make_server(str(tmp_path / "stub"), credentials=CREDENTIALS)
+    url = serve(server)
+
+    assert asyncio.run(scenario("test-secret")) == (True, False)
+    assert (tmp_path / "stub" / "artifacts" / "report_1" / "batch.tar.gz").read_bytes() == b"archive bytes"
+    assert [method for method, _ in server.requests_served] == ["PUT", "HEAD", "HEAD"]
+
+    with pytest.raises(httpx.HTTPStatusError, match="403"):
+        asyncio.run(scenario("wrong-secret"))
+
+
+def test_shipper_uploads_to_s3_stub(serve, tmp_path):
+    server = make_server(str(tmp_path / "stub"), credentials=CREDENTIALS)
+    url = serve(server)
+    shipper = make_shipper(tmp_path, S3CompatibleStore(url, "artifacts", "test-access", "test-secret"),
+                           batch_max_bytes=2000)
+
+    paths = write_artifacts(tmp_path)
+
+    async def ship_twice():
+        try:
+            first = (await shipper.ship(make_report(paths)))["artifacts"]["shipping"]
+            (tmp_path / "manifests" / "report_1.json").unlink()
+            # Without the manifest, HEAD finds the batches already in the bucket
+            second = (await shipper.ship(make_report(paths)))["artifacts"]["shipping"]
+            return first, second
+        finally:
+            await shipper.close()
+
+    first, second = asyncio.run(ship_twice())
+
+    assert (first["status"], first["uploaded"]) == ("complete", 3)
+    assert (second["uploaded"], second["resumed"]) == (0, 3)
@@ -0,0 +1,60 @@
+import asyncio
+
+from src.llm_client import LLMClient
+from tools.stub_llm_server import make_server
+
+GAMES = ["https://a.test/", "https://b.test/", "https://c.test/"]
+
+
+def test_batch_plans_every_game_with_one_model_request(orchestrator, serve, tmp_path):
+    server = make_server()
+    url = serve(server)
+    orchestrator.planner.llm_client = LLMClient(f"{url}/v1/batch-complete", cache_dir=str(tmp_path / "llm"))
+
+    result = asyncio.run(orchestrator.orchestrate_batch(GAMES))
+
+    assert result["status"] == "completed"
+    assert server.requests_served == [len(GAMES)]
+    assert result["planning"]["planner_calls"] == 1
+    assert result["planning"]["prompts_sent"] == len(GAMES)
+
+
+def test_batch_planning_counts_no_calls_without_a_model(orchestrator):
+    result = asyncio.run(orchestrator.orchestrate_batch(GAMES[:1]))
+
+    assert result["planning"] == {"planning_sources": {"templates": 1}, "planner_calls": 0,
+                                  "prompts_sent": 0, "cache_hits": 0}
+
+
+def test_one_failing_game_does_not_fail_the_others(orchestrator):
+    orchestrate_testing = orchestrator.orchestrate_testing
+
+    async def flaky(game_url, **kwargs):
+        if game_url == GAMES[1]:
+            raise RuntimeError("game crashed")
+        return await orchestrate_testing(game_url, **kwargs)
+
+    orchestrator.orchestrate_testing = flaky
+    result = asyncio.run(orchestrator.orchestrate_batch(GAMES))
+
+    statuses = {game["game_url"]: game["status"] for game in result["games"]}
+    assert result["status"] == "partial"
+    assert statuses == {GAMES[0]: "completed", GAMES[1]: "failed", GAMES[2]: "completed"}
+    failed = result["games"][1]
+    assert failed["error"] == "game crashed"
+    assert failed["batch_id"] == result["batch_id"]
+
+
+def test_callback_errors_leave_completed_games_completed(orchestrator):
+    published = []
+
+    async def on_game_done(workflow_result):
+        published.append(workflow_result["game_url"])
+        if workflow_result["game_url"] == GAMES[0]:
+            raise RuntimeError("report upload failed")
+
+    result = asyncio.run(orchestrator.orchestrate_batch(GAMES, on_game_done=on_game_done))
+
+    assert sorted(published) == GAMES
+    assert result["status"] == "completed"
+    assert all(game["status"] == "completed" for game in result["games"])
@@ -0,0 +1,102 @@
+import asyncio
+
+from src.capacity import CapacityPool
+from src.execution_context import ExecutionContext
+
+
+def test_load_tests_are_charged_per_virtual_player(orchestrator):
+    charged = []
+    slot = orchestrator.capacity_pool.slot
+
+    def recording_slot(tenant, game_url="", weight=1.0, cost=1.0):
+        charged.append(cost)
+        return slot(tenant, game_url, weight, cost)
+
+    orchestrator.capacity_pool.slot = recording_slot
+    orchestrator.load_test_config.virtual_players = 5
+    orchestrator.load_test_config.ramp_up_seconds = 0
+    tests = [
+        {"id": "test_1", "type": "ui_test", "description": "Click the 'Start' button"},
+        {"id": "test_2", "type": "stress_test", "description": "Rapid clicking on 'Start' 10 times"},
+    ]
+
+    context = ExecutionContext("https://game.test/")
+    results = asyncio.run(orchestrator._execute_tests(tests, "https://game.test/", context))
+
+    backend_cost = orchestrator.backends.select(tests[0]).cost
+    assert [r["status"] for r in results] == ["passed", "passed"]
+    assert sorted(charged) == [backend_cost, 5 * backend_cost]
+
+
+async def grant_order(pool, flows, per_flow=12):
+    """Tenant/game of each grant while every flow has ``per_flow`` acquires queued behind a held slot"""
+    order = []
+    release = asyncio.Event()
+
+    async def hold():
+        async with pool.slot("holder"):
+            await release.wait()
+
+    async def acquire(tenant, game_url, weight):
+        async with pool.slot(tenant, game_url, weight):
+            order.append((tenant, game_url))
+            await asyncio.sleep(0)
+
+    holder = asyncio.ensure_future(hold())
+    await asyncio.sleep(0)
+    waiters = [asyncio.ensure_future(acquire(tenant, game_url, weight))
+               for _ in range(per_flow) for tenant, game_url, weight in flows]
+    await asyncio.sleep(0)
+    release.set()
+    await asyncio.gather(holder, *waiters)
+    return order
+
+
+def test_weighted_tenants_share_in_proportion():
+    pool = CapacityPool(1)
+    order = asyncio.run(grant_order(pool, [("heavy", "g", 2.0), ("light", "g", 1.0)]))
+
+    first = [tenant for tenant, _ in order[:9]]
+    assert (first.count("heavy"), first.count("light")) == (6, 3)
+    assert pool.get_stats()["granted_by_tenant"] == {"holder": 1, "heavy": 12, "light": 12}
+
+
+def test_tenant_weight_is_split_between_its_games():
+    pool = CapacityPool(1)
+    order = asyncio.run(grant_order(pool, [("multi", "g1", 1.0), ("multi", "g2", 1.0), ("single", "g1", 1.0)]))
+
+    first = order[:12]
+    tenants = [tenant for tenant, _ in first]
+    # Two games of one tenant together get the same share as the other tenant's one game
+    assert abs(tenants.count("multi") - tenants.count("single")) <= 1
+    assert {game for tenant, game in first if tenant == "multi"} == {"g1", "g2"}
+
+
+def test_cancelled_acquire_gives_back_its_slot():
+    async def scenario():
+        pool = CapacityPool(1)
+
+        async def acquire():
+            async with pool.slot("b"):
+                pass
+
+        async with pool.slot("a"):
+            queued, granted = asyncio.ensure_future(acquire()), asyncio.ensure_future(acquire())
+            await asyncio.sleep(0)
+            assert pool.get_stats()["queued"] == 2
+
+            # Cancelled while still queued
+            queued.cancel()
+            await asyncio.gather(queued, return_exceptions=True)
+            assert pool.get_stats()["queued"] == 1
+
+        # Leaving the block handed the slot over; cancel the waiter before it resumes
+        assert pool.in_use == 1
+        granted.cancel()
+        await asyncio.gather(granted, return_exceptions=True)
+        assert (pool.in_use, pool.get_stats()["active_flows"]) == (0, 0)
+
+        async with pool.slot("c"):
+            assert pool.in_use == 1
+
+    asyncio.run(scenario())
@@ -0,0 +1,37 @@
+from src.checkpoint import WorkflowJournal
+
+
+def test_records_survive_close_and_replay_in_order(tmp_path):
+    journal = WorkflowJournal("wf", str(tmp_path))
+    journal.record_start("https://a.test/", "acme", 2.0)
+    journal.record_stage("planning", {"test_cases": [1, 2]})
+    for i in range(200):
+        journal.record_test({"test_id": f"test_{i}", "status": "passed"})
+    journal.record_end("completed")
+    journal.close()
+
+    state = WorkflowJournal("wf", str(tmp_path)).load()
+
+    assert state["meta"]["tenant"] == "acme"
+    assert state["stages"]["planning"] == {"test_cases": [1, 2]}
+    assert len(state["tests"]) == 200
+    assert state["status"] == "completed"
+
+
+def test_flush_makes_pending_records_readable(tmp_path):
+    journal = WorkflowJournal("wf", str(tmp_path))
+    journal.record_test({"test_id": "test_1", "status": "failed"})
+    journal.flush()
+
+    assert "test_1" in WorkflowJournal("wf", str(tmp_path)).load()["tests"]
+    journal.close()
+
+
+def test_torn_final_line_is_ignored(tmp_path):
+    journal = WorkflowJournal("wf", str(tmp_path))
+    journal.record_test({"test_id": "test_1", "status": "passed"})
+    journal.close()
+    with open(journal.path, "a") as f:
+        f.write('{"t":"test","test_id":"test_2","res')
+
+    assert list(WorkflowJournal("wf", str(tmp_path)).load()["tests"]) == ["test_1"]
@@ -0,0 +1,71 @@
+import asyncio
+
+from src.agents.planner import PlannerAgent
+from src.llm_client import LLMClient
+from tools.stub_llm_server import make_server
+
+
+def make_client(serve, tmp_path, delay=0.0, **kwargs):
+    server = make_server(delay=delay)
+    url = serve(server)
+    client = LLMClient(f"{url}/v1/batch-complete", cache_dir=str(tmp_path / "llm"), **kwargs)
+    return client, server
+
+
+def test_prompts_are_split_into_bounded_batches(serve, tmp_path):
+    client, server = make_client(serve, tmp_path, max_batch_size=4)
+
+    results = asyncio.run(client.complete_batch([f"prompt {i}" for i in range(10)]))
+
+    assert all(results)
+    assert sorted(server.requests_served) == [2, 4, 4]
+    assert client.stats["prompts_sent"] == 10
+
+
+def test_identical_concurrent_prompts_are_coalesced(serve, tmp_path):
+    client, server = make_client(serve, tmp_path, delay=0.2)
+
+    async def run():
+        return await asyncio.gather(client.complete_batch(["same", "other"]), client.complete_batch(["same"]))
+
+    first, second = asyncio.run(run())
+
+    assert first[0] == second[0] is not None
+    assert client.stats["coalesced"] == 1
+    assert client.stats["prompts_sent"] == 2
+    assert len(server.requests_served) == 1
+
+
+def test_completions_are_served_from_disk_cache(serve, tmp_path):
+    client, server = make_client(serve, tmp_path)
+    asyncio.run(client.complete_batch(["cached prompt"]))
+
+    again = LLMClient(client.endpoint, cache_dir=str(tmp_path / "llm"))
+    results = asyncio.run(again.complete_batch(["cached prompt"]))
+
+    assert results[0] is not None
+    assert again.stats["cache_hits"] == 1
+    assert again.stats["requests"] == 0
+    assert len(server.requests_served) == 1
+
+
+def test_timeout_falls_back_to_templates(serve, tmp_path):
+    client, _ = make_client(serve, tmp_path, delay=1.0, timeout_seconds=0.2)
+    planner = PlannerAgent(llm_client=client)
+
+    plans = asyncio.run(planner.execute_batch(["https://a.test/", "https://b.test/"]))
+
+    assert client.stats["timeouts"] == 1
+    assert {plan["planning_source"] for plan in plans.values()} == {"templates"}
+    assert all(plan["total_tests_generated"] >= planner.min_tests for plan in plans.values())
+
+
+def test_model_plans_are_parsed_and_topped_up(serve, tmp_path):
+    client, _ = make_client(serve, tmp_path)
+    planner = PlannerAgent(llm_client=client)
+
+    plan = asyncio.run(planner.execute("https://a.test/"))
+
+    assert plan["planning_source"] == "model"
+    assert len(plan["test_cases"]) == planner.min_tests
+    assert plan["test_cases"][0]["description"].startswith("Click the start button")
@@ -0,0 +1,32 @@
+import asyncio
+
+from src.matrix import MatrixSessionPool, SETUP_STEPS, build_profiles
+
+
+def test_profile_tests_run_concurrently_on_bounded_warm_sessions(tmp_path):
+    async def scenario():
+        pool = MatrixSessionPool("https://game.test/", build_profiles(["mobile"], ["none"]),
+                                 artifacts_dir=str(tmp_path), max_sessions=2)
+        active, peak, used = 0, 0, set()
+
+        async def run_test():
+            nonlocal active, peak
+            async with pool.session("mobile/none") as session:
+                used.add(id(session))
+                active += 1
+                peak = max(peak, active)
+                await asyncio.sleep(0.01)
+                active -= 1
+
+        await asyncio.gather(*(run_test() for _ in range(6)))
+        await pool.close()
+        return pool, peak, used
+
+    pool, peak, used = asyncio.run(scenario())
+
+    assert peak == 2
+    assert len(used) == 2
+    assert pool.stats["sessions_warmed"] == 2
+    # Only the first session validates the initial state; the second only opens the game
+    assert pool.stats["setup_steps_run"] == len(SETUP_STEPS) + 1
+    assert pool.stats["setup_steps_reused"] == 4 * len(SETUP_STEPS) + len(SETUP_STEPS) - 1
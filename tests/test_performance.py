@@ -0,0 +1,55 @@
+import asyncio
+
+import pytest
+
+from src.performance import NavigationProbe
+
+
+class SlowProbe(NavigationProbe):
+    def __init__(self, delay: float):
+        super().__init__(enabled=True)
+        self.delay = delay
+        self.calls = 0
+
+    async def _measure(self, url):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return {"navigation": {"source": "test", "load_ms": 1.0}, "resources": []}
+
+
+def test_one_waiter_timing_out_does_not_cancel_the_shared_measurement():
+    async def scenario():
+        probe, cache = SlowProbe(0.05), {}
+
+        async def impatient():
+            with pytest.raises(asyncio.TimeoutError):
+                await asyncio.wait_for(probe.measure("https://game.test/", cache), timeout=0.01)
+
+        _, measured = await asyncio.gather(impatient(), probe.measure("https://game.test/", cache))
+        return probe, measured
+
+    probe, measured = asyncio.run(scenario())
+
+    assert measured["navigation"]["load_ms"] == 1.0
+    assert probe.calls == 1
+
+
+def test_cancelled_measurement_is_evicted_and_retried():
+    async def scenario():
+        probe, cache = SlowProbe(10), {}
+        waiter = asyncio.ensure_future(probe.measure("https://game.test/", cache))
+        await asyncio.sleep(0.01)
+        cache["https://game.test/"].cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        await asyncio.sleep(0)
+        assert cache == {}
+
+        probe.delay = 0
+        measured = await probe.measure("https://game.test/", cache)
+        return probe, measured
+
+    probe, measured = asyncio.run(scenario())
+
+    assert measured["navigation"]["source"] == "test"
+    assert probe.calls == 2
@@ -0,0 +1,109 @@
+import asyncio
+import time
+import tracemalloc
+
+from src.profiling import Profiler, ProfilingConfig
+
+
+def spin(seconds: float) -> None:
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+
+async def profiled_work():
+    for _ in range(10):
+        spin(0.02)
+        await asyncio.sleep(0)
+
+
+async def other_work():
+    for _ in range(10):
+        spin(0.02)
+        await asyncio.sleep(0)
+
+
+def chained_factory(calls):
+    def factory(loop, coro, **kwargs):
+        calls.append(coro)
+        return asyncio.Task(coro, loop=loop, **kwargs)
+    return factory
+
+
+def run_profiled(profiler, factory):
+    async def profiled_workflow():
+        with profiler.profile("wf_profiled", enabled=True) as profile:
+            with profiler.agent_scope("PlannerAgent"):
+                profile.stage_started("planning")
+                await asyncio.create_task(profiled_work())
+                profile.stage_finished("planning", "ran")
+        return profile
+
+    async def scenario():
+        loop = asyncio.get_running_loop()
+        loop.set_task_factory(factory)
+        profile, _ = await asyncio.gather(profiled_workflow(), other_work())
+        return profile, loop.get_task_factory()
+
+    return asyncio.run(scenario())
+
+
+def test_samples_only_profiled_workflow_tasks_and_restores_task_factory(tmp_path):
+    profiler = Profiler(ProfilingConfig(interval_ms=1, output_dir=str(tmp_path)))
+    calls = []
+    factory = chained_factory(calls)
+
+    profile, restored = run_profiled(profiler, factory)
+
+    assert restored is factory
+    # The previous factory kept creating the tasks while the profiler was installed
+    assert calls
+    stacks = list(profile.stacks)
+    assert profile.samples > 0
+    assert all(stack.startswith("PlannerAgent;") for stack in stacks)
+    assert any("profiled_work" in stack for stack in stacks)
+    assert not any("other_work" in stack for stack in stacks)
+    assert profile.stages["planning"]["how"] == "ran"
+    assert "traced_kb_after" in profile.stages["planning"]
+    assert not tracemalloc.is_tracing()
+
+
+def test_leaves_tracemalloc_running_when_started_elsewhere(tmp_path):
+    profiler = Profiler(ProfilingConfig(interval_ms=1, output_dir=str(tmp_path)))
+    tracemalloc.start()
+    try:
+        run_profiled(profiler, chained_factory([]))
+        assert tracemalloc.is_tracing()
+    finally:
+        tracemalloc.stop()
+
+
+def test_overlapping_profilers_share_tracemalloc(tmp_path):
+    first = Profiler(ProfilingConfig(interval_ms=1, output_dir=str(tmp_path)))
+    second = Profiler(ProfilingConfig(interval_ms=1, output_dir=str(tmp_path)))
+
+    async def scenario():
+        first_started, first_done = asyncio.Event(), asyncio.Event()
+
+        async def first_workflow():
+            with first.profile("wf_first", enabled=True):
+                first_started.set()
+                await asyncio.sleep(0.01)
+            first_done.set()
+
+        async def second_workflow():
+            await first_started.wait()
+            with second.profile("wf_second", enabled=True) as profile:
+                profile.stage_started("analysis")
+                await first_done.wait()
+                # The profiler that started tracing has finished; this one still needs it
+                assert tracemalloc.is_tracing()
+                profile.stage_finished("analysis", "ran")
+            return profile
+
+        _, profile = await asyncio.gather(first_workflow(), second_workflow())
+        return profile
+
+    profile = asyncio.run(scenario())
+    assert "traced_kb_after" in profile.stages["analysis"]
+    assert not tracemalloc.is_tracing()
@@ -0,0 +1,139 @@
+import asyncio
+
+from src.artifact_store import ArtifactShipper, LocalObjectStore
+from src.report_generator import ReportAggregates, ReportGenerator
+from src.report_pipeline import ReportPipeline
+from src.report_stream import ReportStream, iter_section
+
+
+def run_streamed_workflow(orchestrator, generator, workflow_id="wf_stream", returned=None, **kwargs):
+    """Run a workflow, noting the stream's row count each time a result arrives
+    
+    ``returned`` collects what each _execute_tests call handed back.
+    """
+    orchestrator.report_streams = generator
+    streams, counts = [], []
+    open_stream, execute_tests = generator.open_stream, orchestrator._execute_tests
+
+    def capture_stream(*args):
+        stream = open_stream(*args)
+        streams.append(stream)
+        return stream
+
+    async def observed_execute_tests(tests, game_url, context, on_result=None, **kwargs):
+        def observed(result):
+            on_result(result)
+            counts.append(streams[0].writer.counts["test_results"] if streams[0] else len(counts) + 1)
+        results = await execute_tests(tests, game_url, context, on_result=observed, **kwargs)
+        if returned is not None:
+            returned.append(results)
+        return results
+
+    generator.open_stream = capture_stream
+    orchestrator._execute_tests = observed_execute_tests
+    return asyncio.run(orchestrator.orchestrate_testing("https://game.test/", workflow_id=workflow_id,
+                                                        **kwargs)), counts
+
+
+def test_rows_are_written_as_results_arrive(orchestrator, tmp_path):
+    generator = ReportGenerator(str(tmp_path / "reports"), stream_threshold=3)
+
+    result, counts = run_streamed_workflow(orchestrator, generator)
+
+    executed = result["steps"]["execution"]["total_executed"]
+    assert counts == list(range(1, executed + 1))
+    assert result["report_stream"]["sections"]["test_results"]["count"] == executed
+    report = generator.generate_report(result, "https://game.test/")
+    assert "test_results" not in report and "items" not in report["artifacts"]
+    assert report["sections"] == result["report_stream"]["sections"]
+
+
+def test_small_workflows_are_not_streamed(orchestrator, tmp_path):
+    generator = ReportGenerator(str(tmp_path / "reports"), stream_threshold=1000)
+
+    result, counts = run_streamed_workflow(orchestrator, generator)
+
+    assert result["status"] == "completed" and "report_stream" not in result
+    assert counts and len(generator.generate_report(result, "https://game.test/")["test_results"]) == len(counts)
+
+
+def test_pipeline_ships_streamed_items_and_pages_sections(orchestrator, tmp_path):
+    generator = ReportGenerator(str(tmp_path / "reports"), stream_threshold=3)
+    stream_rows = generator.stream_rows
+
+    def with_screenshot(test):
+        # The fake backend produces no files; give every test one artifact to ship
+        path = tmp_path / f"{test['test_id']}.png"
+        path.write_bytes(str(test["test_id"]).encode())
+        return stream_rows({**test, "artifacts": {"screenshot": str(path)}})
+
+    generator.stream_rows = with_screenshot
+    result, counts = run_streamed_workflow(orchestrator, generator)
+    shipper = ArtifactShipper(LocalObjectStore(str(tmp_path / "store")), manifest_dir=str(tmp_path / "manifests"))
+
+    published = asyncio.run(ReportPipeline(generator, shipper).run(result))
+
+    report_id = published["report"]["report_id"]
+    header = generator.get_latest_report()
+    assert header["report_id"] == report_id and "test_results" not in header
+    assert header["artifacts"]["shipping"]["status"] == "complete"
+    first = generator.get_report_section(report_id, "artifacts", offset=0, limit=4)
+    rest = generator.get_report_section(report_id, "artifacts", offset=4, limit=1000)
+    assert first["total"] == len(counts) == len(first["rows"]) + len(rest["rows"])
+    assert all(item["shipped"] and item["uri"].startswith("local://") for item in first["rows"] + rest["rows"])
+    # Trend analytics read the streamed test rows as well
+    assert generator.history.run_count == 1
+    assert len(generator.history.test_run) == len(counts)
+
+
+def test_streamed_workflow_keeps_no_results_and_reports_the_same_totals(orchestrator, tmp_path):
+    matrix = {"viewports": ["desktop", "mobile"], "network_profiles": ["none"]}
+    inline_generator = ReportGenerator(str(tmp_path / "inline"), stream_threshold=1000)
+    inline, _ = run_streamed_workflow(orchestrator, inline_generator, workflow_id="wf_inline", matrix=matrix)
+    generator = ReportGenerator(str(tmp_path / "reports"), stream_threshold=3)
+    returned = []
+
+    streamed, _ = run_streamed_workflow(orchestrator, generator, workflow_id="wf_streamed", returned=returned,
+                                        matrix=matrix)
+
+    # Results only went to the stream: nothing was collected for the analysis stage
+    assert returned == [[]]
+    assert "validated_results" not in streamed["steps"]["analysis"]
+    inline_report = inline_generator.generate_report(inline, "https://game.test/")
+    report = generator.generate_report(streamed, "https://game.test/")
+    assert report["execution_summary"] == inline_report["execution_summary"]
+    assert report["performance"]["metrics"] == inline_report["performance"]["metrics"]
+    assert report["metadata"]["agents_involved"] == inline_report["metadata"]["agents_involved"]
+    assert report["artifacts"]["by_type"] == inline_report["artifacts"]["by_type"]
+    for name, profile in report["matrix"]["by_profile"].items():
+        expected = dict(inline_report["matrix"]["by_profile"][name])
+        assert len(expected.pop("test_ids")) == profile["total"] > 0
+        assert profile == expected
+
+
+def test_stream_sections_hold_load_tests_and_violations(tmp_path):
+    generator = ReportGenerator(str(tmp_path / "reports"))
+    violation = {"metric": "load_ms", "value": 5000, "budget": 3000}
+    tests = [
+        {"test_id": "test_1", "executor": "ExecutorAgent-1", "status": "passed",
+         "load_test": {"players": 5, "error_rate": 0.0, "config": {"players": 5}},
+         "performance": {"metrics": {"load_ms": 5000, "action_p95_ms": 40.0}, "budget_violations": [violation]}},
+        {"test_id": "test_2", "executor": "ExecutorAgent-2", "status": "failed",
+         "performance": {"metrics": {"action_p95_ms": 80.0}, "budget_violations": [violation]}},
+    ]
+    stream = ReportStream(str(tmp_path / "reports"), "wf_sections", generator.stream_rows,
+                          ReportAggregates(keep_items=False))
+    for test in tests:
+        stream.add(test)
+
+    closed = stream.close()
+
+    aggregates = closed["aggregates"]
+    assert (aggregates["load_tests"], aggregates["load_test_count"]) == ([], 1)
+    assert (aggregates["budget_violations"], aggregates["budget_violation_count"]) == ([], 2)
+    assert aggregates["executors"] == ["ExecutorAgent-1", "ExecutorAgent-2"]
+    assert aggregates["metrics"]["load_ms"] == 5000 and aggregates["metrics"]["action_p95_ms"] > 0
+    loads = list(iter_section(str(tmp_path / "reports"), closed, "load_tests"))
+    assert loads == [{"test_id": "test_1", "description": None, "status": "passed", "players": 5, "error_rate": 0.0}]
+    violations = list(iter_section(str(tmp_path / "reports"), closed, "budget_violations"))
+    assert [v["test_id"] for v in violations] == ["test_1", "test_2"]
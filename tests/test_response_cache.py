@@ -0,0 +1,114 @@
+import asyncio
+import gzip
+import threading
+import time
+from email.utils import formatdate
+
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+from src.compression import brotli
+from src.response_cache import ResponseCache
+
+IDENTITY = {"Accept-Encoding": "identity"}
+
+
+def make_client(cache, builds, ttl=None):
+    """App with one cached endpoint whose producer runs in a worker thread, like the API's report endpoints"""
+    app = FastAPI()
+
+    @app.get("/data")
+    async def data(request: Request):
+        def build():
+            builds.append(threading.get_ident())
+            return {"items": [f"row {i}" for i in range(200)]}
+
+        return await cache.respond(request, "data", lambda: asyncio.to_thread(build), tags=["reports"], ttl=ttl)
+
+    return TestClient(app)
+
+
+def test_etag_revalidation_answers_304():
+    builds = []
+    client = make_client(ResponseCache(), builds)
+
+    first = client.get("/data", headers=IDENTITY)
+    etag = first.headers["etag"]
+    assert first.status_code == 200 and first.json()["items"][0] == "row 0"
+
+    for tag in (etag, f"W/{etag}", f'"other", {etag}', "*"):
+        revalidated = client.get("/data", headers={**IDENTITY, "If-None-Match": tag})
+        assert (revalidated.status_code, revalidated.content) == (304, b""), tag
+        assert revalidated.headers["etag"] == etag
+    assert client.get("/data", headers={**IDENTITY, "If-None-Match": '"other"'}).status_code == 200
+    assert len(builds) == 1 and builds[0] != threading.get_ident()
+
+
+def test_if_modified_since():
+    client = make_client(ResponseCache(), [])
+
+    last_modified = client.get("/data", headers=IDENTITY).headers["last-modified"]
+    earlier = formatdate(time.time() - 3600, usegmt=True)
+
+    assert client.get("/data", headers={**IDENTITY, "If-Modified-Since": last_modified}).status_code == 304
+    assert client.get("/data", headers={**IDENTITY, "If-Modified-Since": earlier}).status_code == 200
+    assert client.get("/data", headers={**IDENTITY, "If-Modified-Since": "not a date"}).status_code == 200
+    # If-None-Match wins over a current If-Modified-Since
+    assert client.get("/data", headers={**IDENTITY, "If-None-Match": '"other"',
+                                        "If-Modified-Since": last_modified}).status_code == 200
+
+
+def test_ttl_expires_entries():
+    builds = []
+    client = make_client(ResponseCache(), builds, ttl=0.05)
+
+    client.get("/data", headers=IDENTITY)
+    client.get("/data", headers=IDENTITY)
+    assert len(builds) == 1
+
+    time.sleep(0.06)
+    client.get("/data", headers=IDENTITY)
+    assert len(builds) == 2
+
+
+def test_tag_invalidation_rebuilds_but_keeps_validators_of_unchanged_content():
+    cache, builds = ResponseCache(), []
+    client = make_client(cache, builds)
+    first = client.get("/data", headers=IDENTITY)
+
+    cache.invalidate("workflow")
+    client.get("/data", headers=IDENTITY)
+    assert len(builds) == 1
+
+    cache.invalidate("reports")
+    rebuilt = client.get("/data", headers={**IDENTITY, "If-None-Match": first.headers["etag"]})
+    assert len(builds) == 2
+    assert rebuilt.status_code == 304 and rebuilt.headers["last-modified"] == first.headers["last-modified"]
+    assert cache.get_stats()["invalidations"] == 2
+
+
+def test_encoding_negotiation():
+    cache = ResponseCache()
+    client = make_client(cache, [])
+    plain = client.get("/data", headers=IDENTITY)
+    assert "content-encoding" not in plain.headers and plain.headers["vary"] == "Accept-Encoding"
+
+    gzipped = client.get("/data", headers={"Accept-Encoding": "gzip"})
+    assert gzipped.headers["content-encoding"] == "gzip"
+    assert gzipped.headers["etag"] == plain.headers["etag"][:-1] + '-gz"'
+    assert gzipped.json() == plain.json()
+    assert len(cache._entries["data"].encoded["gzip"]) < len(plain.content)
+    assert gzip.decompress(cache._entries["data"].encoded["gzip"]) == plain.content
+    # The client's gzip ETag still validates
+    assert client.get("/data", headers={"Accept-Encoding": "gzip",
+                                        "If-None-Match": gzipped.headers["etag"]}).status_code == 304
+
+    preferred = client.get("/data", headers={"Accept-Encoding": "br, gzip;q=0.5"})
+    assert preferred.headers["content-encoding"] == ("br" if brotli is not None else "gzip")
+    refused = client.get("/data", headers={"Accept-Encoding": "gzip;q=0"})
+    assert "content-encoding" not in refused.headers
+
+
+def test_small_bodies_are_not_compressed():
+    client = make_client(ResponseCache(min_compress_bytes=1_000_000), [])
+    assert "content-encoding" not in client.get("/data", headers={"Accept-Encoding": "gzip"}).headers
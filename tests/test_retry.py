@@ -0,0 +1,121 @@
+import asyncio
+import time
+
+from src.agents.executor import ExecutorAgent
+from src.checkpoint import WorkflowJournal
+from src.executor_backends import BackendRouter, ExecutorBackend
+from src.retry import (CircuitBreaker, CircuitBreakerRegistry, ERROR, INFRASTRUCTURE, RetryPolicy,
+                       classify_failure)
+
+
+def open_breaker(reset_timeout: float) -> CircuitBreaker:
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=reset_timeout)
+    breaker.record_failure(INFRASTRUCTURE)
+    assert breaker.state == CircuitBreaker.OPEN
+    breaker.opened_at -= reset_timeout  # cooldown already over
+    return breaker
+
+
+def test_half_open_lets_one_probe_through_until_it_reports():
+    breaker = open_breaker(30.0)
+
+    assert breaker.allow() is True
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert breaker.allow() is False
+
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_lost_probe_expires_after_reset_timeout():
+    breaker = open_breaker(0.05)
+    assert breaker.allow() is True
+    assert breaker.allow() is False
+
+    time.sleep(0.06)
+    assert breaker.allow() is True
+
+
+class HangingBackend(ExecutorBackend):
+    name = "hanging"
+    cost = 0.0
+    capabilities = frozenset({"browser", "http"})
+
+    async def run(self, *args, **kwargs) -> None:
+        await asyncio.Event().wait()
+
+
+def test_cancelled_probe_is_released():
+    async def scenario():
+        registry = CircuitBreakerRegistry(failure_threshold=1, reset_timeout=0.0)
+        executor = ExecutorAgent(circuit_breakers=registry, backends=BackendRouter([HangingBackend()]))
+        breaker = registry.for_url("https://game.test/")
+        breaker.record_failure(INFRASTRUCTURE)
+
+        task = asyncio.ensure_future(executor.execute({"id": "test_1"}, "https://game.test/"))
+        await asyncio.sleep(0.01)
+        assert breaker.state == CircuitBreaker.HALF_OPEN
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+        assert breaker.allow() is True
+
+    asyncio.run(scenario())
+
+
+class ConnectTimeout(Exception):
+    """Stands in for httpx.ConnectTimeout, matched by name"""
+
+
+def test_only_known_exceptions_are_infrastructure():
+    assert classify_failure(exc=ConnectionResetError()) == INFRASTRUCTURE
+    assert classify_failure(exc=ConnectTimeout()) == INFRASTRUCTURE
+    for exc in (KeyError("x"), TypeError("x"), AttributeError("x")):
+        assert classify_failure(exc=exc) == ERROR
+
+
+class BuggyBackend(ExecutorBackend):
+    name = "buggy"
+    cost = 0.0
+    capabilities = frozenset({"browser", "http"})
+
+    def __init__(self):
+        self.calls = 0
+
+    async def run(self, *args, **kwargs) -> None:
+        self.calls += 1
+        raise KeyError("missing_field")
+
+
+def test_programming_errors_are_not_retried_or_charged_to_the_host():
+    backend = BuggyBackend()
+    registry = CircuitBreakerRegistry(failure_threshold=1)
+    executor = ExecutorAgent(retry_policy=RetryPolicy(max_attempts=3, base_delay=0), circuit_breakers=registry,
+                             backends=BackendRouter([backend]))
+
+    result = asyncio.run(executor.execute({"id": "test_1"}, "https://game.test/"))
+
+    assert (result["status"], result["failure_class"], result["attempts"]) == ("error", ERROR, 1)
+    assert backend.calls == 1
+    assert registry.for_url("https://game.test/").state == CircuitBreaker.CLOSED
+
+
+def test_resume_reruns_transient_results(orchestrator):
+    async def scenario():
+        first = await orchestrator.orchestrate_testing("https://game.test/", workflow_id="wf_resume")
+        assert first["status"] == "completed"
+        tests = WorkflowJournal("wf_resume", orchestrator.checkpoint_dir).load()["tests"]
+        flaky_id = next(iter(tests))
+
+        journal = WorkflowJournal("wf_resume", orchestrator.checkpoint_dir)
+        journal.record_test({"test_id": flaky_id, "status": "error", "failure_class": INFRASTRUCTURE})
+        journal.close()
+
+        resumed = await orchestrator.resume_workflow("wf_resume")
+
+        # Only the transient result ran again in the resumed workflow
+        assert sum(resumed["execution_context"]["executions_by_executor"].values()) == 1
+        rerun = WorkflowJournal("wf_resume", orchestrator.checkpoint_dir).load()["tests"][flaky_id]
+        assert rerun["status"] != "error"
+
+    asyncio.run(scenario())
@@ -0,0 +1,95 @@
+import asyncio
+import math
+import random
+
+import pytest
+
+from src.agents.analyzer import AnalyzerAgent
+from src.rolling_stats import QuantileSketch, RollingSummary
+
+
+def sample_durations(n=5000, seed=7):
+    rng = random.Random(seed)
+    return [rng.lognormvariate(0, 1.5) for _ in range(n)] + [0.0] * 50
+
+
+@pytest.mark.parametrize("accuracy", [0.01, 0.05])
+def test_quantiles_are_within_the_relative_error_bound(accuracy):
+    values = sample_durations()
+    sketch = QuantileSketch(relative_accuracy=accuracy)
+    for value in values:
+        sketch.add(value)
+
+    ordered = sorted(values)
+    for q in (0.0, 0.01, 0.25, 0.5, 0.9, 0.95, 0.99, 1.0):
+        true = ordered[math.floor(q * (len(ordered) - 1))]
+        assert abs(sketch.quantile(q) - true) <= accuracy * true + 1e-9, q
+    assert (sketch.count, sketch.min, sketch.max) == (len(values), 0.0, max(values))
+
+
+def test_merged_sketch_matches_one_built_from_all_values():
+    values = sample_durations()
+    whole, left, right = QuantileSketch(), QuantileSketch(), QuantileSketch()
+    for i, value in enumerate(values):
+        whole.add(value)
+        (left if i % 3 else right).add(value)
+
+    left.merge(right)
+
+    assert left.buckets == whole.buckets and left.zero_count == whole.zero_count
+    assert left.summary() == whole.summary()
+
+
+def test_empty_sketch_merges_into_empty_summary():
+    sketch = QuantileSketch()
+    sketch.merge(QuantileSketch())
+    assert sketch.summary() == {"p50": 0.0, "p90": 0.0, "p95": 0.0, "p99": 0.0, "mean": 0.0, "min": 0.0, "max": 0.0}
+
+
+def test_incremental_analysis_validates_each_test_once():
+    analysis = AnalyzerAgent().start_analysis()
+    passed = {"test_id": "test_1", "status": "passed", "duration_seconds": 1.0}
+
+    first = analysis.add(passed)
+    again = analysis.add({**passed, "status": "failed"})
+    analysis.add({"test_id": "test_2", "status": "failed", "duration_seconds": 3.0})
+
+    assert again is first and first["validation"]["verdict"] == "PASSED"
+    snapshot = analysis.snapshot()
+    assert (snapshot["total_tests"], snapshot["passed"], snapshot["failed"]) == (2, 1, 1)
+    assert snapshot["success_rate"] == "50.0%"
+
+
+def test_analyzer_execute_does_not_recount_results_fed_during_execution():
+    analyzer = AnalyzerAgent()
+    analysis = analyzer.start_analysis()
+    results = [{"test_id": f"test_{i}", "status": "passed", "duration_seconds": 0.5} for i in range(3)]
+    analysis.add(results[0])
+
+    output = asyncio.run(analyzer.execute(results, analysis))
+
+    assert [r["test_id"] for r in output["validated_results"]] == ["test_0", "test_1", "test_2"]
+    assert output["summary"]["total_tests"] == 3
+
+
+def test_streaming_analysis_keeps_no_results():
+    analyzer = AnalyzerAgent()
+    analysis = analyzer.start_analysis(keep_results=False)
+    passed = {"test_id": "test_1", "status": "passed", "duration_seconds": 1.0}
+
+    assert analysis.add(passed)["validation"]["verdict"] == "PASSED"
+    assert analysis.add({**passed, "status": "failed"}) is None
+    output = asyncio.run(analyzer.execute([], analysis))
+
+    assert "validated_results" not in output
+    assert output["summary"]["total_tests"] == 1
+    assert output["cross_agent_consistency"]["status"] == "consistent"
+
+
+def test_rolling_summary_counts_verdicts():
+    summary = RollingSummary()
+    for verdict in ("PASSED", "PASSED", "FAILED", "FLAKY", "INCONCLUSIVE", "UNKNOWN"):
+        summary.add({"validation": {"verdict": verdict}, "duration_seconds": None})
+
+    assert summary.counts == {"passed": 2, "failed": 1, "flaky": 1, "inconclusive": 2}
+    assert summary.snapshot()["success_rate"] == "33.3%"
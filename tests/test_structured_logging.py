@@ -0,0 +1,126 @@
+import asyncio
+import io
+import json
+import logging
+import logging.handlers
+import threading
+
+import pytest
+
+from src import structured_logging
+from src.structured_logging import SamplingFilter, bind, configure_logging, get_logger, shutdown_logging
+
+
+class ThreadRecordingStream(io.StringIO):
+    """Log output that notes which threads wrote to it"""
+
+    def __init__(self):
+        super().__init__()
+        self.writers = set()
+
+    def write(self, text):
+        self.writers.add(threading.get_ident())
+        return super().write(text)
+
+
+@pytest.fixture
+def captured(monkeypatch):
+    """Restart logging into a stream; calling the fixture stops the listener and returns the JSON records"""
+    shutdown_logging()
+    monkeypatch.setenv("LOG_LEVEL", "INFO")
+    monkeypatch.setenv("LOG_FORMAT", "json")
+    monkeypatch.setenv("LOG_SAMPLE_RATES", "per_test=0.25")
+    stream = ThreadRecordingStream()
+    configure_logging(stream)
+
+    def records():
+        shutdown_logging()
+        return [json.loads(line) for line in stream.getvalue().splitlines()]
+
+    records.stream = stream
+    yield records
+    shutdown_logging()
+    monkeypatch.undo()
+    configure_logging()
+
+
+def test_bound_fields_reach_spawned_tasks_and_threads(captured):
+    logger = get_logger("test_logging")
+
+    async def scenario():
+        async def child(message):
+            logger.info(message)
+
+        with bind(workflow_id="wf_1", tenant="acme"):
+            spawned = asyncio.create_task(child("task"))
+            with bind(test_id="test_1"):
+                await asyncio.create_task(child("nested"))
+            await asyncio.to_thread(logger.info, "thread")
+        await spawned
+        logger.info("outside")
+
+    asyncio.run(scenario())
+
+    fields = {r["message"]: {k: r.get(k) for k in ("workflow_id", "tenant", "test_id")} for r in captured()}
+    assert fields == {
+        "task": {"workflow_id": "wf_1", "tenant": "acme", "test_id": None},
+        "nested": {"workflow_id": "wf_1", "tenant": "acme", "test_id": "test_1"},
+        "thread": {"workflow_id": "wf_1", "tenant": "acme", "test_id": None},
+        "outside": {"workflow_id": None, "tenant": None, "test_id": None},
+    }
+
+
+def make_record(level=logging.INFO, sample="per_test", lineno=10):
+    record = logging.LogRecord("game_tester.test", level, "executor.py", lineno, "msg", (), None)
+    if sample is not None:
+        record.sample = sample
+    return record
+
+
+def test_sampling_keeps_one_in_n_per_call_site():
+    sampler = SamplingFilter({"per_test": 0.25, "off": 0})
+
+    site_a = [sampler.filter(make_record(lineno=10)) for _ in range(8)]
+    site_b = [sampler.filter(make_record(lineno=20)) for _ in range(4)]
+
+    assert site_a == [True, False, False, False] * 2
+    assert site_b == [True, False, False, False]
+    assert sampler.dropped == 9
+    assert not any(sampler.filter(make_record(sample="off")) for _ in range(3))
+    # Warnings, unsampled records and unknown categories always pass
+    assert all(sampler.filter(make_record(level=logging.WARNING)) for _ in range(3))
+    assert all(sampler.filter(make_record(sample=None)) for _ in range(3))
+    assert all(sampler.filter(make_record(sample="unknown")) for _ in range(3))
+
+
+def test_configured_sample_rates_apply_to_agent_logs(captured):
+    logger = get_logger("ExecutorAgent.executor_9")
+    for i in range(8):
+        logger.info(f"test {i}", extra={"sample": "per_test"})
+    logger.warning("failure", extra={"sample": "per_test"})
+
+    assert [r["message"] for r in captured()] == ["test 0", "test 4", "failure"]
+
+
+def test_listener_writes_off_the_caller_thread_and_flushes_on_stop(captured):
+    logger = get_logger("test_logging")
+    listener = structured_logging._listener
+    assert listener is not None and listener._thread.is_alive()
+
+    for i in range(500):
+        logger.info(f"line {i}")
+    records = captured()
+
+    # Everything queued before the stop was written, by the listener thread only
+    assert [r["message"] for r in records] == [f"line {i}" for i in range(500)]
+    assert threading.get_ident() not in captured.stream.writers
+    assert structured_logging._listener is None and not listener._thread
+    assert not any(isinstance(h, logging.handlers.QueueHandler)
+                   for h in logging.getLogger(structured_logging.ROOT_LOGGER).handlers)
+
+    # And logging can be started again
+    stream = io.StringIO()
+    configure_logging(stream)
+    logger.info("restarted")
+    shutdown_logging()
+    assert json.loads(stream.getvalue())["message"] == "restarted"
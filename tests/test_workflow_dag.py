@@ -0,0 +1,194 @@
+import asyncio
+import json
+import os
+import time
+
+import pytest
+
+from src.checkpoint import WorkflowJournal
+from src.workflow_dag import Stage, StageMemo, WorkflowDAG
+
+
+def recording_stage(name, log, depends_on=(), delay=0.0, fail=False, **kwargs):
+    """Stage that notes when it starts and ends and outputs its name plus its inputs"""
+    async def run(state, inputs):
+        log.append(("start", name))
+        await asyncio.sleep(delay)
+        log.append(("end", name))
+        if fail:
+            raise RuntimeError(f"{name} broke")
+        return {"stage": name, "inputs": sorted(inputs)}
+
+    return Stage(name, run, depends_on=depends_on, **kwargs)
+
+
+def run_dag(dag, state=None, **kwargs):
+    done = []
+    report = asyncio.run(dag.run(state, on_stage_done=lambda name, output, how: done.append((name, how)),
+                                 **kwargs))
+    return report, done
+
+
+def test_order_is_topological_with_ties_by_name():
+    log = []
+    dag = WorkflowDAG([
+        recording_stage("report", log, depends_on=["analysis", "audit"]),
+        recording_stage("analysis", log, depends_on=["planning"]),
+        recording_stage("audit", log, depends_on=["planning"]),
+        recording_stage("planning", log),
+    ])
+
+    assert dag.order() == ["planning", "analysis", "audit", "report"]
+
+    report, _ = run_dag(dag)
+    assert report["outputs"]["report"] == {"stage": "report", "inputs": ["analysis", "audit"]}
+
+
+def test_independent_stages_overlap():
+    log = []
+    dag = WorkflowDAG([recording_stage("a", log, delay=0.02), recording_stage("b", log, delay=0.02),
+                       recording_stage("c", log, depends_on=["a", "b"])])
+
+    run_dag(dag)
+
+    assert log[:2] == [("start", "a"), ("start", "b")]
+    assert log.index(("start", "c")) > max(log.index(("end", "a")), log.index(("end", "b")))
+
+
+def test_unknown_dependencies_cycles_and_duplicates_are_rejected():
+    log = []
+    with pytest.raises(ValueError, match="unknown stage"):
+        WorkflowDAG([recording_stage("a", log, depends_on=["missing"])]).order()
+    with pytest.raises(ValueError, match="cycle among: a, b"):
+        WorkflowDAG([recording_stage("a", log, depends_on=["b"]), recording_stage("b", log, depends_on=["a"]),
+                     recording_stage("c", log)]).order()
+    with pytest.raises(ValueError, match="already registered"):
+        WorkflowDAG([recording_stage("a", log), recording_stage("a", log)])
+
+
+def test_register_stage_rolls_back_invalid_stages(orchestrator):
+    with pytest.raises(ValueError):
+        orchestrator.register_stage(recording_stage("audit", [], depends_on=["nonexistent"]))
+    assert "audit" not in orchestrator.dag.stages
+
+    orchestrator.register_stage(recording_stage("audit", [], depends_on=["analysis"]))
+    assert orchestrator.dag.order()[-1] == "audit"
+
+
+def test_failure_skips_dependents_but_not_independent_stages():
+    log = []
+    dag = WorkflowDAG([
+        recording_stage("planning", log),
+        recording_stage("execution", log, depends_on=["planning"], fail=True),
+        recording_stage("analysis", log, depends_on=["execution"]),
+        recording_stage("audit", log, depends_on=["planning"], delay=0.01),
+    ])
+    done = []
+
+    with pytest.raises(RuntimeError, match="execution broke") as raised:
+        asyncio.run(dag.run(None, on_stage_done=lambda name, output, how: done.append(name)))
+
+    stages = raised.value.dag["stages"]
+    assert {name: t["status"] for name, t in stages.items()} == {
+        "planning": "ran", "execution": "failed", "analysis": "skipped", "audit": "ran"}
+    assert stages["execution"]["error"] == "RuntimeError: execution broke"
+    assert sorted(done) == ["audit", "planning"]
+    assert ("start", "analysis") not in log
+
+
+def test_memoized_outputs_are_reused_until_inputs_change(tmp_path):
+    calls = []
+    planned = {"game_url": "https://a.test/"}
+
+    async def plan(state, inputs):
+        calls.append(state["game_url"])
+        return {"tests": [state["game_url"]], "source": state.get("source", "model")}
+
+    dag = WorkflowDAG([Stage("planning", plan, memoize=True, memo_key=lambda state: state["game_url"],
+                             memo_if=lambda output: output["source"] == "model")],
+                      memo=StageMemo(str(tmp_path / "memo")))
+
+    assert run_dag(dag, dict(planned))[1] == [("planning", "ran")]
+    assert run_dag(dag, dict(planned))[1] == [("planning", "memoized")]
+    assert run_dag(dag, {"game_url": "https://b.test/"})[1] == [("planning", "ran")]
+    # Outputs rejected by memo_if are never stored
+    run_dag(dag, {"game_url": "https://c.test/", "source": "template"})
+    assert run_dag(dag, {"game_url": "https://c.test/", "source": "template"})[1] == [("planning", "ran")]
+    assert calls == ["https://a.test/", "https://b.test/", "https://c.test/", "https://c.test/"]
+    assert dag.memo.stats["hits"] == 1
+
+
+def test_memoized_outputs_expire(tmp_path):
+    memo = StageMemo(str(tmp_path / "memo"), max_age_seconds=60)
+    stage = Stage("planning", None)
+    key = memo.key(stage, {}, None)
+    memo.put("planning", key, {"tests": []})
+    assert memo.get("planning", key) == {"tests": []}
+
+    path = tmp_path / "memo" / "planning" / f"{key}.json"
+    old = time.time() - 120
+    os.utime(path, (old, old))
+
+    assert memo.get("planning", key) is None
+    assert memo.stats == {"hits": 1, "misses": 1}
+
+
+def test_non_json_inputs_are_not_memoized(tmp_path):
+    memo = StageMemo(str(tmp_path / "memo"))
+    assert memo.key(Stage("ranking", None), {"planning": object()}, None) is None
+
+
+def test_checkpointed_outputs_are_restored_when_allowed():
+    log = []
+    dag = WorkflowDAG([
+        recording_stage("planning", log, checkpoint=True),
+        recording_stage("execution", log, depends_on=["planning"]),
+        recording_stage("analysis", log, depends_on=["execution"], checkpoint=True,
+                        restore_if=lambda state: state["complete"],
+                        restore_as=lambda state, saved: {**saved, "rebuilt": True}),
+    ])
+    restored = {"planning": {"stage": "planning", "saved": True}, "analysis": {"saved": True},
+                "execution": {"ignored": True}}
+
+    report, done = run_dag(dag, {"complete": True}, restored=restored)
+    assert done == [("planning", "restored"), ("execution", "ran"), ("analysis", "restored")]
+    assert report["outputs"]["analysis"] == {"saved": True, "rebuilt": True}
+    assert ("start", "planning") not in log
+
+    _, done = run_dag(dag, {"complete": False}, restored=restored)
+    assert done == [("planning", "restored"), ("execution", "ran"), ("analysis", "ran")]
+
+
+def test_critical_path_follows_the_slowest_chain():
+    log = []
+    dag = WorkflowDAG([
+        recording_stage("slow", log, delay=0.05),
+        recording_stage("fast", log, delay=0.0),
+        recording_stage("join", log, depends_on=["slow", "fast"]),
+    ])
+
+    report, _ = run_dag(dag)
+
+    assert report["critical_path"] == ["slow", "join"]
+    assert report["critical_path_ms"] >= 50
+    assert report["total_ms"] >= report["critical_path_ms"] - 1
+    assert report["stage_time_ms"] >= report["critical_path_ms"]
+
+
+def test_analysis_checkpoint_holds_no_per_test_results(orchestrator):
+    async def scenario():
+        first = await orchestrator.orchestrate_testing("https://game.test/", workflow_id="wf_slim")
+        resumed = await orchestrator.resume_workflow("wf_slim")
+        return first, resumed
+
+    first, resumed = asyncio.run(scenario())
+
+    with open(WorkflowJournal("wf_slim", orchestrator.checkpoint_dir).path) as f:
+        records = [json.loads(line) for line in f]
+    analysis = next(r["result"] for r in records if r.get("stage") == "analysis")
+    assert "validated_results" not in analysis and analysis["summary"]["total_tests"] > 0
+
+    assert resumed["dag"]["stages"]["analysis"]["status"] == "restored"
+    restored, original = resumed["steps"]["analysis"], first["steps"]["analysis"]
+    assert [r["test_id"] for r in restored["validated_results"]] == [r["test_id"] for r in original["validated_results"]]
+    assert restored["summary"] == original["summary"]
@@ -0,0 +1,58 @@
+"""Local stand-in for the LLM batch completion endpoint used by PlannerAgent.
+
+Usage: python tools/stub_llm_server.py [port] [delay_seconds]
+Then set LLM_ENDPOINT=http://localhost:8765/v1/batch-complete
+"""
+import json
+import sys
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+CANNED_TESTS = [
+    {"description": "Click the start button and verify the game board renders", "priority": "high", "type": "ui_interaction", "expected_result": "Board is visible"},
+    {"description": "Submit an empty answer and verify the error message", "priority": "high", "type": "input_validation", "expected_result": "Error message shown"},
+    {"description": "Enter a negative number and verify it is rejected", "priority": "medium", "type": "input_validation", "expected_result": "Input rejected"},
+    {"description": "Complete a level and verify the score updates", "priority": "high", "type": "functional", "expected_result": "Score increments"},
+    {"description": "Rapidly click the hint button and verify no crash", "priority": "low", "type": "stress_test", "expected_result": "No crashes"},
+]
+
+class StubHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        payload = json.loads(self.rfile.read(length) or b"{}")
+        prompts = payload.get("prompts", [])
+
+        if self.server.delay:
+            time.sleep(self.server.delay)
+
+        self.server.requests_served.append(len(prompts))
+        if self.server.verbose:
+            print(f"[StubLLM] request {len(self.server.requests_served)}: {len(prompts)} prompt(s)")
+
+        body = json.dumps({"completions": [json.dumps(CANNED_TESTS) for _ in prompts]}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def make_server(host: str = "127.0.0.1", port: int = 0, delay: float = 0.0,
+                verbose: bool = False) -> ThreadingHTTPServer:
+    """Stub server (port 0 picks a free port); ``requests_served`` lists the prompt count per request"""
+    server = ThreadingHTTPServer((host, port), StubHandler)
+    server.daemon_threads = True
+    server.delay = delay
+    server.verbose = verbose
+    server.requests_served = []
+    return server
+
+
+if __name__ == "__main__":
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else 8765
+    delay = float(sys.argv[2]) if len(sys.argv) > 2 else 0.0
+    print(f"[StubLLM] listening on http://localhost:{port}/v1/batch-complete (delay={delay}s)")
+    make_server("0.0.0.0", port, delay, verbose=True).serve_forever()
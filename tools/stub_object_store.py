@@ -0,0 +1,127 @@
+"""Local stand-in for an S3-compatible object store (path-style PUT/HEAD/GET).
+
+Objects are written under ./object_store_stub/. Signatures are not verified
+unless the server is built with ``credentials`` (access key -> secret key),
+in which case requests without a valid AWS SigV4 signature get 403.
+
+Usage: python tools/stub_object_store.py [port]
+Then set ARTIFACT_STORE=s3, S3_ENDPOINT=http://localhost:9000 and any S3_ACCESS_KEY/S3_SECRET_KEY.
+"""
+import hashlib
+import hmac
+import re
+import sys
+from pathlib import Path
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+from urllib.parse import unquote
+
+AUTHORIZATION = re.compile(
+    r"AWS4-HMAC-SHA256 Credential=(?P<key>[^/]+)/(?P<scope>[^,]+), "
+    r"SignedHeaders=(?P<headers>[^,]+), Signature=(?P<signature>[0-9a-f]+)"
+)
+
+
+def verify_sigv4(method: str, path: str, headers, body: bytes, credentials: Dict[str, str]) -> bool:
+    """Recompute the request's SigV4 signature (path-style, no query string)"""
+    match = AUTHORIZATION.fullmatch(headers.get("Authorization", ""))
+    if not match or match["key"] not in credentials:
+        return False
+    payload_hash = headers.get("x-amz-content-sha256", "")
+    if payload_hash != hashlib.sha256(body).hexdigest():
+        return False
+
+    signed = match["headers"].split(";")
+    canonical_headers = "".join(f"{name}:{(headers.get(name) or '').strip()}\n" for name in signed)
+    canonical_request = "\n".join([method, path.split("?", 1)[0], "", canonical_headers,
+                                   match["headers"], payload_hash])
+    date_stamp, region, service, _ = match["scope"].split("/")
+    string_to_sign = "\n".join([
+        "AWS4-HMAC-SHA256", headers.get("x-amz-date", ""), match["scope"],
+        hashlib.sha256(canonical_request.encode()).hexdigest()
+    ])
+
+    signing_key = f"AWS4{credentials[match['key']]}".encode()
+    for part in (date_stamp, region, service, "aws4_request"):
+        signing_key = hmac.new(signing_key, part.encode(), hashlib.sha256).digest()
+    expected = hmac.new(signing_key, string_to_sign.encode(), hashlib.sha256).hexdigest()
+    return hmac.compare_digest(expected, match["signature"])
+
+
+class StubS3Handler(BaseHTTPRequestHandler):
+    def _path(self) -> Path:
+        root = self.server.root
+        relative = unquote(self.path.split("?", 1)[0]).lstrip("/")
+        path = (root / relative).resolve()
+        if root.resolve() not in path.parents:
+            raise ValueError("path escapes store root")
+        return path
+
+    def _authorized(self, body: bytes = b"") -> bool:
+        self.server.requests_served.append((self.command, self.path))
+        credentials = self.server.credentials
+        if credentials is None or verify_sigv4(self.command, self.path, self.headers, body, credentials):
+            return True
+        self.send_response(403)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+        return False
+
+    def do_PUT(self):
+        length = int(self.headers.get("Content-Length", 0))
+        data = self.rfile.read(length)
+        if not self._authorized(data):
+            return
+        path = self._path()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(data)
+        if self.server.verbose:
+            print(f"[StubS3] PUT {self.path} ({len(data)} bytes)")
+        self.send_response(200)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def do_HEAD(self):
+        if not self._authorized():
+            return
+        path = self._path()
+        self.send_response(200 if path.is_file() else 404)
+        self.send_header("Content-Length", str(path.stat().st_size if path.is_file() else 0))
+        self.end_headers()
+
+    def do_GET(self):
+        if not self._authorized():
+            return
+        path = self._path()
+        if not path.is_file():
+            self.send_response(404)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        data = path.read_bytes()
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def make_server(root: str = "object_store_stub", host: str = "127.0.0.1", port: int = 0,
+                credentials: Optional[Dict[str, str]] = None, verbose: bool = False) -> ThreadingHTTPServer:
+    """Stub store (port 0 picks a free port); ``requests_served`` lists (method, path) per request"""
+    server = ThreadingHTTPServer((host, port), StubS3Handler)
+    server.daemon_threads = True
+    server.root = Path(root)
+    server.root.mkdir(parents=True, exist_ok=True)
+    server.credentials = credentials
+    server.verbose = verbose
+    server.requests_served = []
+    return server
+
+
+if __name__ == "__main__":
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else 9000
+    print(f"[StubS3] listening on http://localhost:{port} (root: object_store_stub)")
+    make_server(host="0.0.0.0", port=port, verbose=True).serve_forever()